@@ -0,0 +1,49 @@
+"""Benchmark inputs: snapshots saved by `dump-snapshots` plus deterministic synthetic pages.
+
+Synthetic pages come from the stand-in server's generators: they follow the
+markup the extractors target and are padded with navigation, footer and script
+noise to the size of a real listing page, so tree-walking XPaths pay a
+realistic cost.
+"""
+
+from __future__ import annotations
+
+import random
+from pathlib import Path
+
+from rightmove_scraper import standin
+
+FIXTURES_DIR = Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "html"
+
+
+def listing_page(seed: int, *, page_model: bool = False, noise: int = 400) -> str:
+    return standin.listing_page(100_000_000 + seed, page_model=page_model, noise=noise)
+
+
+def search_page(seed: int, *, cards: int = 24, total: int = 1234) -> str:
+    rng = random.Random(seed)
+    return standin.search_page(
+        [rng.randrange(10**8, 10**9) for _ in range(cards)], total, seed=seed
+    )
+
+
+def snapshot_pages(kind: str) -> list[str]:
+    """Saved pages: `sample_listing_*.html` from dump-snapshots, or `sample_search_*.html`."""
+    if not FIXTURES_DIR.is_dir():
+        return []
+    return [
+        p.read_text(encoding="utf-8") for p in sorted(FIXTURES_DIR.glob(f"sample_{kind}_*.html"))
+    ]
+
+
+def listing_pages(n: int = 20, *, page_model: bool = False) -> list[str]:
+    return snapshot_pages("listing") + [listing_page(i, page_model=page_model) for i in range(n)]
+
+
+def search_pages(n: int = 10) -> list[str]:
+    return snapshot_pages("search") + [search_page(i) for i in range(n)]
+
+
+def coordinates(n: int, seed: int = 0) -> list[tuple[float, float]]:
+    rng = random.Random(seed)
+    return [(51.3 + rng.random() * 0.35, -0.45 + rng.random() * 0.7) for _ in range(n)]
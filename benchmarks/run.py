@@ -0,0 +1,518 @@
+"""Offline micro-benchmarks for parsing, normalization, slicing and output writing.
+
+    python benchmarks/run.py                 # compare against benchmarks/baseline.json
+    python benchmarks/run.py --save          # record a new baseline
+    python benchmarks/run.py -k extractors   # only benchmarks whose name contains "extractors"
+
+Each benchmark is timed over several rounds of auto-calibrated loops and the
+fastest round is kept, which is the most repeatable figure on a busy machine.
+The run exits non-zero when any benchmark is slower than its baseline by more
+than --threshold (and by more than --min-delta-ms in absolute terms).
+Baselines are machine-specific: record them on the machine that runs the
+comparison.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from lxml import html
+
+    from rightmove_scraper.models import Listing
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import corpus  # noqa: E402
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+Timed = Callable[[], object]
+# name -> factory returning the callable to time; factories run once, untimed
+BENCHMARKS: dict[str, Callable[[], Timed]] = {}
+
+
+def bench(name: str) -> Callable[[Callable[[], Timed]], Callable[[], Timed]]:
+    def register(factory: Callable[[], Timed]) -> Callable[[], Timed]:
+        BENCHMARKS[name] = factory
+        return factory
+
+    return register
+
+
+def _listing_docs(page_model: bool = False) -> list[html.HtmlElement]:
+    from lxml import html
+
+    return [html.fromstring(p) for p in corpus.listing_pages(page_model=page_model)]
+
+
+def _each(fn: Callable[..., object], items: list[Any], *args: Any, **kwargs: Any) -> Timed:
+    def run() -> None:
+        for item in items:
+            fn(item, *args, **kwargs)
+
+    return run
+
+
+# --- extractors -----------------------------------------------------------------
+
+_DOC_EXTRACTORS = {
+    "get_title": (),
+    "get_price_text": (),
+    "get_key_features": (),
+    "get_description": (),
+    "get_agent": (),
+    "get_photo_urls": (),
+    "get_floorplan_url": (),
+    "get_agent_address": (),
+    "get_agent_phone": (),
+    "get_lat_lng": (),
+    "get_listing_history": (),
+    "get_summary_panel_value": ("BEDROOMS",),
+    "get_fact_after_description": ("COUNCIL TAX",),
+    "get_fact_grid_value": ("COUNCIL TAX",),
+    "get_fact_value": ("PARKING",),
+    "find_label_value_fuzzy": (["Council tax", "Council Tax Band"],),
+}
+
+
+def _register_doc_extractor(fn_name: str, args: tuple) -> None:
+    @bench(f"extractors.{fn_name}")
+    def factory() -> Timed:
+        from rightmove_scraper import extractors
+
+        return _each(getattr(extractors, fn_name), _listing_docs(), *args)
+
+
+for _name, _args in _DOC_EXTRACTORS.items():
+    _register_doc_extractor(_name, _args)
+
+
+@bench("extractors.derive_from_key_features")
+def _derive() -> Timed:
+    from rightmove_scraper.extractors import derive_from_key_features, get_key_features
+
+    features = [get_key_features(d) for d in _listing_docs()]
+    return _each(derive_from_key_features, features, ["parking", "driveway", "garage"])
+
+
+@bench("extractors.normalize_floorplan_url")
+def _floorplan_url() -> Timed:
+    from rightmove_scraper.extractors import normalize_floorplan_url
+
+    urls = [f"https://media.rightmove.co.uk/dir/{i}/_FLP_00_max_296x197.png" for i in range(100)]
+    return _each(normalize_floorplan_url, urls)
+
+
+@bench("extractors.normalize_agent_address")
+def _agent_address() -> Timed:
+    from rightmove_scraper.extractors import normalize_agent_address
+
+    return _each(
+        normalize_agent_address, [f"{i} High St,\n  London\nNW{i % 9 + 1}" for i in range(100)]
+    )
+
+
+@bench("extractors.extract_page_model")
+def _page_model() -> Timed:
+    from rightmove_scraper.extractors import extract_page_model
+
+    return _each(extract_page_model, corpus.listing_pages(page_model=True))
+
+
+@bench("extractors.page_model_fields")
+def _page_model_fields() -> Timed:
+    from rightmove_scraper.extractors import extract_page_model, page_model_fields
+
+    return _each(
+        page_model_fields, [extract_page_model(p) for p in corpus.listing_pages(page_model=True)]
+    )
+
+
+@bench("lxml.fromstring.listing")
+def _fromstring() -> Timed:
+    from lxml import html
+
+    return _each(html.fromstring, corpus.listing_pages())
+
+
+@bench("htmlslice.parse_regions.listing")
+def _regions_listing() -> Timed:
+    from rightmove_scraper.htmlslice import LISTING_REGIONS, parse_regions
+
+    return _each(parse_regions, corpus.listing_pages(), LISTING_REGIONS)
+
+
+@bench("htmlslice.parse_regions.search")
+def _regions_search() -> Timed:
+    from rightmove_scraper.htmlslice import SEARCH_REGIONS, parse_regions
+
+    return _each(parse_regions, corpus.search_pages(), SEARCH_REGIONS)
+
+
+@bench("parse_listing.dom")
+def _parse_dom() -> Timed:
+    from rightmove_scraper.scrape_listing import parse_listing
+
+    return _each(
+        parse_listing, corpus.listing_pages(), "https://www.rightmove.co.uk/properties/123456"
+    )
+
+
+@bench("parse_listing.page_model")
+def _parse_pm() -> Timed:
+    from rightmove_scraper.scrape_listing import parse_listing
+
+    pages = corpus.listing_pages(page_model=True)
+    return _each(parse_listing, pages, "https://www.rightmove.co.uk/properties/123456")
+
+
+# --- discovery ------------------------------------------------------------------
+
+
+@bench("discovery.extract_listing_urls_from_search")
+def _search_urls() -> Timed:
+    from rightmove_scraper.discovery import extract_listing_urls_from_search
+
+    return _each(extract_listing_urls_from_search, corpus.search_pages())
+
+
+@bench("discovery.extract_total_results_from_search")
+def _search_total() -> Timed:
+    from rightmove_scraper.discovery import extract_total_results_from_search
+
+    return _each(extract_total_results_from_search, corpus.search_pages())
+
+
+@bench("discovery.extract_search_cards")
+def _search_cards() -> Timed:
+    from rightmove_scraper.discovery import extract_search_cards
+
+    return _each(extract_search_cards, corpus.search_pages())
+
+
+# --- normalize ------------------------------------------------------------------
+
+_PRICES = [
+    "£525,000",
+    "Guide Price £1,250,000",
+    "POA",
+    "£95,000 Offers over",
+    "USD 400,000",
+    "",
+] * 20
+_TENURES = ["Leasehold", "FREEHOLD", "Share of freehold", "Ask agent", " leasehold "] * 20
+_BANDS = ["Band: D", "Council tax band c", "Ask agent", "A", "TBC", "Band:E"] * 20
+_INTS = ["2", "1,250", "Studio", "3 bedrooms", None] * 20
+
+
+@bench("normalize.parse_price")
+def _parse_price() -> Timed:
+    from rightmove_scraper.normalize import parse_price
+
+    return _each(parse_price, _PRICES)
+
+
+@bench("normalize.normalize_tenure")
+def _tenure() -> Timed:
+    from rightmove_scraper.normalize import normalize_tenure
+
+    return _each(normalize_tenure, _TENURES)
+
+
+@bench("normalize.normalize_council_tax")
+def _council_tax() -> Timed:
+    from rightmove_scraper.normalize import normalize_council_tax
+
+    return _each(normalize_council_tax, _BANDS)
+
+
+@bench("normalize.coerce_int")
+def _coerce_int() -> Timed:
+    from rightmove_scraper.normalize import coerce_int
+
+    return _each(coerce_int, _INTS)
+
+
+# --- slicer ---------------------------------------------------------------------
+
+
+class FakeCounter:
+    """Result counts from a fixed per-outcode density, uniform over price; no network."""
+
+    def __init__(self) -> None:
+        from rightmove_scraper.sharding import stable_hash
+
+        self._hash = stable_hash
+        self.calls = 0
+
+    async def count(
+        self,
+        location_identifier: str,
+        *,
+        min_price: int | None,
+        max_price: int | None,
+        query: str,
+        property_type: str | None,
+    ) -> int:
+        from rightmove_scraper.slicer import DEFAULT_MAX_PRICE, DEFAULT_MIN_PRICE
+
+        self.calls += 1
+        if location_identifier.startswith("REGION^"):
+            return 250_000
+        density = 500 + self._hash(location_identifier) % 20_000
+        lo = DEFAULT_MIN_PRICE if min_price is None else min_price
+        hi = DEFAULT_MAX_PRICE if max_price is None else max_price
+        return int(density * (hi - lo) / (DEFAULT_MAX_PRICE - DEFAULT_MIN_PRICE))
+
+
+@bench("slicer.partition.region")
+def _partition() -> Timed:
+    from rightmove_scraper.slicer import Slice, partition
+
+    start = Slice(
+        level="region",
+        name="London",
+        location_identifier="REGION^87490",
+        price_min=None,
+        price_max=None,
+    )
+
+    def run() -> None:
+        asyncio.run(
+            partition(
+                initial_slice=start,
+                result_counter=FakeCounter(),
+                district_provider=None,
+                query="",
+                property_type=None,
+            )
+        )
+
+    return run
+
+
+# --- TfL zones (needs shapely and geopy) ----------------------------------------
+
+
+def _zone_geojson(path: str) -> None:
+    # Concentric square-ish rings around Charing Cross, zone 1 innermost
+    features = []
+    for zone in range(1, 10):
+        r = 0.03 * zone
+        outer = [
+            [-0.1278 - r, 51.5074 - r],
+            [-0.1278 + r, 51.5074 - r],
+            [-0.1278 + r, 51.5074 + r],
+            [-0.1278 - r, 51.5074 + r],
+            [-0.1278 - r, 51.5074 - r],
+        ]
+        features.append(
+            {
+                "type": "Feature",
+                "properties": {"zone": zone},
+                "geometry": {"type": "Polygon", "coordinates": [outer]},
+            }
+        )
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"type": "FeatureCollection", "features": features}, f)
+
+
+def _zones(polygons: bool) -> Timed:
+    from data_transformer.convert_coordinate_tozone import TfLZoneConverter
+
+    zone_file = None
+    if polygons:
+        zone_file = os.path.join(tempfile.mkdtemp(prefix="bench-zones-"), "zones.geojson")
+        _zone_geojson(zone_file)
+    conv = TfLZoneConverter(zone_file)
+    coords = corpus.coordinates(500)
+
+    def run() -> None:
+        for lat, lng in coords:
+            conv.get_zone_from_coordinates(lat, lng)
+
+    return run
+
+
+@bench("zones.distance")
+def _zones_distance() -> Timed:
+    return _zones(polygons=False)
+
+
+@bench("zones.polygons")
+def _zones_polygons() -> Timed:
+    return _zones(polygons=True)
+
+
+# --- datastore ------------------------------------------------------------------
+
+
+def _records(n: int = 1000) -> list[Listing]:
+    from rightmove_scraper.scrape_listing import parse_listing
+
+    pages = corpus.listing_pages(n=20, page_model=True)
+    base = [
+        parse_listing(p, f"https://www.rightmove.co.uk/properties/{100_000_000 + i}")
+        for i, p in enumerate(pages)
+    ]
+    return [
+        base[i % len(base)].model_copy(update={"rightmove_id": str(200_000_000 + i)})
+        for i in range(n)
+    ]
+
+
+def _register_write(fmt: str) -> None:
+    @bench(f"datastore.write_records.{fmt}")
+    def factory() -> Timed:
+        from rightmove_scraper.datastore import write_records
+
+        records = _records()
+        out_dir = tempfile.mkdtemp(prefix=f"bench-{fmt}-")
+        return lambda: write_records(records, out_dir, fmt)
+
+
+for _fmt in ("csv", "parquet", "sqlite"):
+    _register_write(_fmt)
+
+
+# --- harness --------------------------------------------------------------------
+
+
+def measure(fn: Timed, rounds: int, min_time: float) -> dict[str, float]:
+    fn()  # warm caches, compiled XPaths and lazy imports
+    loops = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - t0
+        if elapsed >= min_time or loops >= 1 << 20:
+            break
+        loops *= 2 if elapsed < min_time / 4 else 1 + int(min_time / max(elapsed, 1e-9))
+    times = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        times.append((time.perf_counter() - t0) / loops)
+    return {"best_sec": min(times), "median_sec": statistics.median(times), "loops": loops}
+
+
+def machine() -> dict[str, object]:
+    return {
+        "node": platform.node(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(
+        description="Run offline micro-benchmarks and compare with a baseline"
+    )
+    p.add_argument(
+        "-k", "--filter", default=None, help="Only run benchmarks whose name contains this"
+    )
+    p.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="Baseline JSON path")
+    p.add_argument(
+        "--save", action="store_true", help="Write results as the new baseline instead of comparing"
+    )
+    p.add_argument(
+        "--threshold", type=float, default=0.25, help="Allowed slowdown vs baseline (0.25 = 25%%)"
+    )
+    p.add_argument(
+        "--min-delta-ms",
+        type=float,
+        default=0.02,
+        help="Ignore slowdowns smaller than this, which are timer noise",
+    )
+    p.add_argument("--rounds", type=int, default=5, help="Timed rounds per benchmark")
+    p.add_argument(
+        "--min-time",
+        type=float,
+        default=0.1,
+        help="Seconds per round; loops are calibrated to reach it",
+    )
+    p.add_argument("--json", default=None, help="Also write this run's results to a JSON file")
+    return p.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    baseline: dict = {}
+    if not args.save and os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("machine", {}).get("node") != platform.node():
+            recorded_on = baseline.get("machine", {}).get("node")
+            print(f"Warning: baseline was recorded on {recorded_on!r}; comparisons may be noisy")
+
+    results: dict[str, dict] = {}
+    regressions: list[str] = []
+    print(f"{'benchmark':<48} {'best ms':>10} {'median ms':>10} {'base ms':>10} {'change':>8}")
+    for name, factory in BENCHMARKS.items():
+        if args.filter and args.filter not in name:
+            continue
+        try:
+            fn = factory()
+        except ImportError as e:
+            print(f"{name:<48} skipped: {e}")
+            continue
+        r = measure(fn, args.rounds, args.min_time)
+        results[name] = r
+        base = baseline.get("results", {}).get(name)
+        change = ""
+        base_txt = "-"
+        if base:
+            ratio = r["best_sec"] / base["best_sec"]
+            base_txt = f"{base['best_sec'] * 1000:.3f}"
+            change = f"{(ratio - 1) * 100:+.1f}%"
+            slower_ms = (r["best_sec"] - base["best_sec"]) * 1000
+            if ratio > 1 + args.threshold and slower_ms > args.min_delta_ms:
+                regressions.append(name)
+                change += " !"
+        best_ms, median_ms = r["best_sec"] * 1000, r["median_sec"] * 1000
+        print(f"{name:<48} {best_ms:>10.3f} {median_ms:>10.3f} {base_txt:>10} {change:>8}")
+
+    doc = {"recorded": datetime.now(UTC).isoformat(), "machine": machine(), "results": results}
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(doc, f, indent=2)
+    if args.save:
+        if os.path.exists(args.baseline):
+            # Keep entries for benchmarks filtered out of this run
+            with open(args.baseline, encoding="utf-8") as f:
+                doc["results"] = {**json.load(f).get("results", {}), **results}
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(doc, f, indent=2)
+        print(f"Saved baseline for {len(results)} benchmarks to {args.baseline}")
+        return 0
+    if not baseline:
+        print(f"No baseline at {args.baseline}; run with --save to record one")
+    if regressions:
+        print(
+            f"{len(regressions)} regressions beyond {args.threshold:.0%}: {', '.join(regressions)}"
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
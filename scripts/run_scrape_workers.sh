@@ -0,0 +1,52 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+# Scrape the frontier with several independent scrape-seeds processes that lease
+# small batches from the same SQLite file. A slow or crashed worker's URLs are
+# taken over by the others once its leases expire. Each worker writes to
+# $OUT_DIR/workers/<worker-id>/.
+
+export PYTHONPATH=${PYTHONPATH:-$PWD/src}
+
+OUT_DIR="./out"
+FORMAT="csv"
+SEEDS_FILE="$OUT_DIR/discovered_adaptive_seeds.csv"
+FRONTIER="$OUT_DIR/frontier.db"
+WORKERS="${WORKERS:-3}"
+LEASE_BATCH="${LEASE_BATCH:-20}"
+
+if [ -f "$SEEDS_FILE" ]; then
+  INPUT_FLAG=(--input "$SEEDS_FILE")
+elif [ -f "$FRONTIER" ]; then
+  INPUT_FLAG=()
+else
+  echo "Neither $SEEDS_FILE nor $FRONTIER found"
+  exit 1
+fi
+
+echo "Starting $WORKERS workers on $FRONTIER..."
+pids=()
+for i in $(seq 1 "$WORKERS"); do
+  python -m rightmove_scraper.cli scrape-seeds \
+    ${INPUT_FLAG[@]+"${INPUT_FLAG[@]}"} \
+    --frontier "$FRONTIER" \
+    --lease-batch "$LEASE_BATCH" \
+    --worker-id "$(hostname)-w$i" \
+    --out "$OUT_DIR" \
+    --format "$FORMAT" \
+    --max 1000000 \
+    > "$OUT_DIR/worker_$i.log" 2>&1 &
+  pids+=($!)
+  # Only the first worker needs to enqueue the seeds
+  INPUT_FLAG=()
+  sleep 2
+done
+
+status=0
+for pid in "${pids[@]}"; do
+  wait "$pid" || status=1
+done
+
+python -m rightmove_scraper.cli frontier-status --frontier "$FRONTIER"
+echo "Done."
+exit $status
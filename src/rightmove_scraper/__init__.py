@@ -3,10 +3,23 @@ __all__ = [
     "logging_setup",
     "compliance",
     "browser",
+    "pagepool",
+    "supervisor",
+    "netpolicy",
+    "httpfetch",
     "extractors",
+    "inpage",
     "normalize",
     "models",
     "datastore",
+    "archive",
+    "frontier",
+    "fingerprints",
+    "sharding",
+    "ratelimit",
+    "adaptive",
+    "metrics",
+    "errors",
     "utils",
 ]
 
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+
+logger = logging.getLogger(__name__)
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class AdaptiveController:
+    """AIMD controller for the number of in-flight scrapes and the page timeout.
+
+    Workers hold a slot from `slot()` per URL and report each attempt through
+    `record()`. After every window of samples the limit grows by one while
+    latency, timeouts and errors stay healthy, and is cut multiplicatively on
+    blocked responses, a high timeout or error rate, or median latency well
+    above the best seen so far. The timeout follows observed p95 latency when
+    healthy and backs off when requests time out.
+    """
+
+    def __init__(
+        self,
+        *,
+        initial: int,
+        min_limit: int = 1,
+        max_limit: int = 8,
+        timeout_sec: float = 30.0,
+        min_timeout_sec: float | None = None,
+        max_timeout_sec: float | None = None,
+        window: int = 10,
+        log: Callable[[str], None] = logger.info,
+    ) -> None:
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = min(self.max_limit, max(self.min_limit, initial))
+        self.timeout_sec = timeout_sec
+        self.min_timeout_sec = min_timeout_sec or timeout_sec / 2
+        self.max_timeout_sec = max_timeout_sec or timeout_sec * 2
+        self.window = window
+        self.log = log
+        self.best_p50: float | None = None
+        self.increases = 0
+        self.decreases = 0
+        self.peak = self.limit
+        self._in_flight = 0
+        self._waiters: list[asyncio.Future[None]] = []
+        self._latencies: list[float] = []
+        self._outcomes: dict[str, int] = {}
+        self._listeners: list[Callable[[AdaptiveController], None]] = []
+
+    def on_change(self, fn: Callable[[AdaptiveController], None]) -> None:
+        """Call `fn` after every decision (e.g. to push the timeout into the browser)."""
+        self._listeners.append(fn)
+
+    def _wake(self) -> None:
+        while self._waiters and self._in_flight < self.limit:
+            fut = self._waiters.pop(0)
+            if not fut.done():
+                self._in_flight += 1
+                fut.set_result(None)
+
+    async def acquire(self) -> None:
+        if self._in_flight < self.limit and not self._waiters:
+            self._in_flight += 1
+            return
+        fut: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self.release()
+            elif fut in self._waiters:
+                self._waiters.remove(fut)
+            raise
+
+    def release(self) -> None:
+        self._in_flight -= 1
+        self._wake()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def record(self, latency_sec: float, outcome: str = "ok") -> None:
+        """Report one attempt; `outcome` is ok, timeout, blocked or error."""
+        self._outcomes[outcome] = self._outcomes.get(outcome, 0) + 1
+        if outcome == "ok":
+            self._latencies.append(latency_sec)
+        if sum(self._outcomes.values()) >= max(self.window, self.limit * 2):
+            self._decide()
+
+    def _decide(self) -> None:
+        n = sum(self._outcomes.values())
+        timeouts = self._outcomes.get("timeout", 0) / n
+        errors = self._outcomes.get("error", 0) / n
+        blocked = self._outcomes.get("blocked", 0)
+        p50 = percentile(self._latencies, 0.5)
+        p95 = percentile(self._latencies, 0.95)
+        old_limit, old_timeout = self.limit, self.timeout_sec
+
+        if blocked:
+            reason = f"{blocked} blocked"
+            self.limit = max(self.min_limit, self.limit // 2)
+        elif timeouts > 0.1:
+            reason = f"timeouts {timeouts:.0%}"
+            self.limit = max(self.min_limit, int(self.limit * 0.7))
+            self.timeout_sec = min(self.max_timeout_sec, self.timeout_sec * 1.5)
+        elif errors > 0.2:
+            reason = f"errors {errors:.0%}"
+            self.limit = max(self.min_limit, int(self.limit * 0.7))
+        elif self.best_p50 is not None and p50 > self.best_p50 * 2:
+            reason = f"p50 {p50:.1f}s vs best {self.best_p50:.1f}s"
+            self.limit = max(self.min_limit, int(self.limit * 0.8))
+        else:
+            reason = "healthy"
+            self.limit = min(self.max_limit, self.limit + 1)
+            if self._latencies:
+                self.timeout_sec = min(self.max_timeout_sec, max(self.min_timeout_sec, p95 * 3))
+        if self._latencies:
+            self.best_p50 = p50 if self.best_p50 is None else min(self.best_p50, p50)
+
+        if self.limit > old_limit:
+            self.increases += 1
+        elif self.limit < old_limit:
+            self.decreases += 1
+        self.peak = max(self.peak, self.limit)
+        if self.limit != old_limit or abs(self.timeout_sec - old_timeout) >= 1:
+            self.log(
+                f"Adaptive: concurrency {old_limit} -> {self.limit}, "
+                f"timeout {old_timeout:.0f}s -> {self.timeout_sec:.0f}s "
+                f"({reason}; p50 {p50:.1f}s, p95 {p95:.1f}s over {n} attempts)"
+            )
+        self._latencies.clear()
+        self._outcomes.clear()
+        for fn in self._listeners:
+            fn(self)
+        self._wake()
+
+    def summary(self) -> str:
+        return (
+            f"Adaptive concurrency: settled at {self.limit} (peak {self.peak}, "
+            f"bounds {self.min_limit}-{self.max_limit}), {self.increases} increases / "
+            f"{self.decreases} decreases, timeout {self.timeout_sec:.0f}s"
+        )
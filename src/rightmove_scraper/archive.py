@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+from collections.abc import Iterator
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import zstandard
+
+from .utils import RIGHTMOVE_URL_RE
+
+if TYPE_CHECKING:
+    from .fieldprofile import FieldProfiler
+    from .models import Listing
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    id INTEGER PRIMARY KEY,
+    rightmove_id TEXT,
+    url TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    fetched_at TEXT NOT NULL,
+    raw_bytes INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_rid_time ON pages (rightmove_id, fetched_at);
+CREATE INDEX IF NOT EXISTS pages_kind_time ON pages (kind, fetched_at);
+"""
+
+
+class HtmlArchive:
+    """Content-addressed, zstd-compressed store of fetched pages.
+
+    Layout under `root`:
+      blobs/ab/<sha256>.html.zst   one blob per distinct page body
+      index.db                     SQLite index of every fetch (rightmove_id, url, kind, time)
+
+    Identical bodies are stored once; every fetch still gets an index row.
+    """
+
+    def __init__(self, root: str, *, level: int = 6) -> None:
+        self.root = Path(root)
+        (self.root / "blobs").mkdir(parents=True, exist_ok=True)
+        self.level = level
+        self._lock = threading.Lock()
+        self._con = sqlite3.connect(self.root / "index.db", check_same_thread=False)
+        self._con.execute("PRAGMA journal_mode=WAL")
+        self._con.executescript(_SCHEMA)
+        self.stored = 0
+        self.deduped = 0
+
+    def _blob_path(self, sha: str) -> Path:
+        return self.root / "blobs" / sha[:2] / f"{sha}.html.zst"
+
+    def put(
+        self, url: str, content: str, kind: str = "listing", fetched_at: str | None = None
+    ) -> str:
+        raw = content.encode("utf-8")
+        sha = hashlib.sha256(raw).hexdigest()
+        path = self._blob_path(sha)
+        if path.exists():
+            self.deduped += 1
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".tmp{os.getpid()}.{threading.get_ident()}")
+            tmp.write_bytes(zstandard.ZstdCompressor(level=self.level).compress(raw))
+            os.replace(tmp, path)
+            self.stored += 1
+        m = RIGHTMOVE_URL_RE.match(url)
+        with self._lock:
+            self._con.execute(
+                "INSERT INTO pages (rightmove_id, url, kind, sha256, fetched_at, raw_bytes)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    m.group(2) if m else None,
+                    url,
+                    kind,
+                    sha,
+                    fetched_at or datetime.now(UTC).isoformat(),
+                    len(raw),
+                ),
+            )
+            self._con.commit()
+        return sha
+
+    async def aput(self, url: str, content: str, kind: str = "listing") -> str:
+        """Archive from async code without blocking the event loop on compression and disk I/O."""
+        return await asyncio.to_thread(self.put, url, content, kind)
+
+    def get(self, sha: str) -> str:
+        return read_blob(self.root, sha)
+
+    def latest_listings(self, since: str | None = None) -> Iterator[tuple[str, str, str, str]]:
+        """Yield (rightmove_id, url, sha256, fetched_at) for the newest fetch of each listing."""
+        sql = (
+            "SELECT rightmove_id, url, sha256, MAX(fetched_at) FROM pages "
+            "WHERE kind = 'listing' AND rightmove_id IS NOT NULL"
+        )
+        params: tuple = ()
+        if since:
+            sql += " AND fetched_at >= ?"
+            params = (since,)
+        sql += " GROUP BY rightmove_id ORDER BY rightmove_id"
+        with self._lock:
+            rows = self._con.execute(sql, params).fetchall()
+        yield from rows
+
+    def close(self) -> None:
+        with self._lock:
+            self._con.close()
+
+
+def read_blob(root: str | Path, sha: str) -> str:
+    path = Path(root) / "blobs" / sha[:2] / f"{sha}.html.zst"
+    return zstandard.ZstdDecompressor().decompress(path.read_bytes()).decode("utf-8")
+
+
+def reextract(root: str, rightmove_id: str, url: str, sha: str, fetched_at: str) -> Listing:
+    """Re-run the listing extractors over one archived page (process-pool worker)."""
+    from .scrape_listing import parse_listing
+
+    listing = parse_listing(read_blob(root, sha), url)
+    return listing.model_copy(update={"rightmove_id": rightmove_id, "timestamp": fetched_at})
+
+
+def reextract_profiled(
+    root: str, rightmove_id: str, url: str, sha: str, fetched_at: str
+) -> tuple[Listing, FieldProfiler]:
+    """Like `reextract`, also returning the page's FieldProfiler for the parent to merge."""
+    from .fieldprofile import FieldProfiler
+    from .scrape_listing import parse_listing
+
+    profile = FieldProfiler()
+    listing = parse_listing(read_blob(root, sha), url, profile=profile)
+    return (
+        listing.model_copy(update={"rightmove_id": rightmove_id, "timestamp": fetched_at}),
+        profile,
+    )
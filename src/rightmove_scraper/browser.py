@@ -1,11 +1,27 @@
 from __future__ import annotations
 
+import re
+import time
+import weakref
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
 
-from playwright.async_api import Browser, BrowserContext, Page, async_playwright
+from playwright.async_api import Browser, BrowserContext, Page, Response, Route, async_playwright
 
 from .config import AppConfig
+from .metrics import StageTrace
+from .netpolicy import NetworkPolicyEngine, get_policy
+
+# Contexts whose cookie banner has been accepted; consent cookies are shared by all
+# pages in a context, so later navigations can skip the banner wait.
+_CONSENTED: weakref.WeakSet[BrowserContext] = weakref.WeakSet()
+_ENGINES: weakref.WeakKeyDictionary[BrowserContext, NetworkPolicyEngine] = (
+    weakref.WeakKeyDictionary()
+)
+
+_RIGHTMOVE_RE = re.compile(r"^https?://([a-z0-9-]+\.)*rightmove\.co\.uk(/|$)")
+_WWW_RE = re.compile(r"^https?://(www\.)?rightmove\.co\.uk")
 
 
 @asynccontextmanager
@@ -18,12 +34,11 @@ async def browser_context(config: AppConfig) -> AsyncIterator[tuple[Browser, Bro
         )
         # Apply default timeout to the entire context so all pages inherit it
         context.set_default_timeout(config.request_timeout_sec * 1000)
-        page = await context.new_page()
-        # Block heavy resources for speed
-        try:
-            await context.route("**/*", lambda route: route.abort() if route.request.resource_type in {"image", "media", "font"} else route.continue_())
-        except Exception:
-            pass
+        # Block heavy resources for speed, inside the browser rather than via a Python route handler
+        _ENGINES[context] = NetworkPolicyEngine(get_policy(config.net_policy, config.net_allow))
+        if config.base_url:
+            await route_to_base_url(context, config.base_url)
+        page = await new_page(context)
         try:
             yield browser, context, page
         finally:
@@ -31,13 +46,60 @@ async def browser_context(config: AppConfig) -> AsyncIterator[tuple[Browser, Bro
             await browser.close()
 
 
-async def open_page(page: Page, url: str) -> None:
-    await page.goto(url, wait_until="domcontentloaded")
+async def route_to_base_url(context: BrowserContext, base_url: str) -> None:
+    """Serve www.rightmove.co.uk from `base_url` (a local stand-in) and drop other Rightmove hosts.
+
+    Pages keep their real URLs, so links and extracted ids look the same as on
+    the live site, and nothing reaches rightmove.co.uk.
+    """
+    base = base_url.rstrip("/")
+
+    async def handle(route: Route) -> None:
+        url = route.request.url
+        if not _WWW_RE.match(url):
+            # Photos and floorplans on media.rightmove.co.uk
+            await route.abort()
+            return
+        try:
+            response = await route.fetch(url=_WWW_RE.sub(base, url, count=1))
+        except Exception:
+            await route.abort("connectionrefused")
+            return
+        await route.fulfill(response=response)
+
+    await context.route(_RIGHTMOVE_RE, handle)
+
+
+def policy_engine(context: BrowserContext) -> NetworkPolicyEngine | None:
+    return _ENGINES.get(context)
+
+
+async def new_page(context: BrowserContext) -> Page:
+    """Open a page with the context's network policy installed before any navigation."""
+    page = await context.new_page()
+    engine = _ENGINES.get(context)
+    if engine is not None:
+        try:
+            await engine.install(page)
+        except Exception:
+            pass
+    return page
+
+
+async def open_page(page: Page, url: str, trace: StageTrace | None = None) -> Response | None:
+    trace = trace or StageTrace()
+    with trace("goto"):
+        response = await page.goto(url, wait_until="domcontentloaded")
+    if page.context in _CONSENTED:
+        return response
     # Try accept cookies if present
-    try:
-        await page.get_by_role("button", name="Accept all").click(timeout=1500)
-    except Exception:
-        pass
+    with trace("cookie"):
+        try:
+            await page.get_by_role("button", name="Accept all").click(timeout=1500)
+            _CONSENTED.add(page.context)
+        except Exception:
+            pass
+    return response
 
 
 async def wait_for_text(page: Page, text: str) -> None:
@@ -55,15 +117,67 @@ async def maybe_click(page: Page, text: str) -> bool:
     return False
 
 
-async def wait_for_any_text(page: Page, texts: list[str], timeout_ms: int | None = None) -> None:
-    last_err = None
-    for t in texts:
-        try:
-            await page.get_by_text(t, exact=False).first.wait_for(timeout=timeout_ms)
-            return
-        except Exception as e:
-            last_err = e
-    if last_err:
-        raise last_err
+# Polls the rendered text and resolves once any marker is present, so every marker
+# races in one browser-side wait instead of one sequential wait per marker. The
+# full set present at that moment identifies the page variant.
+_FIRST_MARKER_JS = """
+(markers) => {
+  const text = (document.body && document.body.innerText || "").toLowerCase();
+  const present = markers.filter((m) => text.includes(m.toLowerCase()));
+  return present.length ? present : null;
+}
+"""
 
 
+@dataclass(slots=True)
+class ReadinessStats:
+    """How long pages took to show any readiness marker, and which markers were present."""
+
+    variants: dict[tuple[str, ...], int] = field(default_factory=dict)
+    wait_ms: dict[tuple[str, ...], float] = field(default_factory=dict)
+    max_ms: dict[tuple[str, ...], float] = field(default_factory=dict)
+    present: dict[str, int] = field(default_factory=dict)
+    timeouts: int = 0
+
+    def record(self, present: tuple[str, ...], ms: float) -> None:
+        """Count one ready page; `present` is every marker seen when the wait resolved."""
+        variant = tuple(sorted(present))
+        self.variants[variant] = self.variants.get(variant, 0) + 1
+        self.wait_ms[variant] = self.wait_ms.get(variant, 0.0) + ms
+        self.max_ms[variant] = max(self.max_ms.get(variant, 0.0), ms)
+        for marker in present:
+            self.present[marker] = self.present.get(marker, 0) + 1
+
+    def summary(self) -> str:
+        parts = [
+            f"{'+'.join(v)!r} {n}x wait avg {self.wait_ms[v] / n:.0f} ms (max {self.max_ms[v]:.0f})"
+            for v, n in sorted(self.variants.items(), key=lambda kv: -kv[1])
+        ]
+        return f"Readiness variants: {', '.join(parts) or 'none'}; {self.timeouts} timed out"
+
+
+async def wait_for_any_text(
+    page: Page,
+    texts: list[str],
+    timeout_ms: int | None = None,
+    *,
+    stats: ReadinessStats | None = None,
+) -> str:
+    """Wait until any of `texts` is rendered and return the first of them present.
+
+    With `stats`, every marker present at that moment and the time spent
+    waiting are recorded.
+    """
+    t0 = time.perf_counter()
+    try:
+        handle = await page.wait_for_function(
+            _FIRST_MARKER_JS, arg=list(texts), polling=100, timeout=timeout_ms
+        )
+    except Exception:
+        if stats is not None:
+            stats.timeouts += 1
+        raise
+    present = await handle.json_value()
+    if stats is not None:
+        stats.record(tuple(present), (time.perf_counter() - t0) * 1000)
+    return present[0]
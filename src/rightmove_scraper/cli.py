@@ -1,49 +1,198 @@
 from __future__ import annotations
 
 import asyncio
+import json
 import os
 import re
+import socket
+from collections.abc import AsyncIterator, Callable
 from datetime import UTC, datetime
 from pathlib import Path
+from typing import Any
 
 import typer
 from rich.console import Console
 
+from .archive import HtmlArchive, reextract, reextract_profiled
 from .browser import browser_context
 from .compliance import assert_personal_use_banner, discovery_enabled
 from .config import load_config
-from .datastore import write_records
+from .datastore import STREAM_FORMATS, RecordSink, write_records
 from .discovery import (
     build_london_search_url,
     build_search_url,
     extract_listing_urls_from_search,
+    extract_search_cards,
     extract_total_results_from_search,
 )
+from .fieldprofile import FieldProfiler, report_rows
+from .fingerprints import FingerprintStore
+from .frontier import Frontier
 from .logging_setup import setup_logging
-from .scrape_listing import scrape
+from .metrics import ChildRssSampler, StageMetrics
+from .models import Listing
+from .netpolicy import PRESETS as NET_POLICIES
+from .procpool import parse_workers, run_sharded
+from .ratelimit import RateLimiter
+from .runner import RunStats, ScrapeOptions, run_scrape
 from .seeds import load_seeds
+from .sharding import assign_shards, imbalance, predict_costs, shard_loads
 from .slicer import BOROUGH_TO_DISTRICTS, Slice, borough_slices, partition
-from .utils import dedupe_preserve_order, extract_rightmove_id, polite_sleep
+from .standin import StandInProcess, StandInSettings, make_server
+from .supervisor import BrowserSupervisor
+from .utils import dedupe_preserve_order, extract_rightmove_id
 
 app = typer.Typer(add_completion=False, help="Rightmove personal research scraper")
 
 
 @app.command("scrape-seeds")
 def scrape_seeds(
-    input: str = typer.Option(..., "--input", help="CSV/TXT with header 'url' column or lines"),
+    input: str | None = typer.Option(
+        None, "--input", help="CSV/TXT with header 'url' column or lines (optional with --frontier)"
+    ),
     out: str = typer.Option("./out", "--out", help="Output directory"),
-    format: str = typer.Option("csv", "--format", help="csv|parquet|sqlite"),
+    format: str = typer.Option(
+        "csv", "--format", help="csv|parquet|sqlite|ndjson|ndjson.gz|ndjson.zst"
+    ),
     max: int = typer.Option(25, "--max", min=1, help="Max URLs to scrape"),
     headless: bool | None = typer.Option(None, help="Override headless"),
-    concurrency: int = typer.Option(1, "--concurrency", min=1, max=5, help="Parallel pages"),
+    concurrency: int = typer.Option(
+        1, "--concurrency", min=1, max=5, help="Parallel pages (starting point with --adaptive)"
+    ),
+    adaptive: bool = typer.Option(
+        False,
+        "--adaptive",
+        help="Tune concurrency and timeouts live from latency, timeouts and blocked responses",
+    ),
+    min_concurrency: int = typer.Option(
+        1, "--min-concurrency", min=1, help="Lower bound for --adaptive"
+    ),
+    max_concurrency: int = typer.Option(
+        8, "--max-concurrency", min=1, max=16, help="Upper bound for --adaptive"
+    ),
     timeout: int = typer.Option(20, "--timeout", min=5, help="Per-page timeout seconds"),
-    batch_size: int | None = typer.Option(None, "--batch-size", min=1, help="If set, write batch outputs after every N scraped records"),
-    batch_dir: str | None = typer.Option(None, "--batch-dir", help="Directory for batch outputs; defaults to <out>/batches"),
+    batch_size: int | None = typer.Option(
+        None,
+        "--batch-size",
+        min=1,
+        help="If set, write batch outputs after every N scraped records; the main output "
+        "is appended at the same interval (default every 100 records or 2s)",
+    ),
+    batch_dir: str | None = typer.Option(
+        None, "--batch-dir", help="Directory for batch outputs; defaults to <out>/batches"
+    ),
+    page_recycle: int = typer.Option(
+        50, "--page-recycle", min=1, help="Replace a pooled page after N navigations"
+    ),
+    engine: str = typer.Option(
+        "browser",
+        "--engine",
+        help="browser|http (http fetches server HTML and falls back to the browser)",
+    ),
+    net_policy: str | None = typer.Option(
+        None,
+        "--net-policy",
+        help="Resource blocking preset: none|media|lean|strict (default NET_POLICY or media)",
+    ),
+    net_allow: str | None = typer.Option(
+        None, "--net-allow", help="Comma-separated domains the network policy must never block"
+    ),
+    workers: str = typer.Option(
+        "1",
+        "--workers",
+        help="Worker processes, each with its own browser; 'auto' sizes to CPUs and memory",
+    ),
+    extract: str = typer.Option(
+        "dom",
+        "--extract",
+        help="dom|eval (eval expands and extracts in one in-page script, skipping page.content())",
+    ),
+    retries: int = typer.Option(
+        2,
+        "--retries",
+        min=0,
+        help="Re-queue a URL up to N times after a timeout, "
+        "navigation, blocked or extraction failure",
+    ),
+    max_restarts: int = typer.Option(
+        5,
+        "--max-restarts",
+        min=0,
+        help="Relaunch a crashed browser at most N times per hour before stopping",
+    ),
+    archive: str | None = typer.Option(
+        None,
+        "--archive",
+        help="Directory for a compressed archive of fetched pages (default ARCHIVE_DIR)",
+    ),
+    frontier: str | None = typer.Option(
+        None,
+        "--frontier",
+        help="SQLite frontier file; seeds are enqueued there "
+        "and a rerun resumes where the last one stopped",
+    ),
+    retry_failed: bool = typer.Option(
+        False,
+        "--retry-failed",
+        help="With --frontier, put previously failed URLs back in the queue",
+    ),
+    fingerprints: str | None = typer.Option(
+        None,
+        "--fingerprints",
+        help="Card fingerprint file written by discovery; successful scrapes are recorded there",
+    ),
+    skip_unchanged_days: float | None = typer.Option(
+        None,
+        "--skip-unchanged-days",
+        min=0,
+        help="With --fingerprints, skip listings whose search "
+        "card is unchanged since a scrape within N days",
+    ),
+    lease_batch: int | None = typer.Option(
+        None,
+        "--lease-batch",
+        min=1,
+        help="With --frontier, share the queue with other "
+        "scrape-seeds processes by leasing N URLs at a time",
+    ),
+    lease_ttl: float = typer.Option(
+        120,
+        "--lease-ttl",
+        min=10,
+        help="Seconds a lease lasts without a heartbeat before other workers may take its URLs",
+    ),
+    worker_id: str | None = typer.Option(
+        None,
+        "--worker-id",
+        help="Lease owner name and output subdirectory (default <hostname>-<pid>)",
+    ),
+    metrics_file: str | None = typer.Option(
+        None,
+        "--metrics-file",
+        help="Prometheus textfile with per-stage latency histograms, refreshed during the run",
+    ),
+    metrics_json: str | None = typer.Option(
+        None,
+        "--metrics-json",
+        help="Write per-stage p50/p95/p99 timings as JSON at the end of the run",
+    ),
+    profile_extractors: str | None = typer.Option(
+        None,
+        "--profile-extractors",
+        help="JSON file accumulating which extractor strategy "
+        "filled each field and its cost (see extractor-report)",
+    ),
 ):
     """Scrape property detail pages from a list of seed URLs."""
-    cfg_overrides = {}
+    cfg_overrides: dict = {}
     if headless is not None:
         cfg_overrides["headless"] = headless
+    if net_policy is not None:
+        cfg_overrides["net_policy"] = net_policy
+    if net_allow is not None:
+        cfg_overrides["net_allow"] = [d.strip() for d in net_allow.split(",") if d.strip()]
+    if archive is not None:
+        cfg_overrides["archive_dir"] = archive
     cfg_overrides["output_dir"] = out
     cfg_overrides["output_format"] = format
     cfg_overrides["request_timeout_sec"] = timeout
@@ -52,77 +201,268 @@ def scrape_seeds(
     setup_logging(cfg.log_level)
     assert_personal_use_banner()
 
-    urls = load_seeds(input)[:max]
-    if not urls:
-        typer.echo("No valid seed URLs found.")
-        raise typer.Exit(code=1)
+    if engine not in {"browser", "http"}:
+        typer.echo("--engine must be 'browser' or 'http'")
+        raise typer.Exit(code=2)
+    if extract not in {"dom", "eval"}:
+        typer.echo("--extract must be 'dom' or 'eval'")
+        raise typer.Exit(code=2)
+    if cfg.net_policy not in NET_POLICIES:
+        typer.echo(f"--net-policy must be one of: {', '.join(NET_POLICIES)}")
+        raise typer.Exit(code=2)
+    try:
+        n_workers = parse_workers(workers)
+    except ValueError:
+        typer.echo("--workers must be a positive integer or 'auto'")
+        raise typer.Exit(code=2) from None
+
+    if format not in STREAM_FORMATS:
+        typer.echo(f"--format must be one of: {'|'.join(STREAM_FORMATS)}")
+        raise typer.Exit(code=2)
+    if input is None and frontier is None:
+        typer.echo("Provide --input, --frontier or both.")
+        raise typer.Exit(code=2)
 
-    console = Console()
-    records: list = []
-    Path(cfg.output_dir).mkdir(parents=True, exist_ok=True)
+    if lease_batch is not None and frontier is None:
+        typer.echo("--lease-batch needs a shared --frontier file")
+        raise typer.Exit(code=2)
+    if lease_batch is not None and n_workers > 1:
+        typer.echo(
+            "--lease-batch coordinates separate processes; start several instead of using --workers"
+        )
+        raise typer.Exit(code=2)
 
-    async def _run():
-        from .models import Listing
-        sem = asyncio.Semaphore(concurrency)
-        batch_records: list = []
-        batches_written: int = 0
-
-        def _flush_batch():
-            nonlocal batch_records, batches_written
-            if not batch_size or not batch_records:
-                return
-            target_dir = batch_dir or os.path.join(cfg.output_dir, "batches")
-            Path(target_dir).mkdir(parents=True, exist_ok=True)
-            out_path = os.path.join(target_dir, f"listings_batch_{batches_written + 1:03d}.{cfg.output_format}")
-            import pandas as _pd
-            df = _pd.DataFrame([r.model_dump() for r in batch_records])
-            if not df.empty:
-                df = df.drop_duplicates(subset=["rightmove_id"], keep="last")
-            if cfg.output_format == "csv":
-                df.to_csv(out_path, index=False)
-            elif cfg.output_format == "parquet":
-                df.to_parquet(out_path, index=False)
-            elif cfg.output_format == "sqlite":
-                import sqlite3 as _sqlite3
-                db_path = os.path.join(target_dir, f"listings_batch_{batches_written + 1:03d}.db")
-                con = _sqlite3.connect(db_path)
-                df.to_sql("listings", con, if_exists="replace", index=False)
-                con.close()
-                out_path = db_path
-            console.log(f"Wrote batch of {len(batch_records)} to {out_path}")
-            batches_written += 1
-            batch_records.clear()
-
-        async with browser_context(cfg) as (_, context, _):
-            async def worker(idx: int, url: str):
-                nonlocal batch_records, batches_written
-                async with sem:
-                    try:
-                        page = await context.new_page()
-                        try:
-                            listing: Listing | None = await scrape(page, url)
-                        finally:
-                            await page.close()
-                        if listing is not None:
-                            records.append(listing)
-                            if batch_size:
-                                batch_records.append(listing)
-                                if len(batch_records) >= batch_size:
-                                    _flush_batch()
-                            console.log(f"[{idx}/{len(urls)}] scraped: {url}")
-                    except Exception as e:
-                        console.log(f"Error scraping {url}: {e}")
-                    finally:
-                        polite_sleep(cfg.min_delay_sec, cfg.max_delay_sec)
-
-            await asyncio.gather(*(worker(idx, url) for idx, url in enumerate(urls, 1)))
-            # Final flush
-            _flush_batch()
+    console = Console()
+    cards = FingerprintStore(fingerprints) if fingerprints else None
+    store: Frontier | None = None
+
+    def _skip_unchanged(urls: list[str]) -> list[str]:
+        if cards is None or skip_unchanged_days is None:
+            return urls
+        unchanged = cards.unchanged((extract_rightmove_id(u) for u in urls), skip_unchanged_days)
+        if unchanged:
+            urls = [u for u in urls if extract_rightmove_id(u) not in unchanged]
+            if store is not None:
+                store.mark_done(unchanged)
+            console.log(f"Skipping {len(unchanged)} listings with unchanged search cards")
+        return urls
+
+    owner = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    urls: list[str] = []
+    if frontier is not None:
+        store = Frontier(frontier)
+        if input is not None:
+            added = store.enqueue(load_seeds(input))
+            console.log(f"Enqueued {added} new URLs into {frontier}")
+        if lease_batch is None:
+            recovered = store.recover()
+            if recovered:
+                console.log(f"Resuming {recovered} URLs left in flight by an interrupted run")
+        if retry_failed:
+            console.log(f"Retrying {store.retry_failed()} previously failed URLs")
+        if lease_batch is None:
+            urls = store.claim(max)
+        console.log(f"Frontier: {store.counts()}")
+    else:
+        assert input is not None, "checked above"
+        urls = load_seeds(input)[:max]
+    urls = _skip_unchanged(urls)
+    if not urls and lease_batch is None:
+        typer.echo(
+            "No valid seed URLs found." if store is None else "Nothing pending in the frontier."
+        )
+        raise typer.Exit(code=1)
 
-    asyncio.run(_run())
+    async def _leased() -> AsyncIterator[str]:
+        # Claim small batches as the workers drain the queue; once nothing is
+        # claimable, linger while other workers still hold live leases in case
+        # one of them dies and its URLs expire back to us
+        assert store is not None and lease_batch is not None, "checked above"
+        claimed = 0
+        waiting = False
+        while claimed < max:
+            # Off the event loop: SQLite may wait up to 30 s on another worker's write lock
+            limit = min(lease_batch, max - claimed)
+            batch = await asyncio.to_thread(store.lease, owner, limit, lease_ttl)
+            if not batch:
+                _mark_flushed()
+                others = await asyncio.to_thread(store.leased_elsewhere, owner)
+                if not others:
+                    return
+                if not waiting:
+                    console.log(
+                        f"Frontier drained; waiting on {others} URLs leased by other workers"
+                    )
+                    waiting = True
+                await asyncio.sleep(min(lease_ttl / 4, 10))
+                continue
+            waiting = False
+            claimed += len(batch)
+            for url in _skip_unchanged(batch):
+                yield url
+
+    async def _run_leased() -> RunStats:
+        async def beat() -> None:
+            assert store is not None, "checked above"
+            while True:
+                await asyncio.sleep(lease_ttl / 3)
+                await asyncio.to_thread(store.heartbeat, owner, lease_ttl)
 
-    out_path = write_records(records, cfg.output_dir, cfg.output_format)
-    console.log(f"Wrote {len(records)} records to {out_path}")
+        heartbeat = asyncio.create_task(beat())
+        try:
+            return await run_scrape(
+                cfg, _leased(), opts, on_record,
+                log=console.log, on_failure=on_failure, on_timing=on_timing,
+                metrics=metrics, profile=profile,
+            )
+        finally:
+            heartbeat.cancel()
+
+    # Leased workers may share --out, so each appends to its own file
+    sink_dir = cfg.output_dir
+    if lease_batch is not None:
+        sink_dir = os.path.join(cfg.output_dir, "workers", owner)
+    metrics = StageMetrics()
+    profile = FieldProfiler() if profile_extractors else None
+    if profile is not None and extract == "eval":
+        console.log(
+            "--profile-extractors only sees pages that fall back from --extract eval "
+            "to the DOM extractors"
+        )
+    sink = RecordSink(sink_dir, cfg.output_format, flush_every=batch_size or 100, metrics=metrics)
+    batch_records: list[Listing] = []
+    batches_written = 0
+
+    def _flush_batch() -> None:
+        nonlocal batches_written
+        if not batch_size or not batch_records:
+            return
+        out_path = write_records(
+            batch_records,
+            batch_dir or os.path.join(sink_dir, "batches"),
+            cfg.output_format,
+            name=f"listings_batch_{batches_written + 1:03d}",
+        )
+        console.log(f"Wrote batch of {len(batch_records)} to {out_path}")
+        batches_written += 1
+        batch_records.clear()
+
+    durations: dict[str, float] = {}
+
+    def _mark_flushed() -> None:
+        # Only rows the sink has written count as done, so a kill loses nothing
+        ids = sink.take_flushed()
+        if not ids:
+            return
+        if store is not None:
+            store.mark_done(ids)
+            store.record_durations((rid, durations.pop(rid)) for rid in ids if rid in durations)
+        if cards is not None:
+            cards.mark_scraped(ids)
+
+    def on_record(listing: Listing) -> None:
+        sink.put(listing)
+        _mark_flushed()
+        if batch_size:
+            batch_records.append(listing)
+            if len(batch_records) >= batch_size:
+                _flush_batch()
+
+    opts = ScrapeOptions(
+        concurrency=concurrency,
+        adaptive=adaptive,
+        min_concurrency=min_concurrency,
+        max_concurrency=max_concurrency,
+        engine=engine,
+        page_recycle=page_recycle,
+        extract=extract,
+        archive_dir=cfg.archive_dir,
+        retries=retries,
+        max_restarts_per_hour=max_restarts,
+        metrics_file=metrics_file,
+    )
+    on_failure = store.mark_failed if store is not None else None
+
+    def on_timing(url: str, seconds: float) -> None:
+        # Per-URL latency feeds cost-balanced shard-seeds on later runs
+        if store is not None:
+            durations[extract_rightmove_id(url)] = seconds * 1000
+
+    try:
+        if lease_batch is not None:
+            console.log(
+                f"Worker {owner} claiming {lease_batch} URLs at a time with {lease_ttl:.0f}s leases"
+            )
+            stats = asyncio.run(_run_leased())
+        elif n_workers > 1:
+            console.log(f"Sharding {len(urls)} URLs across {n_workers} worker processes")
+            stats = run_sharded(
+                cfg, urls, opts, on_record,
+                workers=n_workers, on_failure=on_failure, on_timing=on_timing,
+                metrics=metrics, profile=profile,
+            )
+        else:
+            stats = asyncio.run(
+                run_scrape(
+                    cfg, urls, opts, on_record,
+                    total=len(urls), log=console.log, on_failure=on_failure, on_timing=on_timing,
+                    metrics=metrics, profile=profile,
+                )
+            )
+    finally:
+        _flush_batch()
+        # Rows flushed before a crash still count as done
+        out_path = sink.close()
+        _mark_flushed()
+    for note in stats.notes:
+        console.log(note)
+    console.log(stats.summary())
+    replaced = ""
+    if sink.replaced:
+        replaced = f" ({sink.replaced} replace rows written earlier in the run)"
+    console.log(f"Wrote {sink.written} records to {out_path}{replaced}")
+    if metrics_file:
+        metrics.write_textfile(metrics_file)
+    if metrics_json:
+        metrics.write_json(metrics_json)
+        console.log(f"Wrote stage timings to {metrics_json}")
+    if profile is not None and profile_extractors:
+        profile.save(profile_extractors)
+        console.log(f"Added {profile.listings} profiled listings to {profile_extractors}")
+    if store is not None:
+        if lease_batch is not None:
+            released = store.release(owner)
+            if released:
+                console.log(f"Released {released} unfinished URLs back to the frontier")
+        console.log(f"Frontier: {store.counts()}")
+        store.close()
+    if cards is not None:
+        cards.close()
+
+
+@app.command("frontier-status")
+def frontier_status(
+    frontier: str = typer.Option(..., "--frontier", help="SQLite frontier file"),
+    show_failed: int = typer.Option(
+        10, "--show-failed", min=0, help="List the N most recent failures"
+    ),
+) -> None:
+    """Show how many URLs are pending, in flight, done and failed."""
+    if not Path(frontier).exists():
+        typer.echo(f"Frontier not found: {frontier}")
+        raise typer.Exit(code=1)
+    store = Frontier(frontier)
+    for state, n in store.counts().items():
+        typer.echo(f"{state}: {n}")
+    for owner, n, expires_in in store.leases():
+        if expires_in >= 0:
+            status = f"expires in {expires_in:.0f}s"
+        else:
+            status = f"expired {-expires_in:.0f}s ago"
+        typer.echo(f"lease {owner}: {n} URLs, {status}")
+    for rid, url, attempts, error in store.failures(show_failed):
+        typer.echo(f"{rid}\t{attempts} attempts\t{error or ''}\t{url}")
+    store.close()
 
 
 @app.command("shard-seeds")
@@ -130,14 +470,44 @@ def shard_seeds(
     input: str = typer.Option(..., "--input", help="Path to seeds CSV/TXT with 'url' header or one URL per line"),
     shards: int = typer.Option(20, "--shards", min=1, help="Number of output shards"),
     out: str = typer.Option("./out/shards", "--out", help="Directory to write shard_XX.csv files"),
+    mode: str = typer.Option(
+        "contiguous",
+        "--mode",
+        help="contiguous|hash (hash keeps each rightmove_id on the same shard across runs)",
+    ),
+    history: str | None = typer.Option(
+        None,
+        "--history",
+        help="With --mode hash, frontier file whose recorded "
+        "scrape times balance shards by expected wall-clock",
+    ),
+    groups: str | None = typer.Option(
+        None,
+        "--groups",
+        help="Per-slice CSV file or directory (rightmove_id,slicer_name) "
+        "so unseen URLs get their slice's median time",
+    ),
+    load_factor: float = typer.Option(
+        1.05,
+        "--load-factor",
+        min=1.0,
+        help="With --mode hash, cap each shard at this multiple of the mean load",
+    ),
 ):
-    """Split a seeds file into N ordered shards with roughly equal sizes.
+    """Split a seeds file into N shards.
 
-    Each shard is written as CSV with a single 'url' header, preserving original order.
+    contiguous: ordered chunks with roughly equal sizes.
+    hash: consistent hashing of rightmove_id with bounded load, by URL count or,
+    with --history, by predicted scrape time. Each shard is written as CSV with a
+    single 'url' header, preserving original order.
     """
     import csv as _csv
     from pathlib import Path as _Path
 
+    if mode not in {"contiguous", "hash"}:
+        typer.echo("--mode must be 'contiguous' or 'hash'")
+        raise typer.Exit(code=2)
+
     urls = load_seeds(input)
     n = len(urls)
     _Path(out).mkdir(parents=True, exist_ok=True)
@@ -151,19 +521,50 @@ def shard_seeds(
         typer.echo(f"No URLs found. Wrote {shards} empty shard files to {out}")
         return
 
-    base = n // shards
-    rem = n % shards
-    start = 0
-    for i in range(shards):
-        count = base + (1 if i < rem else 0)
-        part = urls[start : start + count] if count > 0 else []
+    parts: list[list[str]] = [[] for _ in range(shards)]
+    if mode == "hash":
+        ids = [extract_rightmove_id(u) for u in urls]
+        costs = None
+        if history is not None:
+            store = Frontier(history)
+            past = store.durations()
+            store.close()
+            slice_of: dict[str, str] = {}
+            if groups is not None:
+                gp = _Path(groups)
+                for csv_path in sorted(gp.glob("*.csv")) if gp.is_dir() else [gp]:
+                    with csv_path.open(newline="", encoding="utf-8") as f:
+                        for row in _csv.DictReader(f):
+                            if row.get("rightmove_id") and row.get("slicer_name"):
+                                slice_of[row["rightmove_id"]] = row["slicer_name"]
+            costs = predict_costs(ids, past, slice_of)
+            typer.echo(f"Scrape times known for {sum(1 for i in ids if i in past)}/{n} URLs")
+        assignment = assign_shards(ids, shards, costs=costs, load_factor=load_factor)
+        for u, rid in zip(urls, ids, strict=True):
+            parts[assignment[rid]].append(u)
+        loads = shard_loads(assignment, shards, costs)
+        unit = "s predicted" if costs else " URLs"
+        scale = 1000 if costs else 1
+        typer.echo(
+            f"Shard loads: min {min(loads) / scale:.0f}{unit}, max {max(loads) / scale:.0f}{unit} "
+            f"(max/mean {imbalance(loads):.2f})"
+        )
+    else:
+        base = n // shards
+        rem = n % shards
+        start = 0
+        for i in range(shards):
+            count = base + (1 if i < rem else 0)
+            parts[i] = urls[start : start + count]
+            start += count
+
+    for i, part in enumerate(parts):
         shard_path = _Path(out) / f"shard_{i:02d}.csv"
         with shard_path.open("w", newline="", encoding="utf-8") as f:
             w = _csv.writer(f)
             w.writerow(["url"])
             for u in part:
                 w.writerow([u])
-        start += count
     typer.echo(f"Wrote {shards} shards to {out} (total URLs: {n})")
 
 
@@ -177,8 +578,10 @@ def dump_snapshots(
     urls = load_seeds(input)[:limit]
 
     async def _run():
+        limiter = RateLimiter.from_config(cfg)
         async with browser_context(cfg) as (_, __, page):
             for idx, url in enumerate(urls, 1):
+                await limiter.acquire(url)
                 await page.goto(url)
                 content = await page.content()
                 out_dir = Path("tests/fixtures/html")
@@ -229,8 +632,18 @@ def discover_search(
     pages: int = typer.Option(1, "--pages", min=1, help="How many pages to fetch from start-page"),
     all: bool = typer.Option(False, "--all", help="Ignore --pages and paginate until no more results"),
     out: str = typer.Option("./out", "--out"),
+    archive: str | None = typer.Option(
+        None,
+        "--archive",
+        help="Directory for a compressed archive of fetched pages (default ARCHIVE_DIR)",
+    ),
+    fingerprints: str | None = typer.Option(
+        None,
+        "--fingerprints",
+        help="SQLite file recording a price/beds/added fingerprint per search card",
+    ),
 ):
-    cfg = load_config()
+    cfg = load_config({"archive_dir": archive} if archive else None)
     setup_logging(cfg.log_level)
     assert_personal_use_banner()
 
@@ -241,12 +654,16 @@ def discover_search(
     from rich.console import Console
     console = Console()
     urls: list[str] = []
+    store = HtmlArchive(cfg.archive_dir) if cfg.archive_dir else None
+    cards = FingerprintStore(fingerprints) if fingerprints else None
 
     async def _run():
+        limiter = RateLimiter.from_config(cfg)
         async with browser_context(cfg) as (_, __, page):
             p = start_page
             while True:
                 url = build_london_search_url(query=query, min_price=min_price, max_price=max_price, property_type=property_type, page=p)
+                await limiter.acquire(url)
                 await page.goto(url)
                 # Try to accept cookies/banner if present
                 try:
@@ -259,10 +676,13 @@ def discover_search(
                 except Exception:
                     pass
                 content = await page.content()
+                if store is not None:
+                    await store.aput(url, content, kind="search")
                 page_urls = extract_listing_urls_from_search(content)
+                if cards is not None:
+                    cards.record_cards(extract_search_cards(content))
                 console.log(f"Page {p}: found {len(page_urls)} property URLs")
                 urls.extend(page_urls)
-                polite_sleep(cfg.min_delay_sec, cfg.max_delay_sec)
                 if all:
                     if not page_urls:
                         break
@@ -273,7 +693,13 @@ def discover_search(
                     break
                 p += 1
 
-    asyncio.run(_run())
+    try:
+        asyncio.run(_run())
+    finally:
+        if store is not None:
+            store.close()
+        if cards is not None:
+            cards.close()
 
     # Write URLs to seeds.csv compatible file
     import csv as _csv
@@ -300,73 +726,144 @@ def scrape_search(
     out: str = typer.Option("./out", "--out"),
     format: str = typer.Option("csv", "--format"),
     max: int = typer.Option(50, "--max", min=1),
+    engine: str = typer.Option(
+        "browser",
+        "--engine",
+        help="browser|http (http fetches server HTML and falls back to the browser)",
+    ),
+    archive: str | None = typer.Option(
+        None,
+        "--archive",
+        help="Directory for a compressed archive of fetched pages (default ARCHIVE_DIR)",
+    ),
+    fingerprints: str | None = typer.Option(
+        None,
+        "--fingerprints",
+        help="SQLite file recording a price/beds/added fingerprint per search card",
+    ),
+    concurrency: int = typer.Option(
+        2, "--concurrency", min=1, max=5, help="Parallel pages (starting point with --adaptive)"
+    ),
+    adaptive: bool = typer.Option(
+        False,
+        "--adaptive",
+        help="Tune concurrency and timeouts live from latency, timeouts and blocked responses",
+    ),
+    max_concurrency: int = typer.Option(
+        8, "--max-concurrency", min=1, max=16, help="Upper bound for --adaptive"
+    ),
 ):
-    cfg = load_config({"output_dir": out, "output_format": format})
+    cfg_overrides = {"output_dir": out, "output_format": format}
+    if archive is not None:
+        cfg_overrides["archive_dir"] = archive
+    cfg = load_config(cfg_overrides)
     setup_logging(cfg.log_level)
     assert_personal_use_banner()
 
+    if engine not in {"browser", "http"}:
+        typer.echo("--engine must be 'browser' or 'http'")
+        raise typer.Exit(code=2)
+    if format not in STREAM_FORMATS:
+        typer.echo(f"--format must be one of: {'|'.join(STREAM_FORMATS)}")
+        raise typer.Exit(code=2)
+
     if not discovery_enabled():
         typer.echo("Discovery is disabled. Set ALLOW_DISCOVERY=true and create consent.txt in project root to enable.")
         raise typer.Exit(code=2)
 
     from rich.console import Console
     console = Console()
-    discovered: list[str] = []
-
-    async def _discover():
-        async with browser_context(cfg) as (_, __, page):
-            p = start_page
-            while True:
-                url = build_london_search_url(query=query, min_price=min_price, max_price=max_price, property_type=property_type, page=p)
-                await page.goto(url)
-                content = await page.content()
-                page_urls = extract_listing_urls_from_search(content)
-                discovered.extend(page_urls)
-                polite_sleep(cfg.min_delay_sec, cfg.max_delay_sec)
-                if all:
-                    if not page_urls:
-                        break
-                    p += 1
+    discovered: set[str] = set()
+
+    store = HtmlArchive(cfg.archive_dir) if cfg.archive_dir else None
+    cards = FingerprintStore(fingerprints) if fingerprints else None
+
+    async def _discover(supervisor: BrowserSupervisor, limiter: RateLimiter) -> AsyncIterator[str]:
+        # Paginate on the scrape run's own browser, handing each new listing URL
+        # to the detail workers as soon as its search page has been read
+        p = start_page
+        while True:
+            url = build_london_search_url(
+                query=query, min_price=min_price, max_price=max_price,
+                property_type=property_type, page=p,
+            )
+            await limiter.acquire(url)
+            generation = supervisor.generation
+            assert supervisor.pool is not None, "supervisor is running"
+            try:
+                async with supervisor.pool.page() as page:
+                    await page.goto(url)
+                    content = await page.content()
+            except Exception as e:
+                if supervisor.crashed(e):
+                    await supervisor.restart(generation)
                     continue
-                if p >= start_page + pages - 1:
+                console.log(f"Discovery stopped at search page {p}: {e}")
+                return
+            if store is not None:
+                await store.aput(url, content, kind="search")
+            page_urls = extract_listing_urls_from_search(content)
+            if cards is not None:
+                cards.record_cards(extract_search_cards(content))
+            new = [u for u in page_urls if u not in discovered]
+            console.log(f"Search page {p}: {len(page_urls)} listings, {len(new)} new")
+            for u in new:
+                discovered.add(u)
+                yield u
+                if len(discovered) >= max:
+                    return
+            if all:
+                if not page_urls:
                     break
                 p += 1
-
-    asyncio.run(_discover())
+                continue
+            if p >= start_page + pages - 1:
+                break
+            p += 1
+
+    sink = RecordSink(cfg.output_dir, cfg.output_format)
+
+    def _mark_flushed() -> None:
+        # As in scrape-seeds, a listing counts as scraped only once it is on disk
+        ids = sink.take_flushed()
+        if ids and cards is not None:
+            cards.mark_scraped(ids)
+
+    def on_record(listing: Listing) -> None:
+        sink.put(listing)
+        _mark_flushed()
+
+    opts = ScrapeOptions(
+        concurrency=concurrency,
+        adaptive=adaptive,
+        max_concurrency=max_concurrency,
+        engine=engine,
+        archive_dir=cfg.archive_dir,
+    )
+    try:
+        stats = asyncio.run(
+            run_scrape(cfg, _discover, opts, on_record, total=None, log=console.log)
+        )
+    finally:
+        out_path = sink.close()
+        _mark_flushed()
+        if store is not None:
+            store.close()
+        if cards is not None:
+            cards.close()
     if not discovered:
         typer.echo("No listings found.")
         raise typer.Exit(code=1)
-
-    seeds = list(dict.fromkeys(discovered))[:max]
-    console.log(f"Scraping {len(seeds)} discovered listings…")
-
-    records = []
-
-    async def _scrape():
-        from .models import Listing
-        sem = asyncio.Semaphore(2)
-        async with browser_context(cfg) as (_, context, _):
-            async def worker(idx: int, url: str):
-                async with sem:
-                    try:
-                        page = await context.new_page()
-                        try:
-                            listing: Listing | None = await scrape(page, url)
-                        finally:
-                            await page.close()
-                        if listing is not None:
-                            records.append(listing)
-                            console.log(f"[{idx}/{len(seeds)}] scraped: {url}")
-                    except Exception as e:
-                        console.log(f"Error scraping {url}: {e}")
-                    finally:
-                        polite_sleep(cfg.min_delay_sec, cfg.max_delay_sec)
-
-            await asyncio.gather(*(worker(idx, url) for idx, url in enumerate(seeds, 1)))
-
-    asyncio.run(_scrape())
-    out_path = write_records(records, cfg.output_dir, cfg.output_format)
-    console.log(f"Wrote {len(records)} records to {out_path}")
+    for note in stats.notes:
+        console.log(note)
+    console.log(stats.summary())
+    if store is not None:
+        console.log(
+            f"Search page archive: {store.stored} pages stored, {store.deduped} deduplicated"
+        )
+    console.log(
+        f"Wrote {sink.written} records from {len(discovered)} discovered listings to {out_path}"
+    )
 
 
 @app.command("discover-adaptive")
@@ -381,9 +878,22 @@ def discover_adaptive(
     list_only: bool = typer.Option(False, "--list-only", help="Only list available slice names and exit"),
     timeout: int = typer.Option(45, "--timeout", min=10, help="Per-page timeout seconds"),
     out: str = typer.Option("./out", "--out"),
+    archive: str | None = typer.Option(
+        None,
+        "--archive",
+        help="Directory for a compressed archive of fetched pages (default ARCHIVE_DIR)",
+    ),
+    fingerprints: str | None = typer.Option(
+        None,
+        "--fingerprints",
+        help="SQLite file recording a price/beds/added fingerprint per search card",
+    ),
 ):
     """Discover URLs across London using adaptive slicing (borough → district → price)."""
-    cfg = load_config({"request_timeout_sec": timeout})
+    overrides: dict = {"request_timeout_sec": timeout}
+    if archive:
+        overrides["archive_dir"] = archive
+    cfg = load_config(overrides)
     setup_logging(cfg.log_level)
     assert_personal_use_banner()
 
@@ -394,8 +904,13 @@ def discover_adaptive(
     from rich.console import Console
     console = Console()
 
+    limiter = RateLimiter.from_config(cfg)
+    store = HtmlArchive(cfg.archive_dir) if cfg.archive_dir else None
+    cards = FingerprintStore(fingerprints) if fingerprints else None
+
     async def _count(page, location_identifier: str, *, min_price: int | None, max_price: int | None, query: str = "", property_type: str | None = None) -> int:
         url = build_search_url(location_identifier=location_identifier, query=query, min_price=min_price, max_price=max_price, property_type=property_type, page=1)
+        await limiter.acquire(url)
         await page.goto(url, wait_until="domcontentloaded")
         # Try to accept cookies/banner if present
         try:
@@ -403,6 +918,8 @@ def discover_adaptive(
         except Exception:
             pass
         content = await page.content()
+        if store is not None:
+            await store.aput(url, content, kind="search")
         n = extract_total_results_from_search(content) or 0
         return n
 
@@ -489,6 +1006,7 @@ def discover_adaptive(
                         url = f"https://www.rightmove.co.uk/property-for-sale/{outcode}.html?minPrice={(s.price_min or '')}&maxPrice={(s.price_max or '')}&index={(p-1)*24}&searchType=SALE"
                     else:
                         url = build_search_url(location_identifier=s.location_identifier, query=query or "", min_price=s.price_min, max_price=s.price_max, property_type=property_type, page=p)
+                    await limiter.acquire(url)
                     await page.goto(url, wait_until="domcontentloaded")
                     # Try to accept cookies/banner if present
                     try:
@@ -501,7 +1019,11 @@ def discover_adaptive(
                     except Exception:
                         pass
                     content = await page.content()
+                    if store is not None:
+                        await store.aput(url, content, kind="search")
                     page_urls = extract_listing_urls_from_search(content)
+                    if cards is not None:
+                        cards.record_cards(extract_search_cards(content))
                     console.log(f"Slice {s.name} page {p}: found {len(page_urls)} URLs")
                     if not page_urls:
                         # Debug snapshot to help troubleshoot 0 URLs on a page
@@ -518,10 +1040,15 @@ def discover_adaptive(
                     if pages is not None and p >= (start_page or 1) + pages - 1:
                         break
                     p += 1
-                    polite_sleep(cfg.min_delay_sec, cfg.max_delay_sec)
 
     import asyncio
-    asyncio.run(_run())
+    try:
+        asyncio.run(_run())
+    finally:
+        if store is not None:
+            store.close()
+        if cards is not None:
+            cards.close()
 
     # De-duplicate by URL, which encodes property id
     from .utils import dedupe_preserve_order
@@ -570,9 +1097,11 @@ def plan_adaptive(
         return v or "n"
 
     async def _run():
+        limiter = RateLimiter.from_config(cfg)
         async with browser_context(cfg) as (_, __, page):
             async def _count(location_identifier: str, *, min_price: int | None, max_price: int | None) -> int:
                 url = build_search_url(location_identifier=location_identifier, query=query or "", min_price=min_price, max_price=max_price, property_type=property_type, page=1)
+                await limiter.acquire(url)
                 await page.goto(url, wait_until="domcontentloaded")
                 try:
                     await page.get_by_role("button", name="Accept all").click(timeout=1500)
@@ -642,9 +1171,22 @@ def discover_from_plan(
     per_slice_dir: str | None = typer.Option(None, "--per-slice-dir", help="If set, write CSV per slice: rightmove_id,url,slicer_name"),
     slice_count: int | None = typer.Option(None, "--slice-count", min=1, help="Process N slices starting from start-slice"),
     skip_merged: bool = typer.Option(False, "--skip-merged", help="If true, do not write merged discovered_adaptive_seeds.csv"),
+    archive: str | None = typer.Option(
+        None,
+        "--archive",
+        help="Directory for a compressed archive of fetched pages (default ARCHIVE_DIR)",
+    ),
+    fingerprints: str | None = typer.Option(
+        None,
+        "--fingerprints",
+        help="SQLite file recording a price/beds/added fingerprint per search card",
+    ),
 ):
     """Read a slice plan and collect listing URLs for the selected range of slices in order."""
-    cfg = load_config({"request_timeout_sec": timeout})
+    overrides: dict = {"request_timeout_sec": timeout}
+    if archive:
+        overrides["archive_dir"] = archive
+    cfg = load_config(overrides)
     setup_logging(cfg.log_level)
     assert_personal_use_banner()
 
@@ -698,9 +1240,12 @@ def discover_from_plan(
         raise typer.Exit(code=1)
 
     urls: list[str] = []
+    store = HtmlArchive(cfg.archive_dir) if cfg.archive_dir else None
+    cards = FingerprintStore(fingerprints) if fingerprints else None
 
     async def _run():
         console = Console()
+        limiter = RateLimiter.from_config(cfg)
         async with browser_context(cfg) as (_, __, page):
             end_idx = len(slices_data)
             if slice_count is not None:
@@ -720,6 +1265,7 @@ def discover_from_plan(
                             url += f"&maxPrice={pmax}"
                     else:
                         url = build_search_url(location_identifier=loc, query=q or "", min_price=pmin, max_price=pmax, property_type=t, page=p)
+                    await limiter.acquire(url)
                     await page.goto(url, wait_until="domcontentloaded")
                     try:
                         await page.get_by_role("button", name="Accept all").click(timeout=1500)
@@ -730,7 +1276,11 @@ def discover_from_plan(
                     except Exception:
                         pass
                     content = await page.content()
+                    if store is not None:
+                        await store.aput(url, content, kind="search")
                     page_urls = extract_listing_urls_from_search(content)
+                    if cards is not None:
+                        cards.record_cards(extract_search_cards(content))
                     console.log(f"Slice {name} page {p}: found {len(page_urls)} URLs")
                     if not page_urls:
                         # Save debug HTML
@@ -745,7 +1295,6 @@ def discover_from_plan(
                     if pages is not None and p >= (start_page or 1) + pages - 1:
                         break
                     p += 1
-                    polite_sleep(cfg.min_delay_sec, cfg.max_delay_sec)
 
                 # De-duplicate per-slice and optionally write CSV with id and slicer name
                 slice_urls = dedupe_preserve_order(slice_urls)
@@ -766,7 +1315,13 @@ def discover_from_plan(
                     console.log(f"Wrote slice CSV: {slice_csv}")
                 urls.extend(slice_urls)
 
-    asyncio.run(_run())
+    try:
+        asyncio.run(_run())
+    finally:
+        if store is not None:
+            store.close()
+        if cards is not None:
+            cards.close()
 
     if not skip_merged:
         deduped = dedupe_preserve_order(urls)
@@ -781,6 +1336,365 @@ def discover_from_plan(
         typer.echo(f"Wrote {len(deduped)} URLs to {out_csv}")
 
 
+@app.command("re-extract")
+def re_extract(
+    archive: str = typer.Option(..., "--archive", help="Archive directory written by --archive"),
+    out: str = typer.Option("./out", "--out", help="Output directory"),
+    format: str = typer.Option("csv", "--format", help="csv|parquet|sqlite"),
+    since: str | None = typer.Option(
+        None, "--since", help="Only listings fetched at or after this ISO timestamp"
+    ),
+    workers: str = typer.Option(
+        "auto", "--workers", help="Extractor processes; 'auto' uses all CPUs"
+    ),
+    profile_extractors: str | None = typer.Option(
+        None,
+        "--profile-extractors",
+        help="JSON file accumulating which extractor strategy "
+        "filled each field and its cost (see extractor-report)",
+    ),
+) -> None:
+    """Rebuild listing output offline by replaying the extractors over archived pages."""
+    from concurrent.futures import ProcessPoolExecutor
+
+    cfg = load_config({"output_dir": out, "output_format": format})
+    setup_logging(cfg.log_level)
+    console = Console()
+
+    if not (Path(archive) / "index.db").exists():
+        typer.echo(f"No archive index found in {archive}")
+        raise typer.Exit(code=1)
+    try:
+        if workers.strip().lower() == "auto":
+            n_workers = os.cpu_count() or 1
+        else:
+            n_workers = parse_workers(workers)
+    except ValueError:
+        typer.echo("--workers must be a positive integer or 'auto'")
+        raise typer.Exit(code=2) from None
+
+    store = HtmlArchive(archive)
+    rows = list(store.latest_listings(since))
+    store.close()
+    console.log(f"Re-extracting {len(rows)} archived listings with {n_workers} processes")
+
+    records: list = []
+    failed = 0
+    profile = FieldProfiler() if profile_extractors else None
+    job: Callable[..., Any] = reextract_profiled if profile is not None else reextract
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        futures = [pool.submit(job, archive, *row) for row in rows]
+        for (rid, _, _, _), fut in zip(rows, futures, strict=True):
+            try:
+                result = fut.result()
+            except Exception as e:
+                failed += 1
+                console.log(f"Error re-extracting {rid}: {e}")
+                continue
+            if profile is not None:
+                result, page_profile = result
+                profile.merge(page_profile)
+            records.append(result)
+
+    Path(cfg.output_dir).mkdir(parents=True, exist_ok=True)
+    out_path = write_records(records, cfg.output_dir, cfg.output_format)
+    console.log(f"Wrote {len(records)} records to {out_path} ({failed} failed)")
+    if profile is not None and profile_extractors:
+        profile.save(profile_extractors)
+        console.log(f"Added {profile.listings} profiled listings to {profile_extractors}")
+
+
+@app.command("extractor-report")
+def extractor_report(
+    profile: str = typer.Option(..., "--profile", help="JSON file written by --profile-extractors"),
+    field: str | None = typer.Option(None, "--field", help="Only show this field"),
+    sort: str = typer.Option(
+        "field", "--sort", help="field|total|waste (waste = time spent on misses)"
+    ),
+    dead_below: float = typer.Option(
+        0.01, "--dead-below", min=0, max=1, help="Flag strategies whose hit rate is below this"
+    ),
+) -> None:
+    """Show per-field extractor strategy hit rates and costs, flagging dead or costly fallbacks."""
+    from rich.table import Table
+
+    if not os.path.exists(profile):
+        typer.echo(f"No profile found at {profile}")
+        raise typer.Exit(code=1)
+    if sort not in {"field", "total", "waste"}:
+        typer.echo("--sort must be field, total or waste")
+        raise typer.Exit(code=2)
+    console = Console()
+    prof = FieldProfiler.load(profile)
+    rows = [r for r in report_rows(prof) if field is None or r["field"] == field]
+    if sort == "total":
+        rows.sort(key=lambda r: -r["total_ms"])
+    elif sort == "waste":
+        rows.sort(key=lambda r: -(r["mean_ms"] * r["misses"]))
+
+    table = Table(title=f"Extractor strategies over {prof.listings} listings")
+    columns = (
+        "field", "strategy", "runs", "hits", "misses", "hit %", "total ms", "mean ms", "ms/hit", ""
+    )
+    for col in columns:
+        table.add_column(col, justify="left" if col in {"field", "strategy", ""} else "right")
+    for r in rows:
+        flags = []
+        if r["runs"] and r["hit_rate"] < dead_below:
+            flags.append("dead" if r["hits"] == 0 else "rarely hits")
+        # A strategy that only runs after the others missed, yet costs more per value
+        # than the field's primary
+        primary = next(iter(prof.fields[r["field"]].values()))
+        primary_ms_per_hit = primary.total_sec / primary.hits * 1000 if primary.hits else 0.0
+        if r["hits"] and primary.hits and r["ms_per_hit"] > 10 * primary_ms_per_hit:
+            flags.append("expensive")
+        table.add_row(
+            r["field"], r["strategy"], str(r["runs"]), str(r["hits"]), str(r["misses"]),
+            f"{r['hit_rate'] * 100:.1f}", f"{r['total_ms']:.1f}", f"{r['mean_ms']:.3f}",
+            "-" if r["hits"] == 0 else f"{r['ms_per_hit']:.3f}", ", ".join(flags),
+        )
+    console.print(table)
+    empty = {name: n for name, n in prof.empty.items() if field is None or name == field}
+    if empty:
+        counts = ", ".join(f"{k} {v}" for k, v in sorted(empty.items()))
+        console.print(f"Left empty by every strategy: {counts}")
+    console.print(
+        f"Lazy lxml parse: {prof.parse_sec * 1000:.1f} ms total (not charged to any strategy)"
+    )
+
+
+@app.command("serve-standin")
+def serve_standin(
+    port: int = typer.Option(8765, "--port", help="Port to listen on"),
+    host: str = typer.Option("127.0.0.1", "--host", help="Interface to bind"),
+    latency_ms: float = typer.Option(150.0, "--latency-ms", min=0, help="Median response delay"),
+    latency_sigma: float = typer.Option(
+        0.5, "--latency-sigma", min=0, help="Log-normal spread of the delay (0 = fixed)"
+    ),
+    error_rate: float = typer.Option(
+        0.0, "--error-rate", min=0, max=1, help="Share of requests answered 503"
+    ),
+    blocked_rate: float = typer.Option(
+        0.0, "--blocked-rate", min=0, max=1, help="Share of requests answered 429"
+    ),
+    removed_rate: float = typer.Option(
+        0.0, "--removed-rate", min=0, max=1, help="Share of listings answered 410"
+    ),
+    page_model_rate: float = typer.Option(
+        0.5, "--page-model-rate", min=0, max=1, help="Share of listings embedding PAGE_MODEL JSON"
+    ),
+    results: int = typer.Option(
+        1200, "--results", min=0, help="Results a whole-region search reports"
+    ),
+    fixtures: str | None = typer.Option(
+        None,
+        "--fixtures",
+        help="Serve sample_listing_*.html / sample_search_*.html "
+        "from this directory (dump-snapshots output)",
+    ),
+) -> None:
+    """Serve Rightmove-shaped listing and search pages locally, for offline tuning of commands."""
+    console = Console()
+    settings = StandInSettings(
+        latency_ms=latency_ms, latency_sigma=latency_sigma,
+        error_rate=error_rate, blocked_rate=blocked_rate, removed_rate=removed_rate,
+        page_model_rate=page_model_rate, results=results, fixtures_dir=fixtures,
+    )
+    server, standin = make_server(settings, host, port)
+    base_url = f"http://{host}:{port}"
+    console.log(
+        f"Stand-in listening on {base_url}; run commands with RIGHTMOVE_BASE_URL={base_url}"
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        console.log(standin.stats.summary())
+
+
+@app.command("bench-scrape")
+def bench_scrape(
+    pages: int = typer.Option(200, "--pages", min=1, help="Listings to scrape"),
+    engine: str = typer.Option("browser", "--engine", help="browser|http"),
+    extract: str = typer.Option("dom", "--extract", help="dom|eval"),
+    concurrency: int = typer.Option(
+        4, "--concurrency", min=1, max=16, help="Parallel pages (starting point with --adaptive)"
+    ),
+    adaptive: bool = typer.Option(
+        False, "--adaptive", help="Let the adaptive controller tune concurrency"
+    ),
+    max_concurrency: int = typer.Option(
+        8, "--max-concurrency", min=1, max=16, help="Upper bound for --adaptive"
+    ),
+    page_recycle: int = typer.Option(
+        50, "--page-recycle", min=1, help="Replace a pooled page after N navigations"
+    ),
+    retries: int = typer.Option(2, "--retries", min=0, help="Re-queue budget per URL"),
+    timeout: int = typer.Option(20, "--timeout", min=1, help="Per-page timeout seconds"),
+    min_delay: float = typer.Option(
+        0.0, "--min-delay", min=0, help="Per-host politeness delay floor (seconds)"
+    ),
+    max_delay: float = typer.Option(
+        0.0, "--max-delay", min=0, help="Per-host politeness delay ceiling (seconds)"
+    ),
+    max_rps: float = typer.Option(1000.0, "--max-rps", min=0.01, help="Global request rate cap"),
+    net_policy: str | None = typer.Option(None, "--net-policy", help="none|media|lean|strict"),
+    latency_ms: float = typer.Option(
+        150.0, "--latency-ms", min=0, help="Stand-in median response delay"
+    ),
+    latency_sigma: float = typer.Option(
+        0.5, "--latency-sigma", min=0, help="Log-normal spread of the delay (0 = fixed)"
+    ),
+    error_rate: float = typer.Option(
+        0.0, "--error-rate", min=0, max=1, help="Share of requests answered 503"
+    ),
+    blocked_rate: float = typer.Option(
+        0.0, "--blocked-rate", min=0, max=1, help="Share of requests answered 429"
+    ),
+    removed_rate: float = typer.Option(
+        0.0, "--removed-rate", min=0, max=1, help="Share of listings answered 410"
+    ),
+    page_model_rate: float = typer.Option(
+        0.5, "--page-model-rate", min=0, max=1, help="Share of listings embedding PAGE_MODEL JSON"
+    ),
+    fixtures: str | None = typer.Option(
+        None,
+        "--fixtures",
+        help="Serve sample_listing_*.html from this directory instead of synthetic pages",
+    ),
+    verbose: bool = typer.Option(False, "--verbose", help="Log every scraped URL"),
+    json_out: str | None = typer.Option(
+        None, "--json", help="Also write the results to this JSON file"
+    ),
+) -> None:
+    """Scrape a local stand-in with the real pipeline; report throughput, latency, CPU and RSS."""
+    import resource
+    import sys
+
+    overrides: dict = {
+        "request_timeout_sec": timeout,
+        "min_delay_sec": min_delay,
+        "max_delay_sec": max_delay,
+        "max_rps": max_rps,
+        "rate_burst": max(concurrency, max_concurrency if adaptive else concurrency),
+    }
+    if net_policy is not None:
+        overrides["net_policy"] = net_policy
+    cfg = load_config(overrides)
+    setup_logging(cfg.log_level)
+    console = Console()
+
+    if engine not in {"browser", "http"}:
+        typer.echo("--engine must be 'browser' or 'http'")
+        raise typer.Exit(code=2)
+    if extract not in {"dom", "eval"}:
+        typer.echo("--extract must be 'dom' or 'eval'")
+        raise typer.Exit(code=2)
+    if cfg.net_policy not in NET_POLICIES:
+        typer.echo(f"--net-policy must be one of: {', '.join(NET_POLICIES)}")
+        raise typer.Exit(code=2)
+
+    settings = StandInSettings(
+        latency_ms=latency_ms, latency_sigma=latency_sigma,
+        error_rate=error_rate, blocked_rate=blocked_rate, removed_rate=removed_rate,
+        page_model_rate=page_model_rate, fixtures_dir=fixtures,
+    )
+    opts = ScrapeOptions(
+        concurrency=concurrency,
+        adaptive=adaptive,
+        max_concurrency=max_concurrency,
+        engine=engine,
+        page_recycle=page_recycle,
+        extract=extract,
+        retries=retries,
+    )
+    urls = [f"https://www.rightmove.co.uk/properties/{100_000_000 + i}" for i in range(pages)]
+    latencies: list[float] = []
+
+    def on_timing(url: str, seconds: float) -> None:
+        latencies.append(seconds)
+
+    def cpu_sec(ru: resource.struct_rusage) -> float:
+        return ru.ru_utime + ru.ru_stime
+
+    def rss_mb(ru: resource.struct_rusage) -> float:
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        return ru.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+    with StandInProcess(settings) as server:
+        cfg.base_url = server.base_url
+        console.log(
+            f"Scraping {pages} listings from the stand-in at {server.base_url} "
+            f"({engine}, {extract})"
+        )
+        self0 = resource.getrusage(resource.RUSAGE_SELF)
+        kids0 = resource.getrusage(resource.RUSAGE_CHILDREN)
+        assert server.pid is not None, "started on entering the block"
+        with ChildRssSampler(exclude={server.pid}) as browser_rss:
+            stats = asyncio.run(
+                run_scrape(
+                    cfg, urls, opts, lambda listing: None, total=pages,
+                    log=console.log if verbose else (lambda msg: None), on_timing=on_timing,
+                )
+            )
+        # The browser has exited and been reaped by now; the stand-in has not
+        self1 = resource.getrusage(resource.RUSAGE_SELF)
+        kids1 = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+    ordered = sorted(latencies)
+
+    def pct(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000 if ordered else 0.0
+
+    scraper_cpu = cpu_sec(self1) - cpu_sec(self0)
+    browser_cpu = cpu_sec(kids1) - cpu_sec(kids0)
+    result: dict[str, Any] = {
+        "pages": pages,
+        "scraped": stats.scraped,
+        "failed": stats.failed,
+        "elapsed_sec": round(stats.elapsed, 2),
+        "pages_per_min": round(stats.pages_per_min, 1),
+        "latency_ms": {
+            "p50": round(pct(0.50), 1),
+            "p95": round(pct(0.95), 1),
+            "p99": round(pct(0.99), 1),
+            "max": round(pct(1.0), 1),
+        },
+        "cpu_sec": {"scraper": round(scraper_cpu, 2), "browser": round(browser_cpu, 2)},
+        "cpu_ms_per_page": round((scraper_cpu + browser_cpu) / max(stats.scraped, 1) * 1000, 1),
+        "peak_rss_mb": {
+            "scraper": round(rss_mb(self1), 1),
+            "browser": round(browser_rss.peak_bytes / 2**20, 1) if browser_rss.supported else None,
+        },
+        "server": {"requests": server.stats.requests, "statuses": server.stats.statuses},
+    }
+    for note in stats.notes:
+        console.log(note)
+    console.log(stats.summary())
+    lat = result["latency_ms"]
+    console.log(
+        f"Latency ms: p50 {lat['p50']:.1f}, p95 {lat['p95']:.1f}, p99 {lat['p99']:.1f}, "
+        f"max {lat['max']:.1f}"
+    )
+    console.log(
+        f"CPU: {scraper_cpu:.1f}s scraper + {browser_cpu:.1f}s browser "
+        f"over {stats.elapsed:.1f}s wall ({result['cpu_ms_per_page']:.1f} ms per page)"
+    )
+    peak = result["peak_rss_mb"]
+    browser_text = "not measured on this OS"
+    if peak["browser"] is not None:
+        browser_text = f"{peak['browser']:.0f} MB"
+    console.log(
+        f"Peak RSS: {peak['scraper']:.0f} MB scraper, {browser_text} browser (all processes)"
+    )
+    console.log(server.stats.summary())
+    if json_out:
+        Path(json_out).write_text(json.dumps(result, indent=2), encoding="utf-8")
+        console.log(f"Wrote results to {json_out}")
+
+
 if __name__ == "__main__":
     app()
 
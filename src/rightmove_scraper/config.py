@@ -20,10 +20,16 @@ class AppConfig:
     request_timeout_sec: int = 30
     min_delay_sec: float = 2.0
     max_delay_sec: float = 5.0
+    max_rps: float = 1.0  # global cap across all hosts
+    rate_burst: int = 1
     allow_discovery: bool = False
     output_dir: str = "./out"
     output_format: str = "csv"  # csv|parquet|sqlite
     log_level: str = "INFO"
+    net_policy: str = "media"  # none|media|lean|strict
+    net_allow: list[str] = field(default_factory=list)  # domains never blocked by the policy
+    base_url: str | None = None  # serve Rightmove paths from another origin (local stand-in)
+    archive_dir: str | None = None  # keep compressed copies of every fetched page here
 
     # runtime
     extra: dict[str, Any] = field(default_factory=dict)
@@ -44,10 +50,16 @@ def load_config(overrides: dict[str, Any] | None = None) -> AppConfig:
         request_timeout_sec=int(os.getenv("REQUEST_TIMEOUT") or 30),
         min_delay_sec=float(os.getenv("MIN_DELAY_SEC") or 2.0),
         max_delay_sec=float(os.getenv("MAX_DELAY_SEC") or 5.0),
+        max_rps=float(os.getenv("MAX_RPS") or 1.0),
+        rate_burst=int(os.getenv("RATE_BURST") or 1),
         allow_discovery=_get_bool(os.getenv("ALLOW_DISCOVERY"), False),
         output_dir=os.getenv("OUTPUT_DIR") or "./out",
         output_format=os.getenv("OUTPUT_FORMAT") or "csv",
         log_level=os.getenv("LOG_LEVEL") or "INFO",
+        net_policy=os.getenv("NET_POLICY") or "media",
+        net_allow=[d.strip() for d in (os.getenv("NET_ALLOW") or "").split(",") if d.strip()],
+        base_url=os.getenv("RIGHTMOVE_BASE_URL") or None,
+        archive_dir=os.getenv("ARCHIVE_DIR") or None,
     )
 
     for key, value in overrides.items():
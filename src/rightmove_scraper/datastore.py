@@ -1,37 +1,338 @@
 from __future__ import annotations
 
+import csv
+import gzip
+import json
 import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from collections.abc import Iterator
+from typing import IO, TYPE_CHECKING, Any
 
 import pandas as pd
 
+from .metrics import StageMetrics
 from .models import Listing
 
+if TYPE_CHECKING:
+    import pyarrow as pa
+
 
 def _ensure_dir(path: str) -> None:
     os.makedirs(path, exist_ok=True)
 
 
-def write_records(records: list[Listing], output_dir: str, output_format: str = "csv") -> str:
+def write_records(
+    records: list[Listing], output_dir: str, output_format: str = "csv", name: str = "listings"
+) -> str:
     _ensure_dir(output_dir)
-    df = pd.DataFrame([r.model_dump() for r in records])
+    # JSON mode turns HttpUrl into str, which parquet and sqlite cannot take as objects
+    rows = [r.model_dump(mode="json") for r in records]
+    df = pd.DataFrame([_flat(r) for r in rows] if output_format == "sqlite" else rows)
     # Deduplicate by rightmove_id
     if not df.empty:
         df = df.drop_duplicates(subset=["rightmove_id"], keep="last")
 
-    out_path = os.path.join(output_dir, f"listings.{output_format}")
+    out_path = os.path.join(output_dir, f"{name}.{output_format}")
     if output_format == "csv":
         df.to_csv(out_path, index=False)
     elif output_format == "parquet":
         df.to_parquet(out_path, index=False)
+    elif output_format.startswith("ndjson"):
+        # Compression follows the .gz / .zst extension
+        df.to_json(out_path, orient="records", lines=True, force_ascii=False)
     elif output_format == "sqlite":
-        import sqlite3
-
-        con = sqlite3.connect(os.path.join(output_dir, "listings.db"))
+        out_path = os.path.join(output_dir, f"{name}.db")
+        con = sqlite3.connect(out_path)
         df.to_sql("listings", con, if_exists="replace", index=False)
         con.close()
-        out_path = os.path.join(output_dir, "listings.db")
     else:
         raise ValueError(f"Unsupported output format: {output_format}")
     return out_path
 
 
+STREAM_FORMATS = ("csv", "ndjson", "ndjson.gz", "ndjson.zst", "parquet", "sqlite")
+
+
+def _arrow_schema() -> pa.Schema:
+    import typing
+
+    import pyarrow as pa
+
+    fields = []
+    for name, f in Listing.model_fields.items():
+        args = set(typing.get_args(f.annotation)) or {f.annotation}
+        if int in args:
+            t = pa.int64()
+        elif float in args:
+            t = pa.float64()
+        elif f.annotation == list[str]:
+            t = pa.list_(pa.string())
+        else:
+            t = pa.string()
+        fields.append(pa.field(name, t))
+    return pa.schema(fields)
+
+
+def _flat(row: dict) -> dict:
+    # Text formats keep list columns as JSON rather than Python reprs
+    return {
+        k: json.dumps(v, ensure_ascii=False) if isinstance(v, list) else v for k, v in row.items()
+    }
+
+
+def _frames(path: str, output_format: str) -> Iterator[bytes]:
+    """Yield each gzip member or zstd frame in `path`, dropping a truncated last one.
+
+    Every flush appends a complete member or frame, so a writer killed part way
+    through one leaves an incomplete tail that holds no row reported as flushed.
+    """
+
+    def decompressor() -> Any:
+        if output_format == "ndjson.gz":
+            return zlib.decompressobj(wbits=31)
+        import zstandard
+
+        return zstandard.ZstdDecompressor().decompressobj()
+
+    d = decompressor()
+    out: list[bytes] = []
+    with open(path, "rb") as f:
+        while chunk := f.read(1 << 20):
+            while chunk:
+                out.append(d.decompress(chunk))
+                if not d.eof:
+                    break
+                yield b"".join(out)
+                out, chunk, d = [], d.unused_data, decompressor()
+
+
+def _ndjson_rows(path: str, output_format: str) -> list[dict]:
+    if output_format == "ndjson":
+        with open(path, encoding="utf-8", newline="") as f:
+            text = f.read()
+    else:
+        text = "".join(frame.decode("utf-8") for frame in _frames(path, output_format))
+    # A kill mid-write can leave the last line without its newline
+    return [json.loads(line) for line in text.split("\n")[:-1] if line.strip()]
+
+
+def _parquet_parts(output_dir: str) -> list[tuple[int, str]]:
+    parts = []
+    for name in os.listdir(output_dir):
+        m = re.fullmatch(r"listings(?:\.(\d+))?\.parquet", name)
+        if m:
+            parts.append((int(m.group(1) or 0), os.path.join(output_dir, name)))
+    return sorted(parts)
+
+
+def load_records(output_dir: str, output_format: str = "ndjson") -> pd.DataFrame:
+    """Read what RecordSink wrote, keeping the latest row per rightmove_id."""
+    if output_format not in STREAM_FORMATS:
+        raise ValueError(f"Unsupported output format: {output_format}")
+    if output_format == "sqlite":
+        path = os.path.join(output_dir, "listings.db")
+        if not os.path.exists(path):
+            return pd.DataFrame(columns=list(Listing.model_fields))
+        with sqlite3.connect(path) as con:
+            return pd.read_sql("SELECT * FROM listings", con)
+    if output_format == "parquet":
+        frames = [pd.read_parquet(p) for _, p in _parquet_parts(output_dir)]
+        df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    else:
+        path = os.path.join(output_dir, f"listings.{output_format}")
+        if not os.path.exists(path):
+            return pd.DataFrame(columns=list(Listing.model_fields))
+        if output_format == "csv":
+            with open(path, encoding="utf-8", newline="") as f:
+                df = pd.DataFrame(list(csv.DictReader(f)))
+        else:
+            df = pd.DataFrame(_ndjson_rows(path, output_format))
+    if df.empty:
+        return pd.DataFrame(columns=list(Listing.model_fields))
+    return df.drop_duplicates(subset=["rightmove_id"], keep="last").reset_index(drop=True)
+
+
+class RecordSink:
+    """Append Listings to disk from a background thread as they are scraped.
+
+    `put` only enqueues (blocking briefly if `max_pending` rows are waiting), so
+    file I/O never runs on the event loop and memory stays bounded. Rows are
+    written every `flush_every` records or `flush_sec` seconds. Every format
+    keeps the latest row per rightmove_id, so re-scraped listings refresh
+    earlier ones: SQLite upserts, and the append-only formats write the new row
+    for `load_records` to prefer over older copies.
+
+    Each flush leaves the file readable on its own: compressed NDJSON appends a
+    complete gzip member or zstd frame, and Parquet, which cannot be appended
+    to, writes a new numbered part. Ids of flushed rows are collected for
+    `take_flushed`, so callers can mark work done only once a kill can no
+    longer lose it. Each flush is timed as the "write" stage in `metrics` when
+    given.
+    """
+
+    def __init__(
+        self,
+        output_dir: str,
+        output_format: str = "ndjson",
+        *,
+        flush_every: int = 100,
+        flush_sec: float = 2.0,
+        max_pending: int = 10_000,
+        metrics: StageMetrics | None = None,
+    ) -> None:
+        if output_format not in STREAM_FORMATS:
+            raise ValueError(f"Unsupported output format: {output_format}")
+        _ensure_dir(output_dir)
+        self.output_dir = output_dir
+        self.output_format = output_format
+        self.flush_every = max(1, flush_every)
+        self.flush_sec = flush_sec
+        self.metrics = metrics
+        self.written = 0
+        # Rows whose rightmove_id was already written earlier in this run
+        self.replaced = 0
+        self._part = 0
+        self.path = self._target_path()
+        self._queue: queue.Queue[dict | None] = queue.Queue(maxsize=max_pending)
+        self._flushed: list[str] = []
+        self._flushed_lock = threading.Lock()
+        self._written_ids: set[str] = set()
+        self._error: BaseException | None = None
+        # Set by _open for the formats that keep a handle open between flushes
+        self._con: sqlite3.Connection | None = None
+        self._file: IO[Any] | None = None
+        self._csv: csv.DictWriter[str] | None = None
+        self._thread = threading.Thread(target=self._run, name="record-sink", daemon=True)
+        self._thread.start()
+
+    def _target_path(self) -> str:
+        if self.output_format == "sqlite":
+            return os.path.join(self.output_dir, "listings.db")
+        if self.output_format == "parquet":
+            parts = _parquet_parts(self.output_dir)
+            self._part = parts[-1][0] + 1 if parts else 0
+            return self._part_path(self._part)
+        return os.path.join(self.output_dir, f"listings.{self.output_format}")
+
+    def _part_path(self, n: int) -> str:
+        name = f"listings.{n}.parquet" if n else "listings.parquet"
+        return os.path.join(self.output_dir, name)
+
+    def _write_part(self, batch: list[dict]) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        # Written aside and renamed, so a part is either complete or absent
+        path = self._part_path(self._part)
+        pq.write_table(pa.Table.from_pylist(batch, schema=_arrow_schema()), f"{path}.tmp")
+        os.replace(f"{path}.tmp", path)
+        self._part += 1
+
+    def put(self, listing: Listing) -> None:
+        if self._error is not None:
+            raise RuntimeError("Record sink failed") from self._error
+        self._queue.put(listing.model_dump(mode="json"))
+
+    def take_flushed(self) -> list[str]:
+        with self._flushed_lock:
+            ids, self._flushed = self._flushed, []
+        return ids
+
+    def close(self) -> str:
+        """Flush what is left, stop the writer thread and return the output path."""
+        self._queue.put(None)
+        self._thread.join()
+        if self._error is not None:
+            raise RuntimeError("Record sink failed") from self._error
+        return self.path
+
+    def _run(self) -> None:
+        batch: list[dict] = []
+        last = time.monotonic()
+        try:
+            self._open()
+            while True:
+                try:
+                    row = self._queue.get(timeout=self.flush_sec)
+                except queue.Empty:
+                    pass
+                else:
+                    if row is None:
+                        break
+                    batch.append(row)
+                due = time.monotonic() - last >= self.flush_sec
+                if batch and (len(batch) >= self.flush_every or due):
+                    self._write(batch)
+                    batch = []
+                    last = time.monotonic()
+            if batch:
+                self._write(batch)
+        except BaseException as e:
+            self._error = e
+            # Keep draining so producers blocked on a full queue are released
+            while self._queue.get() is not None:
+                pass
+        finally:
+            if self._con is not None:
+                self._con.close()
+            if self._file is not None:
+                self._file.close()
+
+    def _open(self) -> None:
+        if self.output_format == "sqlite":
+            self._con = sqlite3.connect(self.path)
+            cols = ", ".join(
+                f'"{c}"' + (" TEXT PRIMARY KEY" if c == "rightmove_id" else "")
+                for c in Listing.model_fields
+            )
+            self._con.execute(f"CREATE TABLE IF NOT EXISTS listings ({cols})")
+        elif self.output_format == "csv":
+            append = os.path.exists(self.path) and os.path.getsize(self.path) > 0
+            self._file = open(self.path, "a", encoding="utf-8", newline="")
+            self._csv = csv.DictWriter(self._file, fieldnames=list(Listing.model_fields))
+            if not append:
+                self._csv.writeheader()
+        elif self.output_format != "parquet":
+            self._file = open(self.path, "ab")
+
+    def _compress(self, data: bytes) -> bytes:
+        # One self-contained member or frame per flush; see _frames
+        if self.output_format == "ndjson.gz":
+            return gzip.compress(data)
+        if self.output_format == "ndjson.zst":
+            import zstandard
+
+            return zstandard.ZstdCompressor().compress(data)
+        return data
+
+    def _write(self, batch: list[dict]) -> None:
+        t0 = time.perf_counter()
+        ids = [row["rightmove_id"] for row in batch]
+        self.replaced += sum(rid in self._written_ids for rid in ids)
+        self._written_ids.update(ids)
+        if self._con is not None:
+            cols = list(Listing.model_fields)
+            self._con.executemany(
+                f"INSERT OR REPLACE INTO listings VALUES ({', '.join('?' * len(cols))})",
+                [tuple(row.get(c) for c in cols) for row in map(_flat, batch)],
+            )
+            self._con.commit()
+        elif self._csv is not None:
+            self._csv.writerows(_flat(r) for r in batch)
+        elif self._file is not None:
+            text = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in batch)
+            self._file.write(self._compress(text.encode("utf-8")))
+        else:
+            self._write_part(batch)
+        if self._file is not None:
+            self._file.flush()
+        self.written += len(batch)
+        if self.metrics is not None:
+            self.metrics.observe("write", time.perf_counter() - t0)
+        with self._flushed_lock:
+            self._flushed.extend(ids)
@@ -1,12 +1,26 @@
 from __future__ import annotations
 
+import hashlib
+import json
 import re
 import urllib.parse
+from collections.abc import Iterator
+from typing import Any
 
 from lxml import html
 
+from .htmlslice import SEARCH_REGIONS, slice_html
+
 RIGHTMOVE_HOST = "https://www.rightmove.co.uk"
 
+_JSON_MODEL_RE = re.compile(r"window\.jsonModel\s*=\s*")
+_NEXT_DATA_RE = re.compile(r'<script[^>]*id="__NEXT_DATA__"[^>]*>')
+_CARD_PRICE_RE = re.compile(r"£\s?(\d{1,3}(?:,\d{3})+|\d+)")
+_CARD_BEDS_RE = re.compile(r"(\d+)\s*bed", re.IGNORECASE)
+_CARD_UPDATE_RE = re.compile(
+    r"((?:Added|Reduced) (?:on \d{2}/\d{2}/\d{4}|today|yesterday))", re.IGNORECASE
+)
+
 
 def build_search_url(*, location_identifier: str, query: str = "", min_price: int | None = None, max_price: int | None = None, property_type: str | None = None, page: int = 1) -> str:
     # Build a Rightmove search URL for a given locationIdentifier
@@ -32,11 +46,39 @@ def build_london_search_url(query: str = "", min_price: int | None = None, max_p
     return build_search_url(location_identifier="REGION^87490", query=query, min_price=min_price, max_price=max_price, property_type=property_type, page=page)
 
 
+def _search_docs(html_text: str) -> Iterator[html.HtmlElement]:
+    """The sliced regions of a search page, then the whole page if the caller keeps asking."""
+    sliced = slice_html(html_text, SEARCH_REGIONS)
+    if sliced is not None:
+        yield html.fromstring(sliced)
+    yield html.fromstring(html_text)
+
+
 def extract_listing_urls_from_search(html_text: str) -> list[str]:
-    doc = html.fromstring(html_text)
+    for doc in _search_docs(html_text):
+        out = _listing_urls(doc)
+        if out:
+            return out
+    # Fallback: extract property IDs from raw HTML (handles cases where links render via JSON)
+    try:
+        ids = re.findall(r"/properties/(\d+)", html_text)
+        out = []
+        seen = set()
+        for pid in ids:
+            u = f"{RIGHTMOVE_HOST}/properties/{pid}"
+            if u not in seen:
+                seen.add(u)
+                out.append(u)
+        return out
+    except Exception:
+        return []
+
+
+def _listing_urls(doc: html.HtmlElement) -> list[str]:
     urls: list[str] = []
     anchors = doc.xpath(
-        '//*[@data-testid="propertyCard-link" or contains(@class, "propertyCard")]//a[contains(@href, "/properties/")][@href]'
+        '//*[@data-testid="propertyCard-link" or contains(@class, "propertyCard")]'
+        '//a[contains(@href, "/properties/")][@href]'
         ' | //a[contains(@href, "/properties/")][@href]'
     )
     for a in anchors:
@@ -54,25 +96,20 @@ def extract_listing_urls_from_search(html_text: str) -> list[str]:
         if u not in seen:
             seen.add(u)
             out.append(u)
-    if out:
-        return out
-    # Fallback: extract property IDs from raw HTML (handles cases where links render via JSON)
-    try:
-        ids = re.findall(r"/properties/(\d+)", html_text)
-        out = []
-        seen = set()
-        for pid in ids:
-            u = f"{RIGHTMOVE_HOST}/properties/{pid}"
-            if u not in seen:
-                seen.add(u)
-                out.append(u)
-        return out
-    except Exception:
-        return []
+    return out
 
 
 def extract_total_results_from_search(html_text: str) -> int | None:
-    doc = html.fromstring(html_text)
+    # The count and the results list are small regions of a large page; parse
+    # those first and the whole page only when they do not give an answer
+    for doc in _search_docs(html_text):
+        total = _total_results(doc)
+        if total is not None:
+            return total
+    return None
+
+
+def _total_results(doc: html.HtmlElement) -> int | None:
     # Heuristic: look for text like "12,345 results" or "X properties found"
     full_text = " ".join(doc.xpath("//body//text()"))
     patterns = [
@@ -98,3 +135,93 @@ def extract_total_results_from_search(html_text: str) -> int | None:
     return None
 
 
+def _search_json(html_text: str) -> Any:
+    m = _JSON_MODEL_RE.search(html_text) or _NEXT_DATA_RE.search(html_text)
+    if not m:
+        return None
+    try:
+        return json.JSONDecoder().raw_decode(html_text, m.end())[0]
+    except ValueError:
+        return None
+
+
+def _json_cards(obj: Any) -> list[dict[str, Any]]:
+    # Search results are the list of dicts carrying an id plus price/bedrooms
+    if isinstance(obj, list):
+        if obj and all(
+            isinstance(x, dict) and "id" in x and ("price" in x or "bedrooms" in x) for x in obj
+        ):
+            return obj
+        for x in obj:
+            found = _json_cards(x)
+            if found:
+                return found
+    elif isinstance(obj, dict):
+        for v in obj.values():
+            found = _json_cards(v)
+            if found:
+                return found
+    return []
+
+
+def _json_card_fields(card: dict[str, Any]) -> tuple[str | None, str | None, str | None]:
+    price = card.get("price")
+    if isinstance(price, dict):
+        price = price.get("amount")
+    update = card.get("addedOrReduced")
+    if not update and isinstance(card.get("listingUpdate"), dict):
+        lu = card["listingUpdate"]
+        parts = (lu.get("listingUpdateReason"), lu.get("listingUpdateDate"))
+        update = " ".join(str(v) for v in parts if v)
+    beds = card.get("bedrooms")
+    return (
+        str(price) if price is not None else None,
+        str(beds) if beds is not None else None,
+        str(update).strip() if update else None,
+    )
+
+
+def card_fingerprint(price: str | None, bedrooms: str | None, update: str | None) -> str:
+    """Compact digest of the search-card fields that change when a listing is edited."""
+    raw = f"{(price or '').replace(',', '')}|{bedrooms or ''}|{(update or '').lower()}"
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def extract_search_cards(html_text: str) -> dict[str, str]:
+    """Map rightmove_id -> card fingerprint for every result card on a search page.
+
+    Reads the embedded search JSON when present, otherwise the rendered cards.
+    """
+    cards = _json_cards(_search_json(html_text))
+    if cards:
+        return {str(c["id"]): card_fingerprint(*_json_card_fields(c)) for c in cards}
+
+    for doc in _search_docs(html_text):
+        out = _rendered_cards(doc)
+        if out:
+            return out
+    return {}
+
+
+def _rendered_cards(doc: html.HtmlElement) -> dict[str, str]:
+    out: dict[str, str] = {}
+    for a in doc.xpath('//a[contains(@href, "/properties/")][@href]'):
+        m = re.search(r"/properties/(\d+)", a.get("href") or "")
+        if not m or m.group(1) in out:
+            continue
+        card = a.xpath(
+            'ancestor::*[starts-with(@data-testid, "propertyCard")'
+            ' or contains(@class, "propertyCard")][last()]'
+        )
+        if not card:
+            continue
+        text = " ".join(card[0].itertext())
+        price = _CARD_PRICE_RE.search(text)
+        beds = _CARD_BEDS_RE.search(text)
+        update = _CARD_UPDATE_RE.search(text)
+        out[m.group(1)] = card_fingerprint(
+            price.group(1) if price else None,
+            beds.group(1) if beds else None,
+            update.group(1) if update else None,
+        )
+    return out
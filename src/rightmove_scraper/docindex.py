@@ -0,0 +1,350 @@
+"""Label/value index of a parsed listing page.
+
+Free-text XPaths such as `//*[contains(., "LABEL")]` or
+`//*[translate(normalize-space(), ...)]` compute the string value of every
+element, so each costs roughly page size times tree depth, and a listing ran a
+dozen of them. `DocIndex` records what those lookups anchor on: headings, dt/dd
+pairs, test ids, class tokens, image and meta URLs, tel: links, the
+propertyData script and the leaf elements holding each label. Every part is
+gathered by one cheap XPath on first use and shared by all getters, so pages
+answered from the page model pay only for the parts they touch. The getters in
+`extractors` answer from it and keep their XPath as the fallback.
+
+Helpers here follow XPath semantics: `norm` is normalize-space() (ASCII
+whitespace only) and `ascii_upper` is the translate() upper-casing the
+extractors use.
+"""
+
+from __future__ import annotations
+
+import re
+import string
+import time
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from typing import Any
+
+from lxml import etree, html
+
+from .htmlslice import LISTING_REGIONS, slice_html
+from .metrics import StageTrace
+
+_WS = re.compile(r"[ \t\r\n]+")
+_ASCII_UPPER = str.maketrans(string.ascii_lowercase, string.ascii_uppercase)
+_MISSING = object()
+
+# Hashed Rightmove class names the getters look up
+HISTORY_PANEL_CLASS = "_1q3dx8PQU8WWiT7uw7J9Ck"
+HISTORY_ENTRY_CLASS = "_2nk2x6QhNB1UrxdI5KpvaF"
+ADDRESS_TOOLTIP_CLASS = "OojFk4MTxFDKIfqreGNt0"
+
+# Each section of the index is one named-step XPath, which libxml2 answers
+# without evaluating a predicate on every element
+_H1_XP = etree.XPath("//h1", smart_strings=False)
+_HEADINGS_XP = etree.XPath("//h2 | //h3", smart_strings=False)
+_DT_XP = etree.XPath("//dt", smart_strings=False)
+_META_XP = etree.XPath("//meta[@itemprop]", smart_strings=False)
+_IMG_SRC_XP = etree.XPath("//img/@src", smart_strings=False)
+_A_HREF_XP = etree.XPath("//a/@href", smart_strings=False)
+_PROPERTY_SCRIPT_XP = etree.XPath(
+    '//script[contains(text(), "propertyData")]//text()', smart_strings=False
+)
+_TESTID_XP = etree.XPath("//*[@data-testid=$name]", smart_strings=False)
+_CLASS_XP = etree.XPath("//*[@class][contains(@class, $token)]", smart_strings=False)
+# Leaf elements whose text is exactly a label; normalize-space() is cheap on leaves
+_LEAF_LABEL_XP = etree.XPath("//*[not(*)][normalize-space()=$label]", smart_strings=False)
+
+string_value = etree.XPath("string()", smart_strings=False)
+
+
+def norm(text: str) -> str:
+    return _WS.sub(" ", text).strip(" \t\r\n")
+
+
+def ascii_upper(text: str) -> str:
+    return text.translate(_ASCII_UPPER)
+
+
+def is_element(node: etree._Element) -> bool:
+    # Comments and processing instructions have a function as their tag
+    return isinstance(node.tag, str)
+
+
+def following(el: html.HtmlElement) -> html.HtmlElement | None:
+    """The XPath `following::*[1]` of `el`: the first element after its subtree."""
+    while el is not None:
+        nxt = el.getnext()
+        while nxt is not None and not is_element(nxt):
+            nxt = nxt.getnext()
+        if nxt is not None:
+            return nxt
+        el = el.getparent()
+    return None
+
+
+def doc_order(el: html.HtmlElement) -> tuple[int, ...]:
+    """A key that sorts elements in document order (child positions from the top level)."""
+    path = []
+    parent = el.getparent()
+    while parent is not None:
+        path.append(parent.index(el))
+        el, parent = parent, parent.getparent()
+    path.append(sum(1 for _ in el.itersiblings(preceding=True)))
+    return tuple(reversed(path))
+
+
+def top_level(doc: html.HtmlElement) -> list[html.HtmlElement]:
+    """The document's top-level elements; malformed pages can leave several beside the root."""
+    root = doc.getroottree().getroot()
+    before = [e for e in root.itersiblings(preceding=True) if is_element(e)]
+    return [*reversed(before), root, *(e for e in root.itersiblings() if is_element(e))]
+
+
+def is_descendant(el: html.HtmlElement, ancestor: html.HtmlElement) -> bool:
+    return any(a is ancestor for a in el.iterancestors())
+
+
+def is_following(el: html.HtmlElement, anchor: html.HtmlElement) -> bool:
+    """Whether `el` is on the XPath following axis of `anchor`."""
+    return doc_order(el) > doc_order(anchor) and not is_descendant(el, anchor)
+
+
+@dataclass(slots=True)
+class DtPair:
+    text: str  # normalize-space() of the dt
+    raw: str  # string value of the dt
+    dd: html.HtmlElement
+    in_dl: bool
+
+
+@dataclass(slots=True)
+class Heading:
+    el: html.HtmlElement
+    text: str
+    raw: str
+
+
+class DocIndex:
+    """What the listing getters anchor on, each part gathered on first use and kept."""
+
+    __slots__ = ("tops", "_memo")
+
+    def __init__(self, doc: html.HtmlElement) -> None:
+        self.tops = top_level(doc)
+        self._memo: dict[object, Any] = {}
+
+    def _once(self, key: object, build: Callable[[], Any]) -> Any:
+        found = self._memo.get(key, _MISSING)
+        if found is _MISSING:
+            found = self._memo[key] = build()
+        return found
+
+    @property
+    def h1(self) -> list[html.HtmlElement]:
+        return self._once("h1", lambda: _H1_XP(self.tops[0]))
+
+    @property
+    def headings(self) -> list[Heading]:
+        """h2 and h3 elements."""
+        return self._once("headings", lambda: [_heading(el) for el in _HEADINGS_XP(self.tops[0])])
+
+    @property
+    def pairs(self) -> list[DtPair]:
+        """Every dt with a following-sibling dd."""
+        return self._once(
+            "pairs", lambda: [p for p in map(_dt_pair, _DT_XP(self.tops[0])) if p is not None]
+        )
+
+    @property
+    def metas(self) -> list[html.HtmlElement]:
+        """meta elements with an itemprop."""
+        return self._once("metas", lambda: _META_XP(self.tops[0]))
+
+    @property
+    def imgs(self) -> list[str]:
+        return self._once("imgs", lambda: _IMG_SRC_XP(self.tops[0]))
+
+    @property
+    def tels(self) -> list[str]:
+        """tel: link targets."""
+        return self._once(
+            "tels", lambda: [h for h in _A_HREF_XP(self.tops[0]) if h.startswith("tel:")]
+        )
+
+    @property
+    def property_scripts(self) -> list[str]:
+        """Text of scripts mentioning propertyData."""
+        return self._once("property_scripts", lambda: _PROPERTY_SCRIPT_XP(self.tops[0]))
+
+    def testid(self, name: str) -> list[html.HtmlElement]:
+        return self._once(("testid", name), lambda: _TESTID_XP(self.tops[0], name=name))
+
+    def with_class(self, token: str) -> list[html.HtmlElement]:
+        """Elements carrying `token` as a whole class name."""
+        return self._once(
+            ("class", token),
+            lambda: [
+                el
+                for el in _CLASS_XP(self.tops[0], token=token)
+                if token in el.get("class").split()
+            ],
+        )
+
+    def leaves(self, label: str) -> list[html.HtmlElement]:
+        """Leaf elements whose normalized text is `label`."""
+        return self._once(("leaves", label), lambda: _LEAF_LABEL_XP(self.tops[0], label=label))
+
+    def dd(self, label: str) -> html.HtmlElement | None:
+        """`//dt[normalize-space()=label]/following-sibling::dd[1]`."""
+        for p in self.pairs:
+            if p.text == label:
+                return p.dd
+        return None
+
+    def outermost(self, el: html.HtmlElement, text: str) -> Iterator[html.HtmlElement]:
+        """`el` and each ancestor whose normalized string value is still `text`, innermost first."""
+        while el is not None:
+            yield el
+            el = el.getparent()
+            if el is None or norm(string_value(el)) != text:
+                return
+
+    def label_after(self, label: str, anchor: html.HtmlElement) -> html.HtmlElement | None:
+        """`anchor/following::*[normalize-space()=label][1]`, for labels held by a leaf element."""
+        for el in self.leaves(label):
+            if is_following(el, anchor):
+                *_, outer = self.outermost(el, label)
+                return outer
+        return None
+
+    def label_following(self, label: str, tags: frozenset[str]) -> html.HtmlElement | None:
+        """`//*[normalize-space()=label]/following::*[1][self::tag...]`.
+
+        Answered from the leaf labels; a label split across inline elements
+        falls back to a scan.
+        """
+        leaves = self.leaves(label)
+        if not leaves:
+            found = self.following_containing(
+                lambda s: label in norm(s), tags, exact=lambda s: norm(s) == label
+            )
+            return found[0] if found else None
+        for el in leaves:
+            for node in self.outermost(el, label):
+                nxt = following(node)
+                if nxt is not None and nxt.tag in tags:
+                    return nxt
+        return None
+
+    def containing(self, pred: Callable[[str], bool]) -> list[html.HtmlElement]:
+        """Every element whose string value satisfies `pred`, in document order.
+
+        `pred` must be a substring-style test, true for an element whenever it is
+        true for any child, so subtrees that fail are skipped whole.
+        """
+        out = []
+        stack = list(reversed(self.tops))
+        while stack:
+            el = stack.pop()
+            if not pred(string_value(el)):
+                continue
+            out.append(el)
+            stack.extend(reversed([c for c in el if is_element(c)]))
+        return out
+
+    def following_containing(
+        self,
+        pred: Callable[[str], bool],
+        tags: frozenset[str] | None = None,
+        exact: Callable[[str], bool] | None = None,
+    ) -> list[html.HtmlElement]:
+        """`//*[pred]/following::*[1][self::tag...]` as a document-ordered node list.
+
+        `exact` further filters the matches without steering the scan.
+        """
+        found = {}
+        for el in self.containing(pred):
+            if exact is not None and not exact(string_value(el)):
+                continue
+            nxt = following(el)
+            if nxt is not None and (tags is None or nxt.tag in tags):
+                found[id(nxt)] = nxt
+        return sorted(found.values(), key=doc_order)
+
+    def next_containing(
+        self, anchor: html.HtmlElement, pred: Callable[[str], bool]
+    ) -> html.HtmlElement | None:
+        """`anchor/following::*[pred][1]`, skipping the subtrees that fail `pred`."""
+        el = following(anchor)
+        while el is not None:
+            if pred(string_value(el)):
+                return el
+            el = following(el)
+        return None
+
+
+def _heading(el: html.HtmlElement) -> Heading:
+    raw = string_value(el)
+    return Heading(el, norm(raw), raw)
+
+
+def _dt_pair(dt: html.HtmlElement) -> DtPair | None:
+    dd = next(dt.itersiblings("dd"), None)
+    if dd is None:
+        return None
+    raw = string_value(dt)
+    return DtPair(norm(raw), raw, dd, next(dt.iterancestors("dl"), None) is not None)
+
+
+class LazyDoc:
+    """Parse and index the listing HTML on first use only, so JSON-complete pages skip lxml.
+
+    Only the page regions in `LISTING_REGIONS` are parsed at first; `widen`
+    swaps in the whole page for a lookup that can miss in them. Pass
+    `partial=True` with a `doc` that is such a slice.
+    """
+
+    def __init__(
+        self,
+        content: str,
+        doc: html.HtmlElement | None = None,
+        trace: StageTrace | None = None,
+        *,
+        partial: bool = False,
+    ) -> None:
+        self.content = content
+        self._doc = doc
+        self._partial = partial
+        self._index: DocIndex | None = None
+        self._trace = trace or StageTrace()
+        self.parse_sec = 0.0
+
+    def __call__(self) -> html.HtmlElement:
+        if self._doc is None:
+            t0 = time.perf_counter()
+            with self._trace("parse_html"):
+                sliced = slice_html(self.content, LISTING_REGIONS)
+                self._partial = sliced is not None
+                self._doc = html.fromstring(sliced if sliced is not None else self.content)
+            self.parse_sec += time.perf_counter() - t0
+        return self._doc
+
+    def widen(self) -> bool:
+        """Replace a region slice with the whole page; False when it is whole already."""
+        if not self._partial:
+            return False
+        t0 = time.perf_counter()
+        with self._trace("parse_html"):
+            self._doc = html.fromstring(self.content)
+        self.parse_sec += time.perf_counter() - t0
+        self._partial = False
+        self._index = None
+        return True
+
+    def index(self) -> DocIndex:
+        if self._index is None:
+            self._index = DocIndex(self())
+        return self._index
+
+    def clock(self) -> float:
+        return self.parse_sec
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import asyncio
+import random
+from dataclasses import dataclass, field
+
+import httpx
+from playwright.async_api import Error as PlaywrightError
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+from pydantic import ValidationError
+
+# Substrings of block/challenge pages served instead of a listing
+BLOCK_MARKERS = (
+    "captcha",
+    "access denied",
+    "are you a robot",
+    "unusual traffic",
+    "request blocked",
+)
+
+# Base backoff per failure class before a URL is re-queued; doubled per attempt.
+# Classes missing here are not retried.
+RETRY_BACKOFF_SEC: dict[str, float] = {
+    "timeout": 5.0,
+    "navigation": 2.0,
+    "blocked": 30.0,
+    "extraction": 1.0,
+}
+
+
+class ScrapeError(Exception):
+    kind = "other"
+
+
+class BlockedError(ScrapeError):
+    kind = "blocked"
+
+
+class ListingRemovedError(ScrapeError):
+    kind = "removed"
+
+
+class ExtractionError(ScrapeError):
+    kind = "extraction"
+
+
+def looks_blocked(text: str) -> bool:
+    text = text.lower()
+    return any(m in text for m in BLOCK_MARKERS)
+
+
+def check_status(status: int | None, url: str) -> None:
+    """Raise the matching ScrapeError for a blocking or gone HTTP status."""
+    if status in (403, 429):
+        raise BlockedError(f"HTTP {status} for {url}")
+    if status in (404, 410):
+        raise ListingRemovedError(f"HTTP {status} for {url}")
+
+
+def classify(exc: BaseException) -> str:
+    """Map an exception from a scrape attempt to a failure class."""
+    if isinstance(exc, ScrapeError):
+        return exc.kind
+    if isinstance(exc, (PlaywrightTimeoutError, httpx.TimeoutException, asyncio.TimeoutError)):
+        return "timeout"
+    if isinstance(exc, ValidationError):
+        return "extraction"
+    if isinstance(exc, httpx.HTTPStatusError):
+        try:
+            check_status(exc.response.status_code, str(exc.request.url))
+        except ScrapeError as e:
+            return e.kind
+        return "navigation"
+    if isinstance(exc, (PlaywrightError, httpx.HTTPError)):
+        msg = str(exc)
+        if "Timeout" in msg:
+            return "timeout"
+        return "navigation"
+    return "other"
+
+
+def retry_delay(kind: str, attempt: int) -> float | None:
+    """Backoff before retry number `attempt` (1-based), or None if `kind` is not retryable."""
+    base = RETRY_BACKOFF_SEC.get(kind)
+    if base is None:
+        return None
+    return base * 2 ** (attempt - 1) * random.uniform(0.8, 1.2)
+
+
+@dataclass(slots=True)
+class FailureStats:
+    errors: dict[str, int] = field(default_factory=dict)
+    retried: dict[str, int] = field(default_factory=dict)
+    gave_up: int = 0
+
+    def record(self, kind: str, *, retried: bool) -> None:
+        self.errors[kind] = self.errors.get(kind, 0) + 1
+        if retried:
+            self.retried[kind] = self.retried.get(kind, 0) + 1
+
+    def summary(self) -> str:
+        parts = [
+            f"{kind} {n} ({self.retried.get(kind, 0)} retried)"
+            for kind, n in sorted(self.errors.items(), key=lambda kv: -kv[1])
+        ]
+        return f"Failures: {', '.join(parts) or 'none'}; {self.gave_up} URLs gave up"
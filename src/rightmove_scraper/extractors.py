@@ -1,8 +1,30 @@
 from __future__ import annotations
 
+import json
 import re
+from collections.abc import Iterator
+from functools import partial
+from typing import Any
 
-from lxml import html
+from lxml import etree, html
+
+from .docindex import (
+    ADDRESS_TOOLTIP_CLASS,
+    HISTORY_ENTRY_CLASS,
+    HISTORY_PANEL_CLASS,
+    DocIndex,
+    ascii_upper,
+    following,
+    norm,
+)
+
+
+def _xp(expr: str) -> etree.XPath:
+    # Compiled once at import; label lookups pass their label as an XPath variable
+    return etree.XPath(expr, smart_strings=False)
+
+
+_UPPER = 'translate(normalize-space(), "abcdefghijklmnopqrstuvwxyz", "ABCDEFGHIJKLMNOPQRSTUVWXYZ")'
 
 
 def _text_content(node) -> str:
@@ -11,13 +33,34 @@ def _text_content(node) -> str:
     return " ".join(node.itertext()).strip()
 
 
-def get_title(doc: html.HtmlElement) -> str | None:
+def _listed(node: html.HtmlElement | None) -> list[html.HtmlElement]:
+    return [node] if node is not None else []
+
+
+def _results(
+    doc: html.HtmlElement, xps: list[etree.XPath], from_index: list[list[Any]] | None = None
+) -> Iterator[list[Any]]:
+    """Result lists of `xps` in order; the leading ones come from the document index when given."""
+    done = from_index or []
+    yield from done
+    for xp in xps[len(done):]:
+        yield xp(doc)
+
+
+_TITLE_CLASS = "_2uQQ3SV0eMHL1P6t5ZDo2q"
+_TITLE_XPS = [
+    _xp(f'//h1[contains(@class, "{_TITLE_CLASS}")]'),
+    _xp('//h1'),
+]
+
+
+def get_title(doc: html.HtmlElement, *, index: DocIndex | None = None) -> str | None:
     # Common selector for title header
-    for xp in [
-        '//h1[contains(@class, "_2uQQ3SV0eMHL1P6t5ZDo2q")]',
-        '//h1',
-    ]:
-        nodes = doc.xpath(xp)
+    from_index = None
+    if index is not None:
+        titled = [h for h in index.h1 if _TITLE_CLASS in (h.get("class") or "")]
+        from_index = [titled, index.h1]
+    for nodes in _results(doc, _TITLE_XPS, from_index):
         if nodes:
             text = _text_content(nodes[0])
             if text:
@@ -25,20 +68,25 @@ def get_title(doc: html.HtmlElement) -> str | None:
     return None
 
 
-def get_price_text(doc: html.HtmlElement) -> str | None:
-    # Rightmove price often in elements with data-testid or specific classes
-    candidates = [
-        '//*[@data-testid="price"]',
-        '//*[contains(@class, "_1gfnqJ3Vtd1z40MlC0MzXu")]//text()',
-        '//*[contains(@class, "property-header-price")]//text()',
-        '//*[contains(@class, "price")]//text()',
-        '//span[contains(., "£")]//text()',
-    ]
-    for xp in candidates:
-        try:
-            nodes = doc.xpath(xp)
-        except Exception:
-            nodes = []
+# Rightmove price often in elements with data-testid or specific classes
+_PRICE_XPS = [
+    _xp('//*[@data-testid="price"]'),
+    _xp('//*[contains(@class, "_1gfnqJ3Vtd1z40MlC0MzXu")]//text()'),
+    _xp('//*[contains(@class, "property-header-price")]//text()'),
+    _xp('//*[contains(@class, "price")]//text()'),
+    _xp('//span[contains(., "£")]//text()'),
+]
+
+
+def get_price_text(doc: html.HtmlElement, *, index: DocIndex | None = None) -> str | None:
+    for i, xp in enumerate(_PRICE_XPS):
+        if i == 0 and index is not None:
+            nodes = index.testid("price")
+        else:
+            try:
+                nodes = xp(doc)
+            except Exception:
+                nodes = []
         if not nodes:
             continue
         if isinstance(nodes[0], str):
@@ -56,40 +104,69 @@ def get_price_text(doc: html.HtmlElement) -> str | None:
     return None
 
 
-def get_summary_panel_value(doc: html.HtmlElement, label: str) -> str | None:
-    xp = f'//dt[normalize-space()="{label}"]/following-sibling::dd[1]'
-    nodes = doc.xpath(xp)
+_DT_DD_XP = _xp("//dt[normalize-space()=$label]/following-sibling::dd[1]")
+
+
+def get_summary_panel_value(
+    doc: html.HtmlElement, label: str, *, index: DocIndex | None = None
+) -> str | None:
+    if index is not None:
+        dd = index.dd(label)
+        nodes = [dd] if dd is not None else []
+    else:
+        nodes = _DT_DD_XP(doc, label=label)
     if nodes:
         val = _text_content(nodes[0])
         return val or None
     return None
 
 
-def get_key_features(doc: html.HtmlElement) -> list[str]:
-    headings = doc.xpath('//*[self::h2 or self::h3][contains(normalize-space(), "Key features")]')
+_FEATURES_HEADING_XP = _xp('//*[self::h2 or self::h3][contains(normalize-space(), "Key features")]')
+_FEATURES_UL_XP = _xp('//ul[ancestor::*[contains(., "Key features")]]')
+_LI_XP = _xp(".//li")
+
+
+def get_key_features(doc: html.HtmlElement, *, index: DocIndex | None = None) -> list[str]:
+    if index is not None:
+        headings = [h.el for h in index.headings if "Key features" in h.text]
+    else:
+        headings = _FEATURES_HEADING_XP(doc)
     if headings:
         h = headings[0]
         ul = h.getnext()
         if ul is not None and ul.tag.lower() == "ul":
-            lis = [" ".join(li.itertext()).strip() for li in ul.xpath(".//li")] 
+            lis = [" ".join(li.itertext()).strip() for li in _LI_XP(ul)]
             return [x for x in lis if x]
     # Fallback: search any UL with key features near text
-    ul_nodes = doc.xpath('//ul[ancestor::*[contains(., "Key features")]]')
+    ul_nodes = _FEATURES_UL_XP(doc)
     for ul in ul_nodes:
-        lis = [" ".join(li.itertext()).strip() for li in ul.xpath(".//li")] 
+        lis = [" ".join(li.itertext()).strip() for li in _LI_XP(ul)]
         out = [x for x in lis if x]
         if out:
             return out
     return []
 
 
-def get_description(doc: html.HtmlElement) -> str | None:
+_DESCRIPTION_XPS = [
+    _xp(
+        "//*[self::h2 or self::h3]"
+        '[contains(translate(normalize-space(), "DESCRIPTION", "description"), "description")]'
+    ),
+    _xp('//*[contains(., "Description")]'),
+]
+
+
+_DESCRIPTION_LOWER = str.maketrans("DESCRIPTION", "description")
+
+
+def get_description(doc: html.HtmlElement, *, index: DocIndex | None = None) -> str | None:
     # Click-expansion is done in the browser step; here we read text
-    for xp in [
-        '//*[self::h2 or self::h3][contains(translate(normalize-space(), "DESCRIPTION", "description"), "description")]',
-        '//*[contains(., "Description")]',
-    ]:
-        nodes = doc.xpath(xp)
+    from_index = None
+    if index is not None:
+        from_index = [
+            [h.el for h in index.headings if "description" in h.text.translate(_DESCRIPTION_LOWER)]
+        ]
+    for nodes in _results(doc, _DESCRIPTION_XPS, from_index):
         if nodes:
             texts: list[str] = []
             n = nodes[0]
@@ -105,15 +182,31 @@ def get_description(doc: html.HtmlElement) -> str | None:
     return None
 
 
-def _fact_following_value(doc: html.HtmlElement, label: str) -> str | None:
-    # Try multiple patterns; Rightmove can render these in different panels
-    xps = [
-        f'//*[normalize-space()="{label}"]/following::*[1][self::div or self::span or self::p]',
-        f'//dt[normalize-space()="{label}"]/following-sibling::dd[1]',
-        f'//*[contains(translate(normalize-space(), " ", ""), "{label.lower().replace(" ", "")}")]/following::*[1]'
-    ]
-    for xp in xps:
-        nodes = doc.xpath(xp)
+# Try multiple patterns; Rightmove can render these in different panels
+_FACT_FOLLOWING_XPS = [
+    _xp("//*[normalize-space()=$label]/following::*[1][self::div or self::span or self::p]"),
+    _DT_DD_XP,
+    _xp('//*[contains(translate(normalize-space(), " ", ""), $compact)]/following::*[1]'),
+]
+
+
+_BLOCK_TAGS = frozenset({"div", "span", "p"})
+
+
+def _fact_following_value(
+    doc: html.HtmlElement, label: str, index: DocIndex | None = None
+) -> str | None:
+    compact = label.lower().replace(" ", "")
+    if index is not None:
+        lookups = [
+            lambda: _listed(index.label_following(label, _BLOCK_TAGS)),
+            lambda: _listed(index.dd(label)),
+            lambda: index.following_containing(lambda s: compact in norm(s).replace(" ", "")),
+        ]
+    else:
+        lookups = [partial(xp, doc, label=label, compact=compact) for xp in _FACT_FOLLOWING_XPS]
+    for lookup in lookups:
+        nodes = lookup()
         if nodes:
             val = _text_content(nodes[0])
             if val:
@@ -121,17 +214,40 @@ def _fact_following_value(doc: html.HtmlElement, label: str) -> str | None:
     return None
 
 
-def find_label_value_fuzzy(doc: html.HtmlElement, labels: list[str]) -> str | None:
+_FUZZY_XPS = [
+    # 1) Exact text node containing label then next sibling
+    _xp(
+        f"//*[contains({_UPPER}, $upper)]"
+        "/following::*[1][self::span or self::div or self::dd or self::p]"
+    ),
+    _xp("//dt[contains(., $label)]/following-sibling::dd[1]"),
+    _xp("//*[contains(., $label)]/following::*[1]"),
+]
+
+
+_FUZZY_TAGS = frozenset({"span", "div", "dd", "p"})
+
+
+def _fuzzy_lookups(index: DocIndex, label: str) -> list:
+    upper = label.upper()
+    return [
+        lambda: index.following_containing(lambda s: upper in ascii_upper(norm(s)), _FUZZY_TAGS),
+        lambda: [p.dd for p in index.pairs if label in p.raw][:1],
+        lambda: index.following_containing(lambda s: label in s),
+    ]
+
+
+def find_label_value_fuzzy(
+    doc: html.HtmlElement, labels: list[str], *, index: DocIndex | None = None
+) -> str | None:
     # Try several heuristics near the label text
     for label in labels:
-        # 1) Exact text node containing label then next sibling
-        xp_list = [
-            f'//*[contains(translate(normalize-space(), "abcdefghijklmnopqrstuvwxyz", "ABCDEFGHIJKLMNOPQRSTUVWXYZ"), "{label.upper()}")]/following::*[1][self::span or self::div or self::dd or self::p]',
-            f'//dt[contains(., "{label}")]/following-sibling::dd[1]',
-            f'//*[contains(., "{label}")]/following::*[1]'
-        ]
-        for xp in xp_list:
-            nodes = doc.xpath(xp)
+        if index is not None:
+            lookups = _fuzzy_lookups(index, label)
+        else:
+            lookups = [partial(xp, doc, label=label, upper=label.upper()) for xp in _FUZZY_XPS]
+        for lookup in lookups:
+            nodes = lookup()
             if nodes:
                 val = _text_content(nodes[0])
                 if val:
@@ -150,7 +266,20 @@ def derive_from_key_features(features: list[str], keywords: list[str]) -> str |
     return None
 
 
-def get_fact_after_description(doc: html.HtmlElement, label: str) -> str | None:
+_DESCRIPTION_HEADING_XP = _xp(f'//*[self::h2 or self::h3][contains({_UPPER}, "DESCRIPTION")]')
+_SHOW_LESS_XP = _xp('following::*[normalize-space()="Show less"][1]')
+# Match nodes that start with the label text (to allow glossary text after the label)
+_AFTER_LABEL_XP = _xp(
+    f"following::*[starts-with({_UPPER}, $upper)] | following::*[contains({_UPPER}, $upper)]"
+)
+_FOLLOWING_BLOCKS_XP = _xp(
+    "following::*[self::div or self::span or self::p or self::dd][position()<=10]"
+)
+
+
+def get_fact_after_description(
+    doc: html.HtmlElement, label: str, *, index: DocIndex | None = None
+) -> str | None:
     """Extract a labelled fact specifically from the section shown under the Description area.
 
     Strategy:
@@ -159,27 +288,32 @@ def get_fact_after_description(doc: html.HtmlElement, label: str) -> str | None:
     - Locate the first node whose text equals the label (case-insensitive)
     - Return text of the immediate following block node (div/span/p/dd)
     """
-    hdrs = doc.xpath(
-        '//*[self::h2 or self::h3][contains(translate(normalize-space(), "abcdefghijklmnopqrstuvwxyz", "ABCDEFGHIJKLMNOPQRSTUVWXYZ"), "DESCRIPTION")]'
-    )
-    if not hdrs:
-        return None
-    anchor = hdrs[0]
-    show_less = anchor.xpath('following::*[normalize-space()="Show less"][1]')
-    if show_less:
-        anchor = show_less[0]
-
-    label_upper = label.upper()
-    # Match nodes that start with the label text (to allow glossary text after the label)
-    label_nodes = anchor.xpath(
-        f'following::*[starts-with(translate(normalize-space(), "abcdefghijklmnopqrstuvwxyz", "ABCDEFGHIJKLMNOPQRSTUVWXYZ"), "{label_upper}")] | '
-        f'following::*[contains(translate(normalize-space(), "abcdefghijklmnopqrstuvwxyz", "ABCDEFGHIJKLMNOPQRSTUVWXYZ"), "{label_upper}")]'
-    )
-    if not label_nodes:
-        return None
-    lbl = label_nodes[0]
+    upper = label.upper()
+    if index is not None:
+        heading = next((h for h in index.headings if "DESCRIPTION" in ascii_upper(h.text)), None)
+        if heading is None:
+            return None
+        anchor = index.label_after("Show less", heading.el)
+        if anchor is None:
+            anchor = heading.el
+        lbl = index.next_containing(anchor, lambda s: upper in ascii_upper(norm(s)))
+        if lbl is None:
+            return None
+    else:
+        hdrs = _DESCRIPTION_HEADING_XP(doc)
+        if not hdrs:
+            return None
+        anchor = hdrs[0]
+        show_less = _SHOW_LESS_XP(anchor)
+        if show_less:
+            anchor = show_less[0]
+
+        label_nodes = _AFTER_LABEL_XP(anchor, upper=upper)
+        if not label_nodes:
+            return None
+        lbl = label_nodes[0]
     # Scan a few following block nodes to skip glossary helper text
-    candidates = lbl.xpath('following::*[self::div or self::span or self::p or self::dd][position()<=10]')
+    candidates = _FOLLOWING_BLOCKS_XP(lbl)
     def clean(txt: str) -> str:
         return " ".join(txt.split())
     for node in candidates:
@@ -208,32 +342,47 @@ def get_fact_after_description(doc: html.HtmlElement, label: str) -> str | None:
     return None
 
 
-def get_fact_grid_value(doc: html.HtmlElement, label: str) -> str | None:
+_FACT_GRID_XP = _xp(f"//dl//dt[starts-with({_UPPER}, $upper)]/following-sibling::dd[1]")
+
+
+def get_fact_grid_value(
+    doc: html.HtmlElement, label: str, *, index: DocIndex | None = None
+) -> str | None:
     """Find value from dl/dt/dd grids where dt starts with the label text.
 
     This targets the Facts row under the Description area on Rightmove which
     renders as <dl><dt>LABEL…</dt><dd>VALUE</dd>…</dl> with glossary hints in dt.
     """
-    label_upper = label.upper()
-    nodes = doc.xpath(
-        f'//dl//dt[starts-with(translate(normalize-space(), "abcdefghijklmnopqrstuvwxyz", "ABCDEFGHIJKLMNOPQRSTUVWXYZ"), "{label_upper}")]/following-sibling::dd[1]'
-    )
+    upper = label.upper()
+    if index is not None:
+        nodes = [p.dd for p in index.pairs if p.in_dl and ascii_upper(p.text).startswith(upper)][:1]
+    else:
+        nodes = _FACT_GRID_XP(doc, upper=upper)
     if nodes:
         val = _text_content(nodes[0]).strip()
         return val or None
     return None
 
 
-def get_fact_value(doc: html.HtmlElement, label: str) -> str | None:
-    return _fact_following_value(doc, label)
+def get_fact_value(
+    doc: html.HtmlElement, label: str, *, index: DocIndex | None = None
+) -> str | None:
+    return _fact_following_value(doc, label, index)
+
 
+_AGENT_XPS = [
+    _xp('//*[self::h2 or self::h3][contains(., "MARKETED BY")]/following::*[1]'),
+    _xp('//*[contains(., "MARKETED BY")]/following::*[1]'),
+]
 
-def get_agent(doc: html.HtmlElement) -> str | None:
-    for xp in [
-        '//*[self::h2 or self::h3][contains(., "MARKETED BY")]/following::*[1]',
-        '//*[contains(., "MARKETED BY")]/following::*[1]',
-    ]:
-        nodes = doc.xpath(xp)
+
+def get_agent(doc: html.HtmlElement, *, index: DocIndex | None = None) -> str | None:
+    from_index = None
+    if index is not None:
+        heading = next((h for h in index.headings if "MARKETED BY" in h.raw), None)
+        if heading is not None:
+            from_index = [_listed(following(heading.el))]
+    for nodes in _results(doc, _AGENT_XPS, from_index):
         if nodes:
             text = _text_content(nodes[0])
             if text:
@@ -243,7 +392,19 @@ def get_agent(doc: html.HtmlElement) -> str | None:
 
 # New helpers per template.csv
 
-def get_photo_urls(doc: html.HtmlElement, limit: int = 10) -> list[str]:
+_PHOTO_META_XPS = [
+    _xp('//*[@data-testid="photo-collage"]//meta[@itemprop="contentUrl"]/@content'),
+    _xp('//meta[@itemprop="contentUrl" and contains(@content, "/IMG_")]/@content'),
+]
+_PHOTO_IMG_XPS = [
+    _xp('//*[@data-testid="photo-collage"]//img/@src'),
+    _xp('//img[contains(@src, "/IMG_")]/@src'),
+]
+
+
+def get_photo_urls(
+    doc: html.HtmlElement, limit: int = 10, *, index: DocIndex | None = None
+) -> list[str]:
     """Extract up to `limit` full-size photo URLs in order.
 
     Heuristics:
@@ -253,13 +414,30 @@ def get_photo_urls(doc: html.HtmlElement, limit: int = 10) -> list[str]:
     """
     urls: list[str] = []
     seen: set[str] = set()
+    metas = imgs = None
+    if index is not None:
+        collages = index.testid("photo-collage")
+        metas = [
+            [
+                m.get("content")
+                for c in collages
+                for m in c.iterdescendants("meta")
+                if m.get("itemprop") == "contentUrl"
+            ],
+            [
+                m.get("content")
+                for m in index.metas
+                if m.get("itemprop") == "contentUrl" and "/IMG_" in (m.get("content") or "")
+            ],
+        ]
+        imgs = [
+            [i.get("src") for c in collages for i in c.iterdescendants("img")],
+            [u for u in index.imgs if "/IMG_" in u],
+        ]
 
     # 1) Prefer itemprop contentUrl nodes
-    for xp in [
-        '//*[@data-testid="photo-collage"]//meta[@itemprop="contentUrl"]/@content',
-        '//meta[@itemprop="contentUrl" and contains(@content, "/IMG_")]/@content',
-    ]:
-        for u in doc.xpath(xp):
+    for vals in _results(doc, _PHOTO_META_XPS, metas):
+        for u in vals:
             if isinstance(u, str) and u and u not in seen:
                 seen.add(u)
                 urls.append(u)
@@ -267,11 +445,8 @@ def get_photo_urls(doc: html.HtmlElement, limit: int = 10) -> list[str]:
                     return urls
 
     # 2) Fallback to <img src> within collage/thumbs
-    for xp in [
-        '//*[@data-testid="photo-collage"]//img/@src',
-        '//img[contains(@src, "/IMG_")]/@src',
-    ]:
-        for u in doc.xpath(xp):
+    for vals in _results(doc, _PHOTO_IMG_XPS, imgs):
+        for u in vals:
             if isinstance(u, str) and u and u not in seen:
                 seen.add(u)
                 urls.append(u)
@@ -281,51 +456,75 @@ def get_photo_urls(doc: html.HtmlElement, limit: int = 10) -> list[str]:
     return urls[:limit]
 
 
-def get_floorplan_url(doc: html.HtmlElement) -> str | None:
+_FLOORPLAN_XPS = [
+    _xp('//img[contains(@src, "_FLP_")]/@src'),
+    _xp('//meta[@itemprop="image" and contains(@content, "_FLP_")]/@content'),
+    _xp('//a[contains(@href, "/floorplan")]/img/@src'),
+]
+
+
+def get_floorplan_url(doc: html.HtmlElement, *, index: DocIndex | None = None) -> str | None:
     """Extract a floorplan image URL if present.
 
     Normalize resized variants to the original full-size URL by:
     - Removing '/dir/' path segment (e.g., https://media.rightmove.co.uk/dir/88k/... -> https://media.rightmove.co.uk/88k/...)
     - Stripping '_max_{WxH}' suffix before extension (e.g., _max_296x197.png -> .png)
     """
-    candidates = [
-        '//img[contains(@src, "_FLP_")]/@src',
-        '//meta[@itemprop="image" and contains(@content, "_FLP_")]/@content',
-        '//a[contains(@href, "/floorplan")]/img/@src',
-    ]
-    def _normalize(u: str) -> str:
-        v = u
-        # Drop '/dir/' path segment
-        v = v.replace("/dir/", "/")
-        # Remove _max_{WxH} before extension
-        v = re.sub(r"_max_\d+x\d+(?=\.)", "", v)
-        return v
-
-    for xp in candidates:
-        vals = doc.xpath(xp)
+    from_index = None
+    if index is not None:
+        from_index = [
+            [u for u in index.imgs if "_FLP_" in u],
+            [
+                m.get("content")
+                for m in index.metas
+                if m.get("itemprop") == "image" and "_FLP_" in (m.get("content") or "")
+            ],
+        ]
+    for vals in _results(doc, _FLOORPLAN_XPS, from_index):
         for v in vals:
             if isinstance(v, str) and v:
-                return _normalize(v)
+                return normalize_floorplan_url(v)
     return None
 
 
-def get_agent_address(doc: html.HtmlElement) -> str | None:
+def normalize_floorplan_url(u: str) -> str:
+    v = u
+    # Drop '/dir/' path segment
+    v = v.replace("/dir/", "/")
+    # Remove _max_{WxH} before extension
+    v = re.sub(r"_max_\d+x\d+(?=\.)", "", v)
+    return v
+
+
+_ADDRESS_TOOLTIP_XP = _xp(f'//div[@class="{ADDRESS_TOOLTIP_CLASS}" and @title]')
+_ADDRESS_BLOCK_XPS = [
+    _xp('//*[self::h3][contains(., "About")]/following::*[contains(@class, "address")][1]'),
+    _xp('//*[contains(@class, "aboutAgent")]//*[contains(@class, "address")]'),
+]
+
+
+def get_agent_address(doc: html.HtmlElement, *, index: DocIndex | None = None) -> str | None:
     """Extract the agent address block near 'About <agent>' or 'MARKETED BY'."""
     # Try the aside contact panel address title tooltip
-    nodes = doc.xpath('//div[@class="OojFk4MTxFDKIfqreGNt0" and @title]')
+    if index is not None:
+        nodes = [
+            n
+            for n in index.with_class(ADDRESS_TOOLTIP_CLASS)
+            if n.tag == "div"
+            and n.get("class") == ADDRESS_TOOLTIP_CLASS
+            and n.get("title") is not None
+        ]
+    else:
+        nodes = _ADDRESS_TOOLTIP_XP(doc)
     if nodes:
         t = nodes[0].get("title") or ""
         t = t.strip()
         if t:
-            # Address often contains newlines; normalize to lines separated by commas
-            return re.sub(r"\s*,?\s*\n\s*", ",\n", t)
+            return normalize_agent_address(t)
 
     # Fallback: textual block under About agent
-    for xp in [
-        '//*[self::h3][contains(., "About")]/following::*[contains(@class, "address")][1]',
-        '//*[contains(@class, "aboutAgent")]//*[contains(@class, "address")]'
-    ]:
-        nodes = doc.xpath(xp)
+    for xp in _ADDRESS_BLOCK_XPS:
+        nodes = xp(doc)
         if nodes:
             text = _text_content(nodes[0])
             if text:
@@ -333,14 +532,30 @@ def get_agent_address(doc: html.HtmlElement) -> str | None:
     return None
 
 
-def get_agent_phone(doc: html.HtmlElement) -> str | None:
-    # Look for tel: links or displayed numbers near contact tray
-    for xp in [
-        '//a[starts-with(@href, "tel:")]/@href',
-        '//*[contains(@class, "contact-agent-tray")]//a[starts-with(@href, "tel:")]/@href',
-        '//a[contains(@href, "propertyId") and contains(., "Call agent")]/following::a[starts-with(@href, "tel:")][1]/@href'
-    ]:
-        vals = doc.xpath(xp)
+def normalize_agent_address(text: str) -> str:
+    # Address often contains newlines; normalize to lines separated by commas
+    return re.sub(r"\s*,?\s*\r?\n\s*", ",\n", text.strip())
+
+
+_TEL_XPS = [
+    _xp('//a[starts-with(@href, "tel:")]/@href'),
+    _xp('//*[contains(@class, "contact-agent-tray")]//a[starts-with(@href, "tel:")]/@href'),
+    _xp(
+        '//a[contains(@href, "propertyId") and contains(., "Call agent")]'
+        '/following::a[starts-with(@href, "tel:")][1]/@href'
+    ),
+]
+_PHONE_TEXT_XP = _xp(
+    '//*[contains(@class, "contact-agent")]'
+    '//*[contains(text(), "020") or contains(text(), "01") or contains(text(), "+44")]//text()'
+)
+
+
+def get_agent_phone(doc: html.HtmlElement, *, index: DocIndex | None = None) -> str | None:
+    # Look for tel: links or displayed numbers near contact tray. The later
+    # tel: XPaths select subsets of the first, so the indexed links cover all three
+    tel_lists = [index.tels] if index is not None else (xp(doc) for xp in _TEL_XPS)
+    for vals in tel_lists:
         for v in vals:
             if isinstance(v, str) and v.startswith("tel:"):
                 num = re.sub(r"[^0-9]", "", v)
@@ -348,7 +563,7 @@ def get_agent_phone(doc: html.HtmlElement) -> str | None:
                     # Keep local dialing format if present (e.g., 02039106089)
                     return num
     # Sometimes presented as plain text next to icon
-    txt_nodes = doc.xpath('//*[contains(@class, "contact-agent")]//*[contains(text(), "020") or contains(text(), "01") or contains(text(), "+44")]//text()')
+    txt_nodes = _PHONE_TEXT_XP(doc)
     if txt_nodes:
         txt = "".join([t.strip() for t in txt_nodes]).strip()
         m = re.search(r"(\+44\s?\d[\d\s]{8,}|0\d{9,})", txt)
@@ -357,13 +572,18 @@ def get_agent_phone(doc: html.HtmlElement) -> str | None:
     return None
 
 
-def get_lat_lng(doc: html.HtmlElement) -> tuple[float | None, float | None]:
+_PROPERTY_DATA_SCRIPT_XP = _xp('//script[contains(text(), "propertyData")]//text()')
+
+
+def get_lat_lng(
+    doc: html.HtmlElement, *, index: DocIndex | None = None
+) -> tuple[float | None, float | None]:
     """Attempt to extract latitude/longitude from embedded scripts or map widgets.
 
     If not present, return (None, None). Snapshot pages sometimes omit coordinates.
     """
     # Try JSON blobs on window.PAGE_MODEL/adInfo if present
-    script_texts = doc.xpath('//script[contains(text(), "propertyData")]//text()')
+    script_texts = index.property_scripts if index is not None else _PROPERTY_DATA_SCRIPT_XP(doc)
     for s in script_texts:
         try:
             # Look for patterns like "latitude":51.xxx, "longitude":-0.xxx
@@ -376,14 +596,30 @@ def get_lat_lng(doc: html.HtmlElement) -> tuple[float | None, float | None]:
     return None, None
 
 
-def get_listing_history(doc: html.HtmlElement) -> str | None:
+_HISTORY_XPS = [
+    _xp(
+        f'//*[contains(@class, "{HISTORY_PANEL_CLASS}")]'
+        f'//div[contains(@class, "{HISTORY_ENTRY_CLASS}")]'
+    ),
+    _xp('//*[contains(., "Reduced on") or contains(., "Added on")]'),
+]
+
+
+def get_listing_history(doc: html.HtmlElement, *, index: DocIndex | None = None) -> str | None:
     """Extract recent listing history snippet (e.g., 'Reduced on 10/06/2025')."""
     # The history often appears near the mortgage widget/price area
-    for xp in [
-        '//*[contains(@class, "_1q3dx8PQU8WWiT7uw7J9Ck")]//div[contains(@class, "_2nk2x6QhNB1UrxdI5KpvaF")]',
-        '//*[contains(., "Reduced on") or contains(., "Added on")]'
-    ]:
-        nodes = doc.xpath(xp)
+    from_index = None
+    if index is not None:
+        # Hashed class names are matched as whole class tokens
+        panels = set(index.with_class(HISTORY_PANEL_CLASS))
+        from_index = [
+            [
+                n
+                for n in index.with_class(HISTORY_ENTRY_CLASS)
+                if n.tag == "div" and any(a in panels for a in n.iterancestors())
+            ]
+        ]
+    for nodes in _results(doc, _HISTORY_XPS, from_index):
         for n in nodes:
             txt = _text_content(n)
             if not txt:
@@ -393,3 +629,118 @@ def get_listing_history(doc: html.HtmlElement) -> str | None:
                 return m.group(1)
     return None
 
+
+
+# Embedded page model (window.PAGE_MODEL) ---------------------------------
+
+_PAGE_MODEL_RE = re.compile(r"window\.PAGE_MODEL\s*=\s*")
+
+
+def extract_page_model(html_text: str) -> dict[str, Any] | None:
+    """Locate and decode the `window.PAGE_MODEL = {...}` JSON embedded in a listing page.
+
+    Works on the raw HTML so no DOM parse is needed; returns None when absent or invalid.
+    """
+    m = _PAGE_MODEL_RE.search(html_text)
+    if not m:
+        return None
+    try:
+        model, _ = json.JSONDecoder().raw_decode(html_text, m.end())
+    except ValueError:
+        return None
+    return model if isinstance(model, dict) else None
+
+
+def _dig(obj: Any, *keys: str) -> Any:
+    for key in keys:
+        if not isinstance(obj, dict):
+            return None
+        obj = obj.get(key)
+    return obj
+
+
+def _html_to_text(fragment: str) -> str:
+    fragment = re.sub(r"<br\s*/?>", "\n", fragment, flags=re.IGNORECASE)
+    text = html.fromstring(f"<div>{fragment}</div>").text_content()
+    lines = [" ".join(line.split()) for line in text.splitlines()]
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
+
+def _display_texts(items: Any) -> str | None:
+    if not isinstance(items, list):
+        return None
+    texts = [
+        str(i.get("displayText")).strip()
+        for i in items
+        if isinstance(i, dict) and i.get("displayText")
+    ]
+    return ", ".join(texts) or None
+
+
+def _format_sizings(sizings: Any) -> str | None:
+    if not isinstance(sizings, list):
+        return None
+    parts: list[str] = []
+    for s in sizings:
+        if not isinstance(s, dict) or s.get("minimumSize") in (None, ""):
+            continue
+        lo, hi = s.get("minimumSize"), s.get("maximumSize")
+        unit = s.get("displayUnit") or s.get("unit") or ""
+        size = f"{lo:,}" if isinstance(lo, int | float) else str(lo)
+        if hi not in (None, "", lo):
+            size += f"-{hi:,}" if isinstance(hi, int | float) else f"-{hi}"
+        parts.append(f"{size} {unit}".strip())
+    return " / ".join(parts) or None
+
+
+def page_model_fields(model: dict[str, Any] | None) -> dict[str, Any]:
+    """Map a decoded PAGE_MODEL onto raw Listing field values.
+
+    Only fields actually present in the model are returned, so callers can fall
+    back to the XPath extractors per field. Values are left un-normalized where
+    the DOM path also normalizes later (price, tenure, council tax).
+    """
+    pd = _dig(model, "propertyData")
+    if not isinstance(pd, dict):
+        return {}
+    out: dict[str, Any] = {
+        "price_text": _dig(pd, "prices", "primaryPrice"),
+        "listing_history": _dig(pd, "listingHistory", "listingUpdateReason"),
+        "property_type": pd.get("propertySubType"),
+        "property_title": _dig(pd, "address", "displayAddress"),
+        "bedrooms": pd.get("bedrooms"),
+        "bathrooms": pd.get("bathrooms"),
+        "sizes": _format_sizings(pd.get("sizings")),
+        "tenure": _dig(pd, "tenure", "tenureType"),
+        "estate_agent": (
+            _dig(pd, "customer", "branchDisplayName") or _dig(pd, "customer", "companyName")
+        ),
+        "council_tax": _dig(pd, "livingCosts", "councilTaxBand"),
+        "parking": _display_texts(_dig(pd, "features", "parking")),
+        "garden": _display_texts(_dig(pd, "features", "garden")),
+        "accessibility": _display_texts(_dig(pd, "features", "accessibility")),
+    }
+    features = pd.get("keyFeatures")
+    if isinstance(features, list):
+        out["key_features"] = [str(f).strip() for f in features if str(f).strip()]
+    description = _dig(pd, "text", "description")
+    if isinstance(description, str) and description.strip():
+        out["description"] = _html_to_text(description)
+    address = _dig(pd, "customer", "displayAddress")
+    if isinstance(address, str) and address.strip():
+        out["agent_address"] = normalize_agent_address(address)
+    phone = _dig(pd, "contactInfo", "telephoneNumbers", "localNumber")
+    if isinstance(phone, str):
+        out["localnumber"] = re.sub(r"[^0-9]", "", phone) or None
+    images = pd.get("images")
+    if isinstance(images, list):
+        out["photos"] = [i["url"] for i in images if isinstance(i, dict) and i.get("url")]
+    floorplans = pd.get("floorplans")
+    if isinstance(floorplans, list):
+        urls = [f["url"] for f in floorplans if isinstance(f, dict) and f.get("url")]
+        if urls:
+            out["floorplan"] = normalize_floorplan_url(urls[0])
+    lat, lng = _dig(pd, "location", "latitude"), _dig(pd, "location", "longitude")
+    if isinstance(lat, int | float) and isinstance(lng, int | float):
+        out["latitude"], out["longitude"] = float(lat), float(lng)
+    return {k: v for k, v in out.items() if v not in (None, "", [])}
@@ -0,0 +1,242 @@
+"""Declarative listing field rules, compiled once at import into a flat program.
+
+Each rule names a field, the strategies that can produce it in priority order,
+and an optional post-processing step. The embedded PAGE_MODEL value is always
+tried first; DOM strategies run the getters in `extractors` on the lazily
+parsed and indexed document, and derived strategies read a field extracted
+earlier. Strategy names are the ones `extractor-report` shows.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import partial
+from typing import Any
+
+from lxml import html
+
+from .docindex import ADDRESS_TOOLTIP_CLASS, DocIndex, LazyDoc
+from .extractors import (
+    derive_from_key_features,
+    find_label_value_fuzzy,
+    get_agent,
+    get_agent_address,
+    get_agent_phone,
+    get_description,
+    get_fact_after_description,
+    get_fact_grid_value,
+    get_fact_value,
+    get_floorplan_url,
+    get_key_features,
+    get_lat_lng,
+    get_listing_history,
+    get_photo_urls,
+    get_price_text,
+    get_summary_panel_value,
+    get_title,
+)
+from .fieldprofile import FieldProfiler
+from .normalize import coerce_int, normalize_council_tax, normalize_tenure
+
+# (page model fields, lazy document, values extracted so far) -> candidate value
+StepFn = Callable[[dict[str, Any], LazyDoc, dict[str, Any]], Any]
+
+
+@dataclass(frozen=True, slots=True)
+class Step:
+    name: str
+    fn: Callable[..., Any]
+    args: tuple = ()
+    # Read this earlier field's value instead of the document
+    source: str | None = None
+    # Text marking a field that can sit outside the sliced regions; only such a
+    # step retries on the whole page, and only when the raw page contains one
+    needs: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True, slots=True)
+class Rule:
+    field: str
+    steps: tuple[Step, ...]
+    post: Callable[[Any], Any] | None = None
+    accept: Callable[[Any], bool] = bool
+    # Defaults to the page model entry named like the field
+    page_model: Callable[[dict[str, Any]], Any] | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledRule:
+    field: str
+    strategies: tuple[tuple[str, StepFn], ...]
+    accept: Callable[[Any], bool]
+    post: Callable[[Any], Any] | None
+
+
+def dom(name: str, fn: Callable[..., Any], *args: Any, needs: tuple[str, ...] = ()) -> Step:
+    return Step(name, fn, args, needs=needs)
+
+
+def derived(name: str, fn: Callable[..., Any], source: str, *args: Any) -> Step:
+    return Step(name, fn, args, source)
+
+
+def facts(label: str, fuzzy: list[str]) -> tuple[Step, ...]:
+    # Strictly prefer values located under the Description section (after Show less)
+    return (
+        dom("fact_grid", get_fact_grid_value, label),
+        dom("after_description", get_fact_after_description, label),
+        dom("fact_value", get_fact_value, label),
+        dom("fuzzy", find_label_value_fuzzy, fuzzy),
+    )
+
+
+def _summary_int(doc: html.HtmlElement, label: str, *, index: DocIndex | None = None) -> int | None:
+    return coerce_int(get_summary_panel_value(doc, label, index=index))
+
+
+def _is_int(v: Any) -> bool:
+    return isinstance(v, int)
+
+
+def _has_coords(v: Any) -> bool:
+    return v is not None and v[0] is not None
+
+
+def _pm_coords(pm: dict[str, Any]) -> tuple[float, float] | None:
+    return (pm["latitude"], pm["longitude"]) if "latitude" in pm else None
+
+
+# Order matters only where a derived step reads an earlier field
+LISTING_SPEC: tuple[Rule, ...] = (
+    Rule("price_text", (dom("price_xpath", get_price_text),)),
+    Rule("listing_history", (dom("history_xpath", get_listing_history),)),
+    Rule("property_type", (dom("summary_panel", get_summary_panel_value, "PROPERTY TYPE"),)),
+    Rule("property_title", (dom("title_xpath", get_title),)),
+    Rule("bedrooms", (dom("summary_panel", _summary_int, "BEDROOMS"),), accept=_is_int),
+    Rule("bathrooms", (dom("summary_panel", _summary_int, "BATHROOMS"),), accept=_is_int),
+    Rule("sizes", (dom("summary_panel", get_summary_panel_value, "SIZE"),)),
+    Rule(
+        "tenure",
+        (
+            dom("summary_panel", get_summary_panel_value, "TENURE"),
+            dom("fuzzy", find_label_value_fuzzy, ["Tenure"]),
+        ),
+        post=normalize_tenure,
+    ),
+    Rule("key_features", (dom("features_xpath", get_key_features),)),
+    Rule("description", (dom("description_xpath", get_description),)),
+    Rule(
+        "council_tax",
+        facts("COUNCIL TAX", ["Council tax", "Council Tax Band", "Council tax band"]),
+        post=normalize_council_tax,
+    ),
+    Rule(
+        "parking",
+        (
+            *facts("PARKING", ["Parking", "Parking type", "Off street parking"]),
+            derived(
+                "key_features",
+                derive_from_key_features,
+                "key_features",
+                ["parking", "driveway", "garage"],
+            ),
+        ),
+    ),
+    Rule(
+        "garden",
+        (
+            *facts("GARDEN", ["Garden", "Gardens", "Private garden"]),
+            derived(
+                "key_features",
+                derive_from_key_features,
+                "key_features",
+                ["garden", "rear garden", "front garden"],
+            ),
+        ),
+    ),
+    Rule("accessibility", facts("ACCESSIBILITY", ["Accessibility", "Lift", "Step free"])),
+    # The agent panel and the media can sit beside <main> rather than in it
+    Rule("estate_agent", (dom("agent_xpath", get_agent, needs=("MARKETED BY",)),)),
+    Rule(
+        "agent_address",
+        (dom("agent_xpath", get_agent_address, needs=(ADDRESS_TOOLTIP_CLASS, "aboutAgent")),),
+    ),
+    Rule("localnumber", (dom("agent_xpath", get_agent_phone, needs=("tel:", "contact-agent")),)),
+    Rule("photos", (dom("gallery_xpath", get_photo_urls, 10, needs=("photo-collage", "/IMG_")),)),
+    Rule("floorplan", (dom("floorplan_xpath", get_floorplan_url, needs=("_FLP_",)),)),
+    Rule(
+        "coordinates",
+        (dom("map_xpath", get_lat_lng, needs=("propertyData",)),),
+        accept=_has_coords,
+        page_model=_pm_coords,
+    ),
+)
+
+
+def _compile_step(step: Step, accept: Callable[[Any], bool]) -> StepFn:
+    fn, args, source, needs = step.fn, step.args, step.source, step.needs
+    if source is not None:
+        return lambda pm, d, values: fn(values[source], *args)
+
+    def run(pm: dict[str, Any], d: LazyDoc, values: dict[str, Any]) -> Any:
+        value = fn(d(), *args, index=d.index())
+        # Elsewhere a miss in the parsed regions means the page lacks the field
+        if not accept(value) and any(n in d.content for n in needs) and d.widen():
+            value = fn(d(), *args, index=d.index())
+        return value
+
+    return run
+
+
+def _compile_page_model(rule: Rule) -> StepFn:
+    if rule.page_model is not None:
+        get = rule.page_model
+        return lambda pm, d, values: get(pm)
+    key = rule.field
+    return lambda pm, d, values: pm.get(key)
+
+
+def compile_spec(spec: tuple[Rule, ...]) -> tuple[CompiledRule, ...]:
+    """Bind every rule's strategies into plain callables, checking field references."""
+    seen: set[str] = set()
+    program = []
+    for rule in spec:
+        if rule.field in seen:
+            raise ValueError(f"Duplicate rule for field {rule.field!r}")
+        for step in rule.steps:
+            if step.source is not None and step.source not in seen:
+                raise ValueError(
+                    f"Rule {rule.field!r} reads {step.source!r} before it is extracted"
+                )
+        seen.add(rule.field)
+        strategies = (("page_model", _compile_page_model(rule)),) + tuple(
+            (step.name, _compile_step(step, rule.accept)) for step in rule.steps
+        )
+        program.append(CompiledRule(rule.field, strategies, rule.accept, rule.post))
+    return tuple(program)
+
+
+LISTING_PROGRAM = compile_spec(LISTING_SPEC)
+
+
+def run_program(
+    program: tuple[CompiledRule, ...],
+    pm: dict[str, Any],
+    doc: LazyDoc,
+    profile: FieldProfiler | None = None,
+) -> dict[str, Any]:
+    """Extract every field: first accepted value, else whatever the last strategy returned."""
+    values: dict[str, Any] = {}
+    for rule in program:
+        if profile is not None:
+            strategies = [(name, partial(fn, pm, doc, values)) for name, fn in rule.strategies]
+            value = profile.run(rule.field, strategies, rule.accept, doc.clock)
+        else:
+            value = None
+            for _, fn in rule.strategies:
+                value = fn(pm, doc, values)
+                if rule.accept(value):
+                    break
+        values[rule.field] = rule.post(value) if rule.post is not None else value
+    return values
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+try:
+    import fcntl
+except ImportError:  # Windows; concurrent saves are not serialised there
+    fcntl = None  # type: ignore[assignment]
+
+Strategy = tuple[str, Callable[[], Any]]
+
+
+@dataclass(slots=True)
+class StrategyStats:
+    runs: int = 0
+    hits: int = 0
+    total_sec: float = 0.0
+
+    @property
+    def misses(self) -> int:
+        return self.runs - self.hits
+
+
+@dataclass(slots=True)
+class FieldProfiler:
+    """Which extraction strategy produced each listing field, and what every attempt cost.
+
+    Strategy time excludes the lazy lxml parse a strategy may trigger; that is
+    counted once per listing in `parse_sec`, since dropping one DOM strategy
+    only moves the parse onto the next.
+    """
+
+    listings: int = 0
+    parse_sec: float = 0.0
+    empty: dict[str, int] = field(default_factory=dict)
+    fields: dict[str, dict[str, StrategyStats]] = field(default_factory=dict)
+
+    def run(
+        self,
+        name: str,
+        strategies: Sequence[Strategy],
+        accept: Callable[[Any], bool],
+        parse_clock: Callable[[], float],
+    ) -> Any:
+        """Try `strategies` in order until one is accepted, recording each attempt."""
+        per_field = self.fields.setdefault(name, {})
+        value = None
+        for strategy, fn in strategies:
+            parsed = parse_clock()
+            t0 = time.perf_counter()
+            value = fn()
+            elapsed = time.perf_counter() - t0 - (parse_clock() - parsed)
+            s = per_field.get(strategy)
+            if s is None:
+                s = per_field[strategy] = StrategyStats()
+            s.runs += 1
+            s.total_sec += elapsed
+            if accept(value):
+                s.hits += 1
+                return value
+        self.empty[name] = self.empty.get(name, 0) + 1
+        return value
+
+    def merge(self, other: FieldProfiler) -> None:
+        self.listings += other.listings
+        self.parse_sec += other.parse_sec
+        for name, n in other.empty.items():
+            self.empty[name] = self.empty.get(name, 0) + n
+        for name, strategies in other.fields.items():
+            per_field = self.fields.setdefault(name, {})
+            for strategy, s in strategies.items():
+                mine = per_field.setdefault(strategy, StrategyStats())
+                mine.runs += s.runs
+                mine.hits += s.hits
+                mine.total_sec += s.total_sec
+
+    def to_dict(self) -> dict:
+        return {
+            "listings": self.listings,
+            "parse_sec": round(self.parse_sec, 6),
+            "fields": {
+                name: {
+                    "empty": self.empty.get(name, 0),
+                    "strategies": {
+                        strategy: {
+                            "runs": s.runs,
+                            "hits": s.hits,
+                            "total_sec": round(s.total_sec, 6),
+                        }
+                        for strategy, s in strategies.items()
+                    },
+                }
+                for name, strategies in self.fields.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> FieldProfiler:
+        prof = cls(listings=data.get("listings", 0), parse_sec=data.get("parse_sec", 0.0))
+        for name, f in data.get("fields", {}).items():
+            if f.get("empty"):
+                prof.empty[name] = f["empty"]
+            prof.fields[name] = {
+                strategy: StrategyStats(**s) for strategy, s in f.get("strategies", {}).items()
+            }
+        return prof
+
+    @classmethod
+    def load(cls, path: str) -> FieldProfiler:
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    def save(self, path: str) -> None:
+        """Add this run's counts to the profile at `path`, so real data accumulates across runs.
+
+        The read-merge-write holds an exclusive lock on `<path>.lock`, so leased
+        workers finishing together do not overwrite each other's counts.
+        """
+        with open(f"{path}.lock", "w", encoding="utf-8") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            total = FieldProfiler.load(path) if os.path.exists(path) else FieldProfiler()
+            total.merge(self)
+            tmp = f"{path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(total.to_dict(), f, indent=2)
+            os.replace(tmp, path)
+
+
+def report_rows(prof: FieldProfiler) -> list[dict]:
+    """One row per (field, strategy) with hit rate and cost, in cascade order."""
+    rows = []
+    for name, strategies in prof.fields.items():
+        for strategy, s in strategies.items():
+            rows.append(
+                {
+                    "field": name,
+                    "strategy": strategy,
+                    "runs": s.runs,
+                    "hits": s.hits,
+                    "misses": s.misses,
+                    "hit_rate": s.hits / s.runs if s.runs else 0.0,
+                    "total_ms": s.total_sec * 1000,
+                    "mean_ms": s.total_sec / s.runs * 1000 if s.runs else 0.0,
+                    # Time spent per value actually produced; infinite for dead strategies
+                    "ms_per_hit": s.total_sec / s.hits * 1000 if s.hits else float("inf"),
+                }
+            )
+    return rows
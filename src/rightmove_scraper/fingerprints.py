@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import sqlite3
+from collections.abc import Iterable
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS card_fingerprints (
+    rightmove_id TEXT PRIMARY KEY,
+    card_fp TEXT NOT NULL,
+    seen_at TEXT NOT NULL,
+    scraped_fp TEXT,
+    scraped_at TEXT
+);
+"""
+
+
+class FingerprintStore:
+    """Search-card fingerprints per rightmove_id, next to the one last scraped.
+
+    Discovery records the latest card fingerprint; a successful detail scrape
+    copies it to `scraped_fp`. A listing whose card still matches its last
+    scrape, within a TTL, has nothing new to fetch.
+    """
+
+    def __init__(self, path: str) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._con = sqlite3.connect(path)
+        self._con.execute("PRAGMA journal_mode=WAL")
+        self._con.executescript(_SCHEMA)
+
+    def record_cards(self, cards: dict[str, str]) -> None:
+        now = datetime.now(UTC).isoformat()
+        with self._con:
+            self._con.executemany(
+                "INSERT INTO card_fingerprints (rightmove_id, card_fp, seen_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (rightmove_id) DO UPDATE "
+                "SET card_fp = excluded.card_fp, seen_at = excluded.seen_at",
+                ((rid, fp, now) for rid, fp in cards.items()),
+            )
+
+    def unchanged(self, rightmove_ids: Iterable[str], ttl_days: float) -> set[str]:
+        """Return the ids whose card matches the last successful scrape within `ttl_days`."""
+        cutoff = (datetime.now(UTC) - timedelta(days=ttl_days)).isoformat()
+        ids = list(rightmove_ids)
+        out: set[str] = set()
+        for i in range(0, len(ids), 500):
+            chunk = ids[i : i + 500]
+            marks = ",".join("?" * len(chunk))
+            rows = self._con.execute(
+                f"SELECT rightmove_id FROM card_fingerprints WHERE rightmove_id IN ({marks}) "
+                "AND scraped_fp = card_fp AND scraped_at >= ?",
+                (*chunk, cutoff),
+            ).fetchall()
+            out.update(r[0] for r in rows)
+        return out
+
+    def mark_scraped(self, rightmove_ids: Iterable[str]) -> None:
+        now = datetime.now(UTC).isoformat()
+        with self._con:
+            self._con.executemany(
+                "UPDATE card_fingerprints SET scraped_fp = card_fp, scraped_at = ? "
+                "WHERE rightmove_id = ?",
+                ((now, rid) for rid in rightmove_ids),
+            )
+
+    def close(self) -> None:
+        self._con.close()
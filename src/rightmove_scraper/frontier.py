@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+import functools
+import sqlite3
+import threading
+import time
+from collections.abc import Callable, Iterable
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Concatenate, ParamSpec, TypeVar
+
+from .utils import RIGHTMOVE_URL_RE
+
+PENDING = "pending"
+IN_FLIGHT = "in-flight"
+DONE = "done"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS frontier (
+    rightmove_id TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    enqueued_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    lease_owner TEXT,
+    lease_expires REAL,
+    duration_ms REAL
+);
+CREATE INDEX IF NOT EXISTS frontier_state ON frontier (state, enqueued_at);
+"""
+
+# Columns added after the first release, applied to older frontier files on open
+_MIGRATIONS = {
+    "lease_owner": "ALTER TABLE frontier ADD COLUMN lease_owner TEXT",
+    "lease_expires": "ALTER TABLE frontier ADD COLUMN lease_expires REAL",
+    "duration_ms": "ALTER TABLE frontier ADD COLUMN duration_ms REAL",
+}
+
+
+_P = ParamSpec("_P")
+_R = TypeVar("_R")
+
+
+def _now() -> str:
+    return datetime.now(UTC).isoformat()
+
+
+def _serialised(
+    method: Callable[Concatenate[Frontier, _P], _R],
+) -> Callable[Concatenate[Frontier, _P], _R]:
+    # One connection shared with worker threads; its transactions must not interleave
+    @functools.wraps(method)
+    def wrapper(self: Frontier, *args: _P.args, **kwargs: _P.kwargs) -> _R:
+        with self._lock:
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+class Frontier:
+    """Durable scrape frontier in SQLite (WAL), one row per rightmove_id.
+
+    A URL moves pending -> in-flight when claimed, then to done once its record
+    is safely written or to failed when it ran out of retries. Rows left
+    in-flight by a killed run go back to pending on the next `recover()`.
+
+    Several processes can share one file through `lease()`: each claim carries
+    an owner and an expiry that `heartbeat()` keeps pushing forward, and rows
+    whose lease ran out are claimable again by anyone, so a dead or stalled
+    worker's URLs are picked up by the others.
+
+    Calls are serialised, so an event loop can run the slow ones (which may
+    wait up to 30 s on another process's write lock) via `asyncio.to_thread`.
+    """
+
+    def __init__(self, path: str) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        # Wait on other processes' write locks instead of failing straight away
+        self._con = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._lock = threading.RLock()
+        self._con.execute("PRAGMA journal_mode=WAL")
+        self._con.execute("PRAGMA synchronous=NORMAL")
+        self._con.executescript(_SCHEMA)
+        cols = {row[1] for row in self._con.execute("PRAGMA table_info(frontier)")}
+        with self._con:
+            for col, ddl in _MIGRATIONS.items():
+                if col not in cols:
+                    self._con.execute(ddl)
+
+    @_serialised
+    def enqueue(self, urls: Iterable[str]) -> int:
+        """Add new URLs as pending in one transaction; known rightmove_ids are left alone."""
+        now = _now()
+        rows = ((m.group(2), url, now, now) for url in urls if (m := RIGHTMOVE_URL_RE.match(url)))
+        with self._con:
+            before = self._con.total_changes
+            self._con.executemany(
+                "INSERT OR IGNORE INTO frontier (rightmove_id, url, enqueued_at, updated_at) "
+                "VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            return self._con.total_changes - before
+
+    def _move(self, from_state: str, to_state: str) -> int:
+        with self._con:
+            cur = self._con.execute(
+                "UPDATE frontier SET state = ?, lease_owner = NULL, lease_expires = NULL, "
+                "updated_at = ? WHERE state = ?",
+                (to_state, _now(), from_state),
+            )
+            return cur.rowcount
+
+    @_serialised
+    def recover(self) -> int:
+        """Return URLs stranded in-flight by an interrupted run to pending."""
+        return self._move(IN_FLIGHT, PENDING)
+
+    @_serialised
+    def retry_failed(self) -> int:
+        return self._move(FAILED, PENDING)
+
+    @_serialised
+    def claim(self, limit: int) -> list[str]:
+        """Mark up to `limit` pending URLs in-flight, oldest first, and return them."""
+        with self._con:
+            rows = self._con.execute(
+                "SELECT rightmove_id, url FROM frontier WHERE state = ? "
+                "ORDER BY enqueued_at, rightmove_id LIMIT ?",
+                (PENDING, limit),
+            ).fetchall()
+            now = _now()
+            self._con.executemany(
+                "UPDATE frontier SET state = ?, attempts = attempts + 1, updated_at = ? "
+                "WHERE rightmove_id = ?",
+                ((IN_FLIGHT, now, rid) for rid, _ in rows),
+            )
+        return [url for _, url in rows]
+
+    @_serialised
+    def lease(self, owner: str, limit: int, ttl_sec: float) -> list[str]:
+        """Claim up to `limit` pending or lease-expired URLs for `owner` until now + `ttl_sec`.
+
+        A single UPDATE ... RETURNING, so concurrent workers never get the same row.
+        In-flight rows without a lease (left by a killed non-leased run) count as expired.
+        """
+        now = time.time()
+        with self._con:
+            rows = self._con.execute(
+                "UPDATE frontier SET state = ?, attempts = attempts + 1, lease_owner = ?, "
+                "lease_expires = ?, updated_at = ? WHERE rightmove_id IN ("
+                "SELECT rightmove_id FROM frontier WHERE state = ? "
+                "OR (state = ? AND (lease_expires IS NULL OR lease_expires < ?)) "
+                "ORDER BY enqueued_at, rightmove_id LIMIT ?) RETURNING url",
+                (IN_FLIGHT, owner, now + ttl_sec, _now(), PENDING, IN_FLIGHT, now, limit),
+            ).fetchall()
+        return [url for (url,) in rows]
+
+    @_serialised
+    def heartbeat(self, owner: str, ttl_sec: float) -> int:
+        """Extend every lease `owner` still holds; returns how many it holds."""
+        with self._con:
+            cur = self._con.execute(
+                "UPDATE frontier SET lease_expires = ? WHERE state = ? AND lease_owner = ?",
+                (time.time() + ttl_sec, IN_FLIGHT, owner),
+            )
+            return cur.rowcount
+
+    @_serialised
+    def release(self, owner: str) -> int:
+        """Hand `owner`'s unfinished URLs back to pending, e.g. on a clean shutdown."""
+        with self._con:
+            cur = self._con.execute(
+                "UPDATE frontier SET state = ?, lease_owner = NULL, lease_expires = NULL, "
+                "updated_at = ? WHERE state = ? AND lease_owner = ?",
+                (PENDING, _now(), IN_FLIGHT, owner),
+            )
+            return cur.rowcount
+
+    @_serialised
+    def leased_elsewhere(self, owner: str) -> int:
+        """URLs under a live lease held by another worker; they may still come back."""
+        return self._con.execute(
+            "SELECT COUNT(*) FROM frontier "
+            "WHERE state = ? AND lease_owner != ? AND lease_expires >= ?",
+            (IN_FLIGHT, owner, time.time()),
+        ).fetchone()[0]
+
+    @_serialised
+    def leases(self) -> list[tuple[str, int, float]]:
+        """(owner, URLs held, seconds until the earliest expiry) per active lease holder."""
+        now = time.time()
+        rows = self._con.execute(
+            "SELECT lease_owner, COUNT(*), MIN(lease_expires) FROM frontier "
+            "WHERE state = ? AND lease_owner IS NOT NULL GROUP BY lease_owner ORDER BY lease_owner",
+            (IN_FLIGHT,),
+        ).fetchall()
+        return [(owner, n, expires - now) for owner, n, expires in rows]
+
+    @_serialised
+    def mark_done(self, rightmove_ids: Iterable[str]) -> None:
+        now = _now()
+        with self._con:
+            self._con.executemany(
+                "UPDATE frontier SET state = ?, last_error = NULL, lease_owner = NULL, "
+                "lease_expires = NULL, updated_at = ? WHERE rightmove_id = ?",
+                ((DONE, now, rid) for rid in rightmove_ids),
+            )
+
+    @_serialised
+    def mark_failed(self, url: str, error: str) -> None:
+        m = RIGHTMOVE_URL_RE.match(url)
+        if not m:
+            return
+        with self._con:
+            self._con.execute(
+                "UPDATE frontier SET state = ?, last_error = ?, lease_owner = NULL, "
+                "lease_expires = NULL, updated_at = ? WHERE rightmove_id = ?",
+                (FAILED, error[:500], _now(), m.group(2)),
+            )
+
+    @_serialised
+    def record_durations(self, durations: Iterable[tuple[str, float]]) -> None:
+        """Store the latest successful scrape time per rightmove_id, used to balance shards."""
+        with self._con:
+            self._con.executemany(
+                "UPDATE frontier SET duration_ms = ? WHERE rightmove_id = ?",
+                ((ms, rid) for rid, ms in durations),
+            )
+
+    @_serialised
+    def durations(self) -> dict[str, float]:
+        return dict(
+            self._con.execute(
+                "SELECT rightmove_id, duration_ms FROM frontier WHERE duration_ms IS NOT NULL"
+            )
+        )
+
+    @_serialised
+    def counts(self) -> dict[str, int]:
+        rows = self._con.execute("SELECT state, COUNT(*) FROM frontier GROUP BY state").fetchall()
+        counts = {PENDING: 0, IN_FLIGHT: 0, DONE: 0, FAILED: 0}
+        counts.update(dict(rows))
+        return counts
+
+    @_serialised
+    def failures(self, limit: int = 20) -> list[tuple[str, str, int, str | None]]:
+        return self._con.execute(
+            "SELECT rightmove_id, url, attempts, last_error FROM frontier WHERE state = ? "
+            "ORDER BY updated_at DESC LIMIT ?",
+            (FAILED, limit),
+        ).fetchall()
+
+    @_serialised
+    def close(self) -> None:
+        self._con.close()
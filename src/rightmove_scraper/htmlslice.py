@@ -0,0 +1,164 @@
+"""Parse only the regions of a page the extractors read.
+
+`page.content()` returns several hundred KB per page, most of it navigation,
+footer, SVG and tracking scripts. A string scan finds each region's anchor
+after `<body>`, widens it to the enclosing element by counting that element's
+open and close tags, and lxml then parses just those fragments joined in
+document order. When a required anchor is missing or its element does not
+close, callers get None from `slice_html` and parse the whole page instead.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+
+from lxml import html
+
+_VOID = frozenset(
+    {
+        "area",
+        "base",
+        "br",
+        "col",
+        "embed",
+        "hr",
+        "img",
+        "input",
+        "link",
+        "meta",
+        "source",
+        "track",
+        "wbr",
+    }
+)
+_RAW_TEXT = frozenset({"script", "style"})
+_TAG_NAME = re.compile(r"<([A-Za-z][A-Za-z0-9-]*)")
+_BODY = re.compile(r"<body\b", re.IGNORECASE)
+_NUMBER_BEFORE = re.compile(r"\d\s+$")
+# Characters ahead of an anchor that `Region.before` sees
+_BEFORE_WINDOW = 16
+# Opening tags tried per anchor before giving up on finding its element
+_MAX_ANCESTOR_STEPS = 64
+
+
+@dataclass(frozen=True, slots=True)
+class Region:
+    """The element around the first match of `anchor` after <body>, optionally of tag `tag`.
+
+    `before`, when given, must match the text just ahead of the anchor; it keeps
+    anchors literal, which the regex engine finds far faster than a leading class.
+    """
+
+    anchor: re.Pattern[str]
+    tag: str | None = None
+    required: bool = False
+    before: re.Pattern[str] | None = None
+
+
+LISTING_REGIONS = (
+    # Title, price, summary panel, key features, description, facts grid, agent and media
+    Region(re.compile(r"<main\b"), "main", required=True),
+    Region(re.compile(r"propertyData"), "script"),
+)
+
+SEARCH_REGIONS = (
+    Region(re.compile(r"<main\b"), "main", required=True),
+    # Result counts such as "1,234 results"; a count in other casing falls back to a full parse
+    Region(re.compile("results"), before=_NUMBER_BEFORE),
+    Region(re.compile("properties"), before=_NUMBER_BEFORE),
+    Region(re.compile(r'"resultCount"'), "script"),
+)
+
+
+@lru_cache(maxsize=64)
+def _tag_re(name: str) -> re.Pattern[str]:
+    return re.compile(rf"<(/?){name}\b[^>]*>", re.IGNORECASE)
+
+
+@lru_cache(maxsize=8)
+def _close_re(name: str) -> re.Pattern[str]:
+    return re.compile(rf"</{name}\s*>", re.IGNORECASE)
+
+
+def element_end(content: str, start: int) -> int | None:
+    """End offset of the element whose opening tag starts at `start`, or None if it never closes."""
+    m = _TAG_NAME.match(content, start)
+    if m is None:
+        return None
+    name = m.group(1).lower()
+    open_end = content.find(">", m.end())
+    if open_end < 0:
+        return None
+    if name in _VOID or content[open_end - 1] == "/":
+        return open_end + 1
+    if name in _RAW_TEXT:
+        # Script and style text is not markup; the element ends at the first close tag
+        close = _close_re(name).search(content, open_end)
+        return close.end() if close else None
+    depth = 1
+    for t in _tag_re(name).finditer(content, open_end + 1):
+        depth += -1 if t.group(1) else 1
+        if depth == 0:
+            return t.end()
+    return None
+
+
+def _in_script(content: str, pos: int, lo: int) -> bool:
+    return content.rfind("<script", lo, pos) > content.rfind("</script", lo, pos)
+
+
+def _enclosing(content: str, pos: int, tag: str | None, lo: int) -> tuple[int, int] | None:
+    """Span of the innermost element (of `tag`, if given) containing offset `pos`."""
+    prefix = "<" + (tag or "")
+    i = pos + len(prefix)
+    for _ in range(_MAX_ANCESTOR_STEPS):
+        i = content.rfind(prefix, lo, i)
+        if i < 0:
+            return None
+        if tag is None and not content[i + 1 : i + 2].isalpha():
+            continue  # closing tag, comment or doctype
+        end = element_end(content, i)
+        if end is not None and end > pos:
+            return i, end
+    return None
+
+
+def _find(content: str, region: Region, lo: int) -> tuple[int, int] | None:
+    for m in region.anchor.finditer(content, lo):
+        # Markup quoted inside a script is not the element itself
+        if region.tag not in (None, "script") and _in_script(content, m.start(), lo):
+            continue
+        if region.before is not None:
+            if not region.before.search(content, max(lo, m.start() - _BEFORE_WINDOW), m.start()):
+                continue
+        return _enclosing(content, m.start(), region.tag, lo)
+    return None
+
+
+def slice_html(content: str, regions: tuple[Region, ...]) -> str | None:
+    """A small document holding only `regions`, or None when a required one is missing."""
+    body = _BODY.search(content)
+    lo = body.end() if body else 0
+    spans = []
+    for region in regions:
+        span = _find(content, region, lo)
+        if span is not None:
+            spans.append(span)
+        elif region.required:
+            return None
+    parts = []
+    last = -1
+    for start, end in sorted(spans):
+        if start < last:
+            continue  # nested in a region already taken
+        parts.append(content[start:end])
+        last = end
+    return "<html><body>" + "".join(parts) + "</body></html>"
+
+
+def parse_regions(content: str, regions: tuple[Region, ...]) -> html.HtmlElement:
+    """Parse the sliced regions of `content`, or all of it when they cannot be located."""
+    sliced = slice_html(content, regions)
+    return html.fromstring(sliced if sliced is not None else content)
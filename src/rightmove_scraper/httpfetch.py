@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+
+import httpx
+
+from .config import AppConfig
+
+_RIGHTMOVE_ORIGIN_RE = re.compile(r"^https?://(www\.)?rightmove\.co\.uk")
+
+# Requests without a browser-like UA are more likely to get a stripped or blocked page
+DEFAULT_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"
+)
+
+
+@dataclass(slots=True)
+class FetchStats:
+    direct: int = 0
+    fallback: int = 0
+    no_markers: int = 0
+    http_errors: int = 0
+
+    @property
+    def fallback_rate(self) -> float:
+        total = self.direct + self.fallback
+        return self.fallback / total if total else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"HTTP engine: {self.direct} direct, {self.fallback} browser fallbacks "
+            f"({self.fallback_rate:.1%}; {self.no_markers} missing markers, "
+            f"{self.http_errors} HTTP errors)"
+        )
+
+
+class HttpFetcher:
+    """Pooled keep-alive HTTP/2 client for fetching server-rendered pages.
+
+    When `base_url` (or RIGHTMOVE_BASE_URL) is set, Rightmove URLs are fetched
+    from that host instead, e.g. a local server replaying saved fixtures.
+    """
+
+    def __init__(
+        self, cfg: AppConfig, *, base_url: str | None = None, max_connections: int | None = None
+    ) -> None:
+        self.cfg = cfg
+        self.base_url = (base_url or cfg.base_url or "").rstrip("/") or None
+        self.max_connections = max_connections or max(2, cfg.max_concurrency * 2)
+        self.stats = FetchStats()
+        self._client: httpx.AsyncClient | None = None
+
+    async def __aenter__(self) -> HttpFetcher:
+        # httpx negotiates gzip/deflate (and br/zstd when their codecs are installed) by default
+        self._client = httpx.AsyncClient(
+            http2=True,
+            follow_redirects=True,
+            timeout=httpx.Timeout(self.cfg.request_timeout_sec),
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+                keepalive_expiry=30.0,
+            ),
+            headers={
+                "User-Agent": self.cfg.user_agent or DEFAULT_USER_AGENT,
+                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+                "Accept-Language": "en-GB,en;q=0.9",
+            },
+        )
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def resolve(self, url: str) -> str:
+        if self.base_url:
+            return _RIGHTMOVE_ORIGIN_RE.sub(self.base_url, url, count=1)
+        return url
+
+    async def get(self, url: str, timeout: float | None = None) -> str:
+        if self._client is None:
+            raise RuntimeError("HttpFetcher must be used as an async context manager")
+        if timeout is None:
+            resp = await self._client.get(self.resolve(url))
+        else:
+            resp = await self._client.get(self.resolve(url), timeout=timeout)
+        resp.raise_for_status()
+        return resp.text
@@ -0,0 +1,261 @@
+from __future__ import annotations
+
+import re
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+from zoneinfo import ZoneInfo
+
+from lxml import html
+from playwright.async_api import Page
+from pydantic import HttpUrl
+
+from .extractors import (
+    derive_from_key_features,
+    normalize_agent_address,
+    normalize_floorplan_url,
+    page_model_fields,
+)
+from .models import Listing
+from .normalize import coerce_int, normalize_council_tax, normalize_tenure, parse_price
+
+# Runs inside the listing page: expands the collapsed sections in place, then
+# returns only the raw pieces the extractors need as compact JSON.
+EXTRACT_JS = r"""
+async () => {
+  const norm = (s) => (s || "").replace(/\s+/g, " ").trim();
+  // Buttons only: clicking a link could navigate away mid-extraction
+  const clickText = (t) => {
+    const needle = t.toLowerCase();
+    const el = [...document.querySelectorAll("button, [role=button]")]
+      .find((e) => norm(e.textContent).toLowerCase().includes(needle));
+    if (el) { el.click(); return true; }
+    return false;
+  };
+  const clicked = clickText("Read full description") | clickText("Show more");
+  if (clicked) await new Promise((r) => requestAnimationFrame(() => setTimeout(r, 0)));
+
+  const pairs = [];
+  for (const dt of document.querySelectorAll("dt")) {
+    let dd = dt.nextElementSibling;
+    while (dd && dd.tagName !== "DD") dd = dd.nextElementSibling;
+    pairs.push([norm(dt.textContent), dd ? norm(dd.textContent) : null]);
+  }
+
+  const sections = {};
+  for (const h of document.querySelectorAll("h2, h3")) {
+    const key = norm(h.textContent);
+    if (!key || key in sections) continue;
+    const blocks = [];
+    const items = [];
+    const first = h.nextElementSibling;
+    for (let n = first; n && !/^H[23]$/.test(n.tagName); n = n.nextElementSibling) {
+      const txt = norm(n.textContent);
+      if (txt) blocks.push(txt);
+      if (n.tagName === "UL") {
+        for (const li of n.querySelectorAll("li")) {
+          const t = norm(li.textContent);
+          if (t) items.push(t);
+        }
+      }
+      if (blocks.length > 40) break;
+    }
+    sections[key] = { blocks, items, next: norm(first && first.textContent) };
+  }
+
+  const uniq = (xs) => [...new Set(xs.filter(Boolean))];
+  const all = (sel) => [...document.querySelectorAll(sel)];
+  const collage = '[data-testid="photo-collage"]';
+  const metaUrls = (sel) => all(sel).map((m) => m.content);
+  const imgSrcs = (sel) => all(sel).map((i) => i.getAttribute("src") || "");
+  const photos = uniq([
+    ...metaUrls(`${collage} meta[itemprop="contentUrl"]`),
+    ...metaUrls('meta[itemprop="contentUrl"]').filter((u) => u.includes("/IMG_")),
+    ...imgSrcs(`${collage} img`),
+    ...imgSrcs("img").filter((u) => u.includes("/IMG_")),
+  ]).slice(0, 10);
+  const floorplan = imgSrcs("img").find((u) => u.includes("_FLP_")) || null;
+  const tel = all('a[href^="tel:"]').map((a) => a.getAttribute("href"))[0] || null;
+  const addr = document.querySelector("div.OojFk4MTxFDKIfqreGNt0[title]");
+  const bodyText = document.body ? document.body.textContent : "";
+  const history = bodyText.match(/((?:Reduced|Added) on\s+\d{2}\/\d{2}\/\d{4})/);
+  const priceEl = document.querySelector('[data-testid="price"]');
+  const model = (window.PAGE_MODEL && window.PAGE_MODEL.propertyData) || null;
+
+  return {
+    title: norm(document.querySelector("h1") && document.querySelector("h1").textContent) || null,
+    price: priceEl ? norm(priceEl.textContent) : null,
+    pairs,
+    sections,
+    photos,
+    floorplan,
+    tel,
+    agentAddress: addr ? addr.getAttribute("title") : null,
+    history: history ? history[1] : null,
+    removed: bodyText.includes("removed by the agent"),
+    propertyData: model,
+  };
+}
+"""
+
+_GLOSSARY_HINTS = (
+    "read more",
+    "glossary",
+    "payment",
+    "details",
+    "how and where vehicles",
+    "has been adapted",
+    "outdoor space",
+)
+
+
+@dataclass(slots=True)
+class EvalTiming:
+    """Latency of the in-page path, plus sampled cost of the DOM path it replaces."""
+
+    pages: int = 0
+    eval_ms: float = 0.0
+    sampled: int = 0
+    avoided_ms: float = 0.0
+    sample_every: int = 20
+
+    def should_sample(self) -> bool:
+        return self.sample_every > 0 and self.pages % self.sample_every == 1
+
+    def summary(self) -> str:
+        avg = self.eval_ms / self.pages if self.pages else 0.0
+        msg = f"In-page extraction: {self.pages} pages, {avg:.0f} ms/page"
+        if self.sampled:
+            saved = self.avoided_ms / self.sampled
+            msg += f"; ~{saved:.0f} ms/page saved vs page.content()+parse (sampled {self.sampled})"
+        return msg
+
+
+def _pair(pairs: list[list[Any]], label: str, *, prefix: bool = False) -> str | None:
+    label_upper = label.upper()
+    for dt, dd in pairs:
+        key = (dt or "").upper()
+        if (key.startswith(label_upper) if prefix else key == label_upper) and dd:
+            return dd
+    return None
+
+
+def _section(sections: dict[str, Any], needle: str) -> dict[str, Any] | None:
+    needle = needle.lower()
+    for key, sec in sections.items():
+        if needle in key.lower():
+            return sec
+    return None
+
+
+def _fact_answer(pairs: list[list[Any]], label: str) -> str | None:
+    val = _pair(pairs, label, prefix=True)
+    if not val or any(k in val.lower() for k in _GLOSSARY_HINTS):
+        return None
+    return val
+
+
+def listing_from_snapshot(snap: dict[str, Any], url: str, rightmove_id: str) -> Listing:
+    """Build a Listing from the EXTRACT_JS result, preferring PAGE_MODEL fields."""
+    pm = page_model_fields({"propertyData": snap.get("propertyData")})
+    pairs = snap.get("pairs") or []
+    sections = snap.get("sections") or {}
+
+    price_text = pm.get("price_text") or snap.get("price")
+    if price_text:
+        m = re.search(r"(£\s?\d{1,3}(?:,\d{3})+)", price_text)
+        if m:
+            price_text = m.group(1).replace(" ", "")
+    price_value, price_currency = parse_price(price_text)
+
+    bedrooms = pm.get("bedrooms")
+    if not isinstance(bedrooms, int):
+        bedrooms = coerce_int(_pair(pairs, "BEDROOMS"))
+    bathrooms = pm.get("bathrooms")
+    if not isinstance(bathrooms, int):
+        bathrooms = coerce_int(_pair(pairs, "BATHROOMS"))
+
+    kf_section = _section(sections, "Key features")
+    key_features = pm.get("key_features") or (kf_section or {}).get("items") or []
+    description = pm.get("description")
+    if not description:
+        desc_section = _section(sections, "description")
+        if desc_section and desc_section.get("blocks"):
+            description = "\n\n".join(desc_section["blocks"])
+    if snap.get("removed") and not description:
+        description = "Removed by agent"
+
+    agent_section = _section(sections, "MARKETED BY")
+    agent_address = pm.get("agent_address")
+    if not agent_address and snap.get("agentAddress"):
+        agent_address = normalize_agent_address(snap["agentAddress"])
+    localnumber = pm.get("localnumber")
+    if not localnumber and snap.get("tel"):
+        localnumber = re.sub(r"[^0-9]", "", snap["tel"]) or None
+
+    photos = pm.get("photos") or snap.get("photos") or []
+    photos = (photos + [None] * 10)[:10]
+    floorplan = pm.get("floorplan")
+    if not floorplan:
+        floorplan = normalize_floorplan_url(snap["floorplan"]) if snap.get("floorplan") else None
+
+    return Listing(
+        url=HttpUrl(url),
+        rightmove_id=rightmove_id,
+        price_text=price_text,
+        price_value=price_value,
+        price_currency=price_currency,
+        listing_history=pm.get("listing_history") or snap.get("history"),
+        property_type=pm.get("property_type") or _pair(pairs, "PROPERTY TYPE"),
+        property_title=pm.get("property_title") or snap.get("title"),
+        bedrooms=bedrooms,
+        bathrooms=bathrooms,
+        sizes=pm.get("sizes") or _pair(pairs, "SIZE"),
+        tenure=normalize_tenure(pm.get("tenure") or _pair(pairs, "TENURE")),
+        estate_agent=pm.get("estate_agent") or (agent_section or {}).get("next") or None,
+        agent_address=agent_address,
+        localnumber=localnumber,
+        key_features=key_features,
+        description=description,
+        council_tax=normalize_council_tax(
+            pm.get("council_tax") or _fact_answer(pairs, "COUNCIL TAX")
+        ),
+        parking=pm.get("parking")
+        or _fact_answer(pairs, "PARKING")
+        or derive_from_key_features(key_features, ["parking", "driveway", "garage"]),
+        garden=pm.get("garden")
+        or _fact_answer(pairs, "GARDEN")
+        or derive_from_key_features(key_features, ["garden", "rear garden", "front garden"]),
+        accessibility=pm.get("accessibility") or _fact_answer(pairs, "ACCESSIBILITY"),
+        photo_1=photos[0],
+        photo_2=photos[1],
+        photo_3=photos[2],
+        photo_4=photos[3],
+        photo_5=photos[4],
+        photo_6=photos[5],
+        photo_7=photos[6],
+        photo_8=photos[7],
+        photo_9=photos[8],
+        photo_10=photos[9],
+        floorplan=floorplan,
+        latitude=pm.get("latitude"),
+        longitude=pm.get("longitude"),
+        timestamp=datetime.now(ZoneInfo("Europe/London")).isoformat(),
+    )
+
+
+async def evaluate_listing(page: Page, timing: EvalTiming | None = None) -> dict[str, Any]:
+    """Expand and extract the current listing page in a single page.evaluate round trip."""
+    t0 = time.perf_counter()
+    snap = await page.evaluate(EXTRACT_JS)
+    if timing is not None:
+        timing.pages += 1
+        timing.eval_ms += (time.perf_counter() - t0) * 1000
+        if timing.should_sample():
+            # Measure what the DOM path would have spent serializing and re-parsing
+            t1 = time.perf_counter()
+            html.fromstring(await page.content())
+            timing.sampled += 1
+            timing.avoided_ms += (time.perf_counter() - t1) * 1000
+    return snap
@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import bisect
+import json
+import os
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+# Histogram upper bounds in seconds: geometric steps of 1.5x from 0.25 ms to
+# ~2 minutes, fine enough for percentile estimates within one bucket.
+BUCKETS: tuple[float, ...] = tuple(0.00025 * 1.5**i for i in range(33))
+
+# Stage names in hot-path order, used to order reports
+STAGE_ORDER = (
+    "fetch",
+    "goto",
+    "cookie",
+    "wait",
+    "click",
+    "eval",
+    "content",
+    "archive",
+    "parse_html",
+    "page_model",
+    "extractors",
+    "validate",
+    "write",
+)
+
+
+class StageTrace:
+    """Per-URL stage timer. Nested stages are exclusive: a parent's time excludes its children's."""
+
+    __slots__ = ("stages", "_stack")
+
+    def __init__(self) -> None:
+        self.stages: dict[str, float] = {}
+        self._stack: list[float] = []
+
+    @contextmanager
+    def __call__(self, name: str) -> Iterator[None]:
+        t0 = time.perf_counter()
+        self._stack.append(0.0)
+        try:
+            yield
+        finally:
+            inner = self._stack.pop()
+            elapsed = time.perf_counter() - t0
+            self.stages[name] = self.stages.get(name, 0.0) + elapsed - inner
+            if self._stack:
+                self._stack[-1] += elapsed
+
+
+@dataclass(slots=True)
+class Histogram:
+    counts: list[int] = field(default_factory=lambda: [0] * (len(BUCKETS) + 1))
+    total: float = 0.0
+    n: int = 0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.n += 1
+
+    def merge(self, other: Histogram) -> None:
+        for i, c in enumerate(other.counts):
+            self.counts[i] += c
+        self.total += other.total
+        self.n += other.n
+
+    def quantile(self, q: float) -> float:
+        """Estimate by linear interpolation inside the bucket holding the q-th observation."""
+        if not self.n:
+            return 0.0
+        rank = q * self.n
+        seen = 0
+        for i, c in enumerate(self.counts):
+            if c and seen + c >= rank:
+                lo = BUCKETS[i - 1] if i > 0 else 0.0
+                hi = BUCKETS[i] if i < len(BUCKETS) else BUCKETS[-1] * 1.5
+                return lo + (hi - lo) * (rank - seen) / c
+            seen += c
+        return BUCKETS[-1]
+
+
+@dataclass(slots=True)
+class StageMetrics:
+    """Run-wide per-stage latency histograms, fed from StageTraces and the output writer."""
+
+    stages: dict[str, Histogram] = field(default_factory=dict)
+    urls: int = 0
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False, compare=False
+    )
+
+    def __getstate__(self) -> dict:
+        # Worker processes send their histograms to the parent; locks do not pickle
+        return {"stages": self.stages, "urls": self.urls}
+
+    def __setstate__(self, state: dict) -> None:
+        self.stages = state["stages"]
+        self.urls = state["urls"]
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            hist = self.stages.get(stage)
+            if hist is None:
+                hist = self.stages[stage] = Histogram()
+            hist.observe(seconds)
+
+    def add(self, trace: StageTrace) -> None:
+        with self._lock:
+            self.urls += 1
+            for stage, seconds in trace.stages.items():
+                hist = self.stages.get(stage)
+                if hist is None:
+                    hist = self.stages[stage] = Histogram()
+                hist.observe(seconds)
+
+    def merge(self, other: StageMetrics) -> None:
+        with self._lock:
+            self.urls += other.urls
+            for stage, hist in other.stages.items():
+                self.stages.setdefault(stage, Histogram()).merge(hist)
+
+    def _ordered(self) -> list[tuple[str, Histogram]]:
+        rank = {s: i for i, s in enumerate(STAGE_ORDER)}
+        return sorted(self.stages.items(), key=lambda kv: (rank.get(kv[0], len(rank)), kv[0]))
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            grand = sum(h.total for h in self.stages.values()) or 1.0
+            return {
+                "urls": self.urls,
+                "stages": {
+                    name: {
+                        "count": h.n,
+                        "total_sec": round(h.total, 3),
+                        "share": round(h.total / grand, 4),
+                        "mean_ms": round(h.total / h.n * 1000, 2) if h.n else 0.0,
+                        "p50_ms": round(h.quantile(0.50) * 1000, 2),
+                        "p95_ms": round(h.quantile(0.95) * 1000, 2),
+                        "p99_ms": round(h.quantile(0.99) * 1000, 2),
+                    }
+                    for name, h in self._ordered()
+                },
+            }
+
+    def summary(self) -> str:
+        parts = [
+            f"{name} {s['p50_ms']:.1f}/{s['p95_ms']:.1f}/{s['p99_ms']:.1f}"
+            for name, s in self.to_dict()["stages"].items()
+        ]
+        return "Stage p50/p95/p99 ms: " + ", ".join(parts)
+
+    def prometheus(self, prefix: str = "rightmove_scrape") -> str:
+        lines = [
+            f"# HELP {prefix}_stage_seconds Time spent per listing in each scrape stage.",
+            f"# TYPE {prefix}_stage_seconds histogram",
+        ]
+        with self._lock:
+            for name, h in self._ordered():
+                cumulative = 0
+                for bound, c in zip(BUCKETS, h.counts, strict=False):
+                    cumulative += c
+                    labels = f'stage="{name}",le="{bound:.6g}"'
+                    lines.append(f"{prefix}_stage_seconds_bucket{{{labels}}} {cumulative}")
+                lines.append(f'{prefix}_stage_seconds_bucket{{stage="{name}",le="+Inf"}} {h.n}')
+                lines.append(f'{prefix}_stage_seconds_sum{{stage="{name}"}} {h.total:.6f}')
+                lines.append(f'{prefix}_stage_seconds_count{{stage="{name}"}} {h.n}')
+            lines.append(f"# TYPE {prefix}_listings_total counter")
+            lines.append(f"{prefix}_listings_total {self.urls}")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: str) -> None:
+        """Write the Prometheus text format atomically, for node_exporter's textfile collector."""
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.prometheus())
+        os.replace(tmp, path)
+
+    def write_json(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+def _descendants(root: int, exclude: set[int]) -> list[int]:
+    parents: dict[int, list[int]] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", encoding="utf-8") as f:
+                # The command name may contain spaces; fields resume after its closing paren
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        parents.setdefault(ppid, []).append(int(entry))
+    out: list[int] = []
+    stack = [p for p in parents.get(root, []) if p not in exclude]
+    while stack:
+        pid = stack.pop()
+        out.append(pid)
+        stack.extend(p for p in parents.get(pid, []) if p not in exclude)
+    return out
+
+
+class ChildRssSampler:
+    """Background sampler of the summed RSS of this process's descendants (Linux /proc only).
+
+    Chromium runs as many processes, so the peak of their sum is what a host has
+    to provision; `exclude` drops subtrees such as a local test server.
+    """
+
+    def __init__(self, interval_sec: float = 0.5, exclude: set[int] | None = None) -> None:
+        self.interval_sec = interval_sec
+        self.exclude = exclude or set()
+        self.peak_bytes = 0
+        self.supported = os.path.isdir("/proc")
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def sample(self) -> int:
+        page = os.sysconf("SC_PAGE_SIZE")
+        total = 0
+        for pid in _descendants(os.getpid(), self.exclude):
+            try:
+                with open(f"/proc/{pid}/statm", encoding="utf-8") as f:
+                    total += int(f.read().split()[1]) * page
+            except (OSError, IndexError, ValueError):
+                continue
+        return total
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.peak_bytes = max(self.peak_bytes, self.sample())
+            self._stop.wait(self.interval_sec)
+
+    def __enter__(self) -> ChildRssSampler:
+        if self.supported:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        if self.supported:
+            self._stop.set()
+            self._thread.join()
@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+
+from playwright.async_api import BrowserContext, Page
+
+logger = logging.getLogger(__name__)
+
+# File extensions standing in for resource types, since Chromium's
+# Network.setBlockedURLs matches on URL only.
+RESOURCE_TYPE_EXTENSIONS: dict[str, list[str]] = {
+    "image": ["png", "jpg", "jpeg", "gif", "webp", "avif", "svg", "ico"],
+    "media": ["mp4", "webm", "m3u8", "mp3", "m4a"],
+    "font": ["woff", "woff2", "ttf", "otf", "eot"],
+    "stylesheet": ["css"],
+}
+
+
+def _extension_patterns(extensions: list[str]) -> list[str]:
+    # Match the extension only where the path ends, so "/icons.js" and "/a.css.js" are kept
+    return [p for ext in extensions for p in (f"*.{ext}", f"*.{ext}?*")]
+
+
+RESOURCE_TYPE_PATTERNS: dict[str, list[str]] = {
+    t: _extension_patterns(exts) for t, exts in RESOURCE_TYPE_EXTENSIONS.items()
+}
+
+ANALYTICS_DOMAINS = [
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googletagservices.com",
+    "doubleclick.net",
+    "hotjar.com",
+    "segment.io",
+    "segment.com",
+    "optimizely.com",
+    "nr-data.net",
+    "newrelic.com",
+    "tiqcdn.com",
+    "permutive.com",
+    "permutive.app",
+    "chartbeat.com",
+    "quantserve.com",
+    "scorecardresearch.com",
+]
+
+THIRD_PARTY_DOMAINS = [
+    "googlesyndication.com",
+    "adservice.google.com",
+    "amazon-adsystem.com",
+    "adsrvr.org",
+    "criteo.com",
+    "criteo.net",
+    "facebook.net",
+    "facebook.com",
+    "connect.facebook.net",
+    "bat.bing.com",
+    "clarity.ms",
+    "taboola.com",
+    "outbrain.com",
+    "onetrust.com",
+    "cookielaw.org",
+    "youtube.com",
+    "ytimg.com",
+    "maps.googleapis.com",
+    "trustpilot.com",
+]
+
+# Fallback per-type transfer sizes (bytes) for estimating savings before any
+# unblocked request of that type has been observed in the run.
+TYPICAL_BYTES: dict[str, int] = {
+    "Image": 60_000,
+    "Media": 400_000,
+    "Font": 40_000,
+    "Stylesheet": 30_000,
+    "Script": 60_000,
+    "XHR": 5_000,
+    "Fetch": 5_000,
+    "Document": 50_000,
+    "Other": 10_000,
+}
+
+
+@dataclass(frozen=True)
+class NetworkPolicy:
+    name: str
+    block_types: frozenset[str] = frozenset()
+    block_domains: tuple[str, ...] = ()
+    block_patterns: tuple[str, ...] = ()
+    allow_domains: tuple[str, ...] = ()
+
+    def url_patterns(self) -> list[str]:
+        """Compile the policy to Network.setBlockedURLs wildcard patterns.
+
+        The allowlist removes domains from the block list; URL patterns cannot
+        express exceptions, so type patterns still apply to allowlisted hosts.
+        """
+        allowed = {d.lower() for d in self.allow_domains}
+        patterns: list[str] = []
+        for t in sorted(self.block_types):
+            patterns.extend(RESOURCE_TYPE_PATTERNS.get(t, []))
+        for d in self.block_domains:
+            if d.lower() in allowed or any(d.lower().endswith("." + a) for a in allowed):
+                continue
+            patterns.extend([f"*://{d}/*", f"*://*.{d}/*"])
+        patterns.extend(self.block_patterns)
+        return patterns
+
+    def with_allowlist(self, domains: list[str]) -> NetworkPolicy:
+        return NetworkPolicy(
+            name=self.name,
+            block_types=self.block_types,
+            block_domains=self.block_domains,
+            block_patterns=self.block_patterns,
+            allow_domains=tuple(self.allow_domains) + tuple(domains),
+        )
+
+
+PRESETS: dict[str, NetworkPolicy] = {
+    "none": NetworkPolicy("none"),
+    # Matches the historical route handler: drop images, media and fonts
+    "media": NetworkPolicy("media", block_types=frozenset({"image", "media", "font"})),
+    "lean": NetworkPolicy(
+        "lean",
+        block_types=frozenset({"image", "media", "font", "stylesheet"}),
+        block_domains=tuple(ANALYTICS_DOMAINS),
+    ),
+    "strict": NetworkPolicy(
+        "strict",
+        block_types=frozenset({"image", "media", "font", "stylesheet"}),
+        block_domains=tuple(ANALYTICS_DOMAINS + THIRD_PARTY_DOMAINS),
+    ),
+}
+
+
+def get_policy(name: str, allow: list[str] | None = None) -> NetworkPolicy:
+    try:
+        policy = PRESETS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown network policy: {name} (choose from {', '.join(PRESETS)})"
+        ) from None
+    return policy.with_allowlist(allow) if allow else policy
+
+
+@dataclass(slots=True)
+class PageNetStats:
+    requests: int = 0
+    bytes_loaded: int = 0
+    blocked: int = 0
+    bytes_saved_est: int = 0
+    blocked_by_type: dict[str, int] = field(default_factory=dict)
+
+    def add(self, other: PageNetStats) -> None:
+        self.requests += other.requests
+        self.bytes_loaded += other.bytes_loaded
+        self.blocked += other.blocked
+        self.bytes_saved_est += other.bytes_saved_est
+        for t, n in other.blocked_by_type.items():
+            self.blocked_by_type[t] = self.blocked_by_type.get(t, 0) + n
+
+
+class NetworkPolicyEngine:
+    """Apply a NetworkPolicy inside Chromium and account for what it saves.
+
+    Blocking is installed per page with CDP Network.setBlockedURLs, so the
+    browser drops matching requests itself without a Python round trip. CDP
+    loading events are only observed to count bytes and blocked requests.
+    On non-Chromium browsers it falls back to a glob-filtered context.route.
+    """
+
+    def __init__(self, policy: NetworkPolicy) -> None:
+        self.policy = policy
+        self.patterns = policy.url_patterns()
+        self.totals = PageNetStats()
+        self.pages = 0
+        self._current: dict[int, PageNetStats] = {}
+        self._types: dict[str, str] = {}
+        self._observed: dict[str, tuple[int, int]] = {}  # type -> (count, bytes)
+        self._route_fallback = False
+
+    def _estimate(self, rtype: str) -> int:
+        count, total = self._observed.get(rtype, (0, 0))
+        if count >= 5:
+            return total // count
+        return TYPICAL_BYTES.get(rtype, TYPICAL_BYTES["Other"])
+
+    async def install(self, page: Page) -> None:
+        if self._route_fallback:
+            return
+        stats = PageNetStats()
+        self._current[id(page)] = stats
+        try:
+            cdp = await page.context.new_cdp_session(page)
+        except Exception:
+            # Not Chromium: fall back to context-level routing on the same patterns
+            self._route_fallback = True
+            await self._install_route(page.context)
+            return
+
+        def on_request(ev: dict) -> None:
+            self._types[ev.get("requestId", "")] = ev.get("type") or "Other"
+
+        def on_finished(ev: dict) -> None:
+            rtype = self._types.pop(ev.get("requestId", ""), "Other")
+            size = int(ev.get("encodedDataLength") or 0)
+            stats.requests += 1
+            stats.bytes_loaded += size
+            count, total = self._observed.get(rtype, (0, 0))
+            self._observed[rtype] = (count + 1, total + size)
+
+        def on_failed(ev: dict) -> None:
+            self._types.pop(ev.get("requestId", ""), None)
+            if not ev.get("blockedReason"):
+                return
+            rtype = ev.get("type") or "Other"
+            stats.blocked += 1
+            stats.bytes_saved_est += self._estimate(rtype)
+            stats.blocked_by_type[rtype] = stats.blocked_by_type.get(rtype, 0) + 1
+
+        cdp.on("Network.requestWillBeSent", on_request)
+        cdp.on("Network.loadingFinished", on_finished)
+        cdp.on("Network.loadingFailed", on_failed)
+        await cdp.send("Network.enable")
+        if self.patterns:
+            await cdp.send("Network.setBlockedURLs", {"urls": self.patterns})
+
+    async def _install_route(self, context: BrowserContext) -> None:
+        logger.debug(
+            "CDP unavailable; routing %d blocked patterns through context.route", len(self.patterns)
+        )
+        for pattern in self.patterns:
+            # CDP '*' spans any characters, which is '**' in Playwright globs
+            glob = pattern.replace("*", "**")
+            try:
+                await context.route(glob, lambda route: route.abort())
+            except Exception:
+                pass
+
+    def take(self, page: Page) -> PageNetStats:
+        """Return and reset the counters for the navigation(s) since the last call."""
+        stats = self._current.get(id(page))
+        if stats is None:
+            return PageNetStats()
+        snapshot = PageNetStats(
+            stats.requests,
+            stats.bytes_loaded,
+            stats.blocked,
+            stats.bytes_saved_est,
+            dict(stats.blocked_by_type),
+        )
+        stats.requests = stats.bytes_loaded = stats.blocked = stats.bytes_saved_est = 0
+        stats.blocked_by_type.clear()
+        self.totals.add(snapshot)
+        self.pages += 1
+        return snapshot
+
+    def forget(self, page: Page) -> None:
+        self._current.pop(id(page), None)
+
+    def summary(self) -> str:
+        t = self.totals
+        per_page = t.blocked / self.pages if self.pages else 0.0
+        return (
+            f"Network policy '{self.policy.name}': {t.requests} requests / "
+            f"{t.bytes_loaded / 1e6:.1f} MB loaded, "
+            f"{t.blocked} blocked ({per_page:.1f}/page, ~{t.bytes_saved_est / 1e6:.1f} MB saved)"
+        )
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+from playwright.async_api import BrowserContext, Page
+
+from .browser import new_page, policy_engine
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class PoolStats:
+    created: int = 0
+    recycled: int = 0
+    errored: int = 0
+    checkouts: int = 0
+
+    @property
+    def reuse_ratio(self) -> float:
+        return self.checkouts / self.created if self.created else 0.0
+
+
+class PagePool:
+    """Fixed-size pool of long-lived pages shared by scrape workers.
+
+    At most `size` pages are checked out at once. Pages are created lazily, reset
+    to about:blank between uses and replaced after `max_uses` navigations or after
+    any error during a checkout.
+    """
+
+    def __init__(self, context: BrowserContext, size: int, max_uses: int = 50) -> None:
+        self.context = context
+        self.size = max(1, size)
+        self.max_uses = max(1, max_uses)
+        self.stats = PoolStats()
+        self._slots = asyncio.Semaphore(self.size)
+        self._idle: list[Page] = []
+        self._uses: dict[int, int] = {}
+
+    async def acquire(self) -> Page:
+        await self._slots.acquire()
+        try:
+            if self._idle:
+                page = self._idle.pop()
+            else:
+                page = await new_page(self.context)
+                self._uses[id(page)] = 0
+                self.stats.created += 1
+        except BaseException:
+            self._slots.release()
+            raise
+        self.stats.checkouts += 1
+        return page
+
+    async def release(self, page: Page, *, failed: bool = False) -> None:
+        try:
+            uses = self._uses.get(id(page), 0) + 1
+            self._uses[id(page)] = uses
+            engine = policy_engine(self.context)
+            if engine is not None:
+                net = engine.take(page)
+                logger.debug(
+                    "Page %x: %d requests, %d bytes, %d blocked",
+                    id(page),
+                    net.requests,
+                    net.bytes_loaded,
+                    net.blocked,
+                )
+            if failed or uses >= self.max_uses:
+                if failed:
+                    self.stats.errored += 1
+                else:
+                    self.stats.recycled += 1
+                await self._discard(page, "error" if failed else "max uses")
+                return
+            try:
+                # Drop the previous document (DOM, JS heap, timers) while keeping context cookies
+                await page.goto("about:blank")
+            except Exception:
+                self.stats.errored += 1
+                await self._discard(page, "reset failed")
+                return
+            self._idle.append(page)
+        finally:
+            self._slots.release()
+
+    async def _discard(self, page: Page, reason: str) -> None:
+        uses = self._uses.pop(id(page), 0)
+        engine = policy_engine(self.context)
+        if engine is not None:
+            engine.forget(page)
+        logger.info("Retiring page after %d navigations (%s)", uses, reason)
+        try:
+            await page.close()
+        except Exception:
+            pass
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[Page]:
+        page = await self.acquire()
+        try:
+            yield page
+        except BaseException:
+            await self.release(page, failed=True)
+            raise
+        await self.release(page)
+
+    async def close(self) -> None:
+        while self._idle:
+            await self._discard(self._idle.pop(), "pool closed")
+        s = self.stats
+        logger.info(
+            "Page pool: %d checkouts over %d pages (%.1f uses/page), %d recycled, %d errored",
+            s.checkouts,
+            s.created,
+            s.reuse_ratio,
+            s.recycled,
+            s.errored,
+        )
@@ -0,0 +1,359 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing as mp
+import os
+import queue as _queue
+import threading
+import time
+from collections.abc import AsyncIterator, Callable
+from dataclasses import replace
+
+from .config import AppConfig
+from .fieldprofile import FieldProfiler
+from .metrics import StageMetrics
+from .models import Listing
+from .runner import METRICS_INTERVAL_SEC, RunStats, ScrapeOptions, run_scrape
+
+logger = logging.getLogger(__name__)
+
+# Rough resident footprint of one worker process with its own Chromium and pages
+WORKER_MEMORY_MB = 900
+# How long a worker blocks on the URL queue before checking whether it was stopped
+_QUEUE_POLL_SEC = 1.0
+
+
+def _available_memory_mb() -> int | None:
+    # Prefer the cgroup limit (Cloud Run, containers) over host RAM
+    for path in ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes"):
+        try:
+            raw = open(path, encoding="utf-8").read().strip()
+        except OSError:
+            continue
+        if raw.isdigit() and int(raw) < 1 << 60:
+            return int(raw) // (1024 * 1024)
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // (1024 * 1024)
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def _cpu_count() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def auto_worker_count(per_worker_mb: int = WORKER_MEMORY_MB) -> int:
+    """Size the worker pool to the CPUs and memory available to this process."""
+    workers = _cpu_count()
+    mem = _available_memory_mb()
+    if mem is not None:
+        workers = min(workers, mem // per_worker_mb)
+    return max(1, workers)
+
+
+def parse_workers(value: str) -> int:
+    if value.strip().lower() == "auto":
+        return auto_worker_count()
+    n = int(value)
+    if n < 1:
+        raise ValueError("workers must be >= 1")
+    return n
+
+
+def _share_rate_budget(cfg: AppConfig, workers: int) -> AppConfig:
+    # Each process paces itself independently, so split the politeness budget
+    # to keep the combined request rate where a single process would put it.
+    return replace(
+        cfg,
+        min_delay_sec=cfg.min_delay_sec * workers,
+        max_delay_sec=cfg.max_delay_sec * workers,
+        max_rps=cfg.max_rps / workers,
+    )
+
+
+class _QueueSource:
+    """URLs from the shared queue, read in an executor thread that `stop` releases.
+
+    A URL the thread takes but the scraper never receives, because the run
+    aborted, goes back on the queue for another worker. `on_take` and
+    `on_release` hear about each URL this worker takes and each one it hands back.
+    """
+
+    def __init__(
+        self,
+        url_q: mp.Queue,
+        *,
+        on_take: Callable[[str], None] | None = None,
+        on_release: Callable[[str], None] | None = None,
+    ) -> None:
+        self._q = url_q
+        self._on_take = on_take
+        self._on_release = on_release
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+        self._held: list[str] = []
+
+    def _take(self) -> str | None:
+        while not self._stopped.is_set():
+            try:
+                url = self._q.get(timeout=_QUEUE_POLL_SEC)
+            except _queue.Empty:
+                continue
+            with self._lock:
+                if url is not None and self._stopped.is_set():
+                    self._q.put(url)
+                    return None
+                if url is not None:
+                    self._held.append(url)
+                    if self._on_take is not None:
+                        self._on_take(url)
+            return url
+        return None
+
+    async def urls(self) -> AsyncIterator[str]:
+        loop = asyncio.get_running_loop()
+        while (url := await loop.run_in_executor(None, self._take)) is not None:
+            with self._lock:
+                self._held.remove(url)
+            yield url
+
+    def stop(self) -> None:
+        with self._lock:
+            self._stopped.set()
+            for url in self._held:
+                self._q.put(url)
+                if self._on_release is not None:
+                    self._on_release(url)
+            self._held.clear()
+
+
+def _drain(q: mp.Queue) -> list[str]:
+    left: list[str] = []
+    while True:
+        try:
+            item = q.get_nowait()
+        except _queue.Empty:
+            return left
+        if item is not None:
+            left.append(item)
+
+
+async def _report_metrics(worker_id: int, stages: StageMetrics, result_q: mp.Queue) -> None:
+    while True:
+        await asyncio.sleep(METRICS_INTERVAL_SEC)
+        # Copied on the event loop that updates `stages`, so the pickled copy is consistent
+        snapshot = StageMetrics()
+        snapshot.merge(stages)
+        result_q.put(("metrics", worker_id, snapshot))
+
+
+def _merged(*parts: StageMetrics) -> StageMetrics:
+    total = StageMetrics()
+    for part in parts:
+        total.merge(part)
+    return total
+
+
+def _worker_main(
+    worker_id: int,
+    cfg: AppConfig,
+    opts: ScrapeOptions,
+    url_q: mp.Queue,
+    result_q: mp.Queue,
+    profile_fields: bool,
+) -> None:
+    from .logging_setup import setup_logging
+
+    setup_logging(cfg.log_level)
+
+    def on_record(listing: Listing) -> None:
+        result_q.put(("record", listing.model_dump(mode="json")))
+
+    def log(msg: str) -> None:
+        logger.info("[w%d] %s", worker_id, msg)
+
+    def on_failure(url: str, error: str) -> None:
+        result_q.put(("failed", worker_id, url, error))
+
+    def on_timing(url: str, seconds: float) -> None:
+        result_q.put(("timing", worker_id, url, seconds))
+
+    # The parent writes one textfile for all workers from their snapshots
+    export = opts.metrics_file is not None
+
+    async def run() -> RunStats:
+        stages = StageMetrics()
+        reporter = (
+            asyncio.create_task(_report_metrics(worker_id, stages, result_q)) if export else None
+        )
+        # The parent tracks what each worker holds so a killed worker's URLs are reported
+        source = _QueueSource(
+            url_q,
+            on_take=lambda url: result_q.put(("taken", worker_id, url)),
+            on_release=lambda url: result_q.put(("released", worker_id, url)),
+        )
+        try:
+            return await run_scrape(
+                cfg,
+                source.urls(),
+                replace(opts, metrics_file=None),
+                on_record,
+                log=log,
+                on_failure=on_failure,
+                on_timing=on_timing,
+                metrics=stages,
+                profile=FieldProfiler() if profile_fields else None,
+            )
+        finally:
+            # Also lets asyncio.run's executor shutdown finish if the scrape aborted mid-get
+            source.stop()
+            if reporter is not None:
+                reporter.cancel()
+
+    try:
+        stats = asyncio.run(run())
+        result_q.put(
+            (
+                "done",
+                worker_id,
+                stats.scraped,
+                stats.failed,
+                stats.restarts,
+                stats.notes,
+                stats.stages,
+                stats.fields,
+            )
+        )
+    except Exception as e:
+        result_q.put(("crashed", worker_id, repr(e)))
+
+
+def run_sharded(
+    cfg: AppConfig,
+    urls: list[str],
+    opts: ScrapeOptions,
+    on_record: Callable[[Listing], None],
+    *,
+    workers: int,
+    on_failure: Callable[[str, str], None] | None = None,
+    on_timing: Callable[[str, float], None] | None = None,
+    metrics: StageMetrics | None = None,
+    profile: FieldProfiler | None = None,
+) -> RunStats:
+    """Scrape `urls` across `workers` processes fed from one shared queue.
+
+    Every process runs its own browser with `opts.concurrency` pages; records
+    stream back to the parent, which calls `on_record` so output stays merged.
+    A worker that crashes or is killed has the URLs it was still working on
+    passed to `on_failure` and counted as failed.
+    Each worker's stage histograms are merged into `metrics` when it finishes,
+    and its field-strategy counts into `profile`. With `opts.metrics_file`,
+    workers send snapshots every METRICS_INTERVAL_SEC and this process
+    rewrites that one textfile with their sum.
+    """
+    ctx = mp.get_context("spawn")
+    url_q: mp.Queue = ctx.Queue()
+    result_q: mp.Queue = ctx.Queue()
+    for u in urls:
+        url_q.put(u)
+    for _ in range(workers):
+        url_q.put(None)
+
+    worker_cfg = _share_rate_budget(cfg, workers)
+    procs = [
+        ctx.Process(
+            target=_worker_main,
+            args=(i, worker_cfg, opts, url_q, result_q, profile is not None),
+            daemon=True,
+        )
+        for i in range(workers)
+    ]
+    for p in procs:
+        p.start()
+
+    stats = RunStats(stages=metrics if metrics is not None else StageMetrics(), fields=profile)
+    pending = set(range(workers))
+    live: dict[int, StageMetrics] = {}  # latest snapshot of each running worker
+    # URLs each worker has taken off the queue and not yet finished
+    inflight: dict[int, set[str]] = {i: set() for i in range(workers)}
+
+    def lose_inflight(wid: int, reason: str) -> None:
+        lost = sorted(inflight.pop(wid, set()))
+        stats.failed += len(lost)
+        if lost:
+            stats.notes.append(f"[w{wid}] {len(lost)} URLs lost when the worker {reason}")
+        if on_failure is not None:
+            for url in lost:
+                on_failure(url, f"worker {reason}")
+
+    exported = time.monotonic()
+    while pending:
+        if opts.metrics_file and time.monotonic() - exported >= METRICS_INTERVAL_SEC:
+            _merged(stats.stages, *live.values()).write_textfile(opts.metrics_file)
+            exported = time.monotonic()
+        try:
+            msg = result_q.get(timeout=5)
+        except _queue.Empty:
+            # A worker killed outright (OOM, signal) never reports back
+            for i, p in enumerate(procs):
+                if i in pending and not p.is_alive():
+                    logger.warning("Worker %d exited with code %s without reporting", i, p.exitcode)
+                    pending.discard(i)
+                    lose_inflight(i, f"exited with code {p.exitcode}")
+            continue
+        kind = msg[0]
+        if kind == "record":
+            stats.scraped += 1
+            on_record(Listing.model_validate(msg[1]))
+        elif kind == "taken":
+            inflight[msg[1]].add(msg[2])
+        elif kind == "released":
+            inflight[msg[1]].discard(msg[2])
+        elif kind == "failed":
+            inflight[msg[1]].discard(msg[2])
+            if on_failure is not None:
+                on_failure(msg[2], msg[3])
+        elif kind == "timing":
+            # Sent just before the URL's record, so the URL is finished
+            inflight[msg[1]].discard(msg[2])
+            if on_timing is not None:
+                on_timing(msg[2], msg[3])
+        elif kind == "metrics":
+            live[msg[1]] = msg[2]
+        elif kind == "done":
+            _, wid, _scraped, failed, restarts, notes, stages, fields = msg
+            live.pop(wid, None)
+            stats.stages.merge(stages)
+            if profile is not None and fields is not None:
+                profile.merge(fields)
+            stats.failed += failed
+            stats.restarts += restarts
+            stats.notes.extend(f"[w{wid}] {n}" for n in notes)
+            pending.discard(wid)
+            inflight.pop(wid, None)
+        elif kind == "crashed":
+            logger.error("Worker %d crashed: %s", msg[1], msg[2])
+            pending.discard(msg[1])
+            # Its last snapshot is all that is left of the worker's timings
+            if msg[1] in live:
+                stats.stages.merge(live.pop(msg[1]))
+            lose_inflight(msg[1], "crashed")
+
+    for p in procs:
+        p.join(timeout=10)
+    # URLs no worker reached, e.g. handed back by one that aborted after the rest had finished
+    unscraped = _drain(url_q)
+    if unscraped:
+        stats.failed += len(unscraped)
+        stats.notes.append(f"{len(unscraped)} URLs left unscraped after every worker stopped")
+        if on_failure is not None:
+            for url in unscraped:
+                on_failure(url, "not scraped: every worker stopped")
+    if stats.stages.urls:
+        stats.notes.append(f"All workers: {stats.stages.summary()}")
+    stats.finished = time.monotonic()
+    return stats
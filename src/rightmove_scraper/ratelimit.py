@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+import urllib.parse
+
+from .config import AppConfig
+
+
+class TokenBucket:
+    """Async token bucket with optional random jitter added to the gap after each grant.
+
+    Waiters queue on an internal lock, so grants are handed out in arrival order
+    and sleeping never blocks the event loop.
+    """
+
+    def __init__(
+        self, rate: float, capacity: int = 1, jitter: tuple[float, float] = (0.0, 0.0)
+    ) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.jitter = jitter
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> float:
+        """Wait for a token; return the number of seconds spent waiting."""
+        start = time.monotonic()
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+            lo, hi = self.jitter
+            if hi > 0:
+                # Charge the jitter to the next grant instead of delaying this one
+                self._tokens -= random.uniform(lo, hi) * self.rate
+        return time.monotonic() - start
+
+
+class RateLimiter:
+    """Global plus per-host request pacing for async scrape/discovery loops.
+
+    Each host gets a bucket whose grants are spaced by a random delay in
+    [min_delay, max_delay] (the old polite_sleep window); the global bucket caps
+    total requests/sec across all hosts.
+    """
+
+    def __init__(
+        self,
+        *,
+        global_rps: float,
+        global_burst: int = 1,
+        min_delay: float = 2.0,
+        max_delay: float = 5.0,
+    ) -> None:
+        self.min_delay = max(0.0, min_delay)
+        self.max_delay = max(self.min_delay, max_delay)
+        self._global = TokenBucket(global_rps, global_burst)
+        self._hosts: dict[str, TokenBucket] = {}
+        self.waited_sec = 0.0
+        self.requests = 0
+
+    @classmethod
+    def from_config(cls, cfg: AppConfig) -> RateLimiter:
+        return cls(
+            global_rps=cfg.max_rps,
+            global_burst=cfg.rate_burst,
+            min_delay=cfg.min_delay_sec,
+            max_delay=cfg.max_delay_sec,
+        )
+
+    def _host_bucket(self, host: str) -> TokenBucket:
+        bucket = self._hosts.get(host)
+        if bucket is None:
+            if self.max_delay > 0:
+                # Refill at the floor of the window; jitter covers the rest of it
+                rate = 1.0 / self.min_delay if self.min_delay > 0 else 1e6
+                jitter = (0.0, self.max_delay - self.min_delay)
+            else:
+                rate, jitter = 1e6, (0.0, 0.0)
+            bucket = TokenBucket(rate, 1, jitter)
+            self._hosts[host] = bucket
+        return bucket
+
+    async def acquire(self, url: str) -> float:
+        """Wait until a request to `url` is allowed; return seconds waited."""
+        host = urllib.parse.urlsplit(url).netloc.lower()
+        waited = await self._host_bucket(host).acquire()
+        waited += await self._global.acquire()
+        self.waited_sec += waited
+        self.requests += 1
+        return waited
@@ -0,0 +1,345 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator, Callable, Coroutine, Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+from .adaptive import AdaptiveController
+from .archive import HtmlArchive
+from .browser import ReadinessStats, policy_engine
+from .config import AppConfig
+from .errors import RETRY_BACKOFF_SEC, FailureStats, classify, retry_delay
+from .fieldprofile import FieldProfiler
+from .httpfetch import HttpFetcher
+from .inpage import EvalTiming
+from .metrics import StageMetrics, StageTrace
+from .models import Listing
+from .ratelimit import RateLimiter
+from .scrape_listing import READY_TIMEOUT_MS, scrape, scrape_http
+from .supervisor import BrowserRestartLimitError, BrowserSupervisor
+
+logger = logging.getLogger(__name__)
+
+
+# How each failure class counts towards the adaptive controller; a removed
+# listing is a fast, healthy response from the site's point of view.
+_CONTROLLER_OUTCOME = {"timeout": "timeout", "blocked": "blocked", "removed": "ok"}
+
+METRICS_INTERVAL_SEC = 15
+
+# A URL producer that needs the run's own browser and rate limiter, such as
+# search-page discovery feeding detail workers while it paginates.
+SourceFactory = Callable[[BrowserSupervisor, RateLimiter], AsyncIterator[str]]
+
+
+@dataclass(slots=True)
+class ScrapeOptions:
+    concurrency: int = 1  # starting point when adaptive
+    adaptive: bool = False
+    min_concurrency: int = 1
+    max_concurrency: int = 8
+    engine: str = "browser"  # browser|http
+    page_recycle: int = 50
+    extract: str = "dom"  # dom|eval
+    archive_dir: str | None = None
+    retries: int = 2  # per-URL budget for re-queued attempts
+    max_restarts_per_hour: int = 5
+    metrics_file: str | None = None  # Prometheus textfile, rewritten every METRICS_INTERVAL_SEC
+
+
+@dataclass(slots=True)
+class RunStats:
+    scraped: int = 0
+    failed: int = 0
+    started: float = field(default_factory=time.monotonic)
+    finished: float | None = None
+    notes: list[str] = field(default_factory=list)
+    failures: FailureStats = field(default_factory=FailureStats)
+    restarts: int = 0
+    first_record: float | None = None
+    stages: StageMetrics = field(default_factory=StageMetrics)
+    fields: FieldProfiler | None = None
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def pages_per_min(self) -> float:
+        return self.scraped / max(self.elapsed, 1e-9) * 60
+
+    def summary(self) -> str:
+        restarts = f", {self.restarts} browser restarts" if self.restarts else ""
+        return (
+            f"Throughput: {self.scraped} listings in {self.elapsed:.0f}s "
+            f"({self.pages_per_min:.1f} pages/min, {self.failed} failed{restarts})"
+        )
+
+
+async def _iterate(source: Iterable[str] | AsyncIterator[str]) -> AsyncIterator[str]:
+    if hasattr(source, "__aiter__"):
+        async for url in source:
+            yield url
+    else:
+        for url in source:
+            yield url
+
+
+async def run_scrape(
+    cfg: AppConfig,
+    source: Iterable[str] | AsyncIterator[str] | SourceFactory,
+    opts: ScrapeOptions,
+    on_record: Callable[[Listing], None],
+    *,
+    total: int | None = None,
+    log: Callable[[str], None] = logger.info,
+    on_failure: Callable[[str, str], None] | None = None,
+    on_timing: Callable[[str, float], None] | None = None,
+    metrics: StageMetrics | None = None,
+    profile: FieldProfiler | None = None,
+) -> RunStats:
+    """Scrape listing URLs from `source` with concurrent workers sharing one browser.
+
+    With `opts.adaptive` an AdaptiveController moves the number of in-flight
+    pages between `opts.min_concurrency` and `opts.max_concurrency` and tunes
+    the page timeout; otherwise it stays at `opts.concurrency`.
+
+    URLs are pulled from a bounded queue as workers free up, so `source` may be a
+    plain list or an async iterator still being produced. A SourceFactory is
+    called with the run's supervisor and limiter, and gets one extra pooled page
+    so its own navigations never wait behind the detail workers.
+    Failed URLs of a retryable class go back to the tail of the queue after a
+    per-class backoff, leaving the worker free to take fresh work meanwhile.
+    If the browser dies, a BrowserSupervisor relaunches it and the URLs that
+    were in flight are re-queued without spending their retry budget.
+    `on_timing(url, seconds)` reports the duration of each successful scrape.
+    Per-stage timings of every attempt go into `metrics` (also `stats.stages`),
+    and DOM-extracted pages record their per-field strategy hits in `profile`.
+    """
+    stats = RunStats(stages=metrics if metrics is not None else StageMetrics(), fields=profile)
+    limiter = RateLimiter.from_config(cfg)
+    timing = EvalTiming()
+    readiness = ReadinessStats()
+    archive = HtmlArchive(opts.archive_dir) if opts.archive_dir else None
+    timeout = float(cfg.request_timeout_sec)
+    if opts.adaptive:
+        controller = AdaptiveController(
+            initial=opts.concurrency,
+            min_limit=opts.min_concurrency,
+            max_limit=max(opts.max_concurrency, opts.concurrency),
+            timeout_sec=timeout,
+            log=log,
+        )
+    else:
+        controller = AdaptiveController(
+            initial=opts.concurrency,
+            min_limit=opts.concurrency,
+            max_limit=opts.concurrency,
+            timeout_sec=timeout,
+            min_timeout_sec=timeout,
+            max_timeout_sec=timeout,
+            log=log,
+        )
+    n_workers = controller.max_limit
+    queue: asyncio.Queue[tuple[int, str] | None] = asyncio.Queue(maxsize=max(2, n_workers * 2))
+    of_total = f"/{total}" if total else ""
+
+    attempts: dict[str, int] = {}
+    outstanding = 0  # URLs queued, in progress or waiting to be retried
+    feeding = True
+    tasks: asyncio.TaskGroup | None = None
+
+    async def close_if_drained() -> None:
+        if not feeding and outstanding == 0:
+            for _ in range(n_workers):
+                await queue.put(None)
+
+    async def feed() -> None:
+        nonlocal outstanding, feeding
+        idx = 0
+        try:
+            urls = source(supervisor, limiter) if callable(source) else source
+            async for url in _iterate(urls):
+                idx += 1
+                outstanding += 1
+                await queue.put((idx, url))
+        finally:
+            feeding = False
+            await close_if_drained()
+
+    async def requeue(item: tuple[int, str], delay: float) -> None:
+        await asyncio.sleep(delay)
+        await queue.put(item)
+
+    def schedule(coro: Coroutine[Any, Any, None]) -> None:
+        assert tasks is not None, "scheduled before the task group started"
+        tasks.create_task(coro)
+
+    async def export_metrics(path: str) -> None:
+        while True:
+            await asyncio.sleep(METRICS_INTERVAL_SEC)
+            stats.stages.write_textfile(path)
+
+    supervisor = BrowserSupervisor(
+        cfg,
+        pool_size=n_workers + (1 if callable(source) else 0),
+        page_recycle=opts.page_recycle,
+        max_restarts_per_hour=opts.max_restarts_per_hour,
+        log=log,
+    )
+    async with supervisor, HttpFetcher(cfg, max_connections=n_workers) as fetcher:
+
+        def set_timeout(c: AdaptiveController) -> None:
+            assert supervisor.context is not None, "supervisor is running"
+            supervisor.context.set_default_timeout(c.timeout_sec * 1000)
+
+        controller.on_change(set_timeout)
+        supervisor.on_restart(lambda ctx: ctx.set_default_timeout(controller.timeout_sec * 1000))
+
+        async def attempt(url: str) -> Listing | None:
+            pool = supervisor.pool
+            assert pool is not None, "supervisor is running"
+            ready_ms = READY_TIMEOUT_MS
+            if opts.adaptive and timeout > 0:
+                # The readiness wait scales with the adaptive page timeout
+                ready_ms = int(READY_TIMEOUT_MS * controller.timeout_sec / timeout)
+            trace = StageTrace()
+            try:
+                if opts.engine == "http":
+                    return await scrape_http(
+                        fetcher,
+                        pool,
+                        url,
+                        limiter,
+                        extract=opts.extract,
+                        timing=timing,
+                        archive=archive,
+                        readiness=readiness,
+                        timeout=controller.timeout_sec,
+                        ready_timeout_ms=ready_ms,
+                        trace=trace,
+                        profile=profile,
+                    )
+                async with pool.page() as page:
+                    return await scrape(
+                        page,
+                        url,
+                        extract=opts.extract,
+                        timing=timing,
+                        archive=archive,
+                        readiness=readiness,
+                        ready_timeout_ms=ready_ms,
+                        trace=trace,
+                        profile=profile,
+                    )
+            finally:
+                stats.stages.add(trace)
+
+        async def worker() -> None:
+            nonlocal outstanding
+            while True:
+                async with controller.slot():
+                    item = await queue.get()
+                    if item is None:
+                        return
+                    idx, url = item
+                    done = True
+                    t0: float | None = None
+                    generation = supervisor.generation
+                    try:
+                        await limiter.acquire(url)
+                        t0 = time.monotonic()
+                        listing = await attempt(url)
+                        elapsed = time.monotonic() - t0
+                        controller.record(elapsed)
+                        if listing is not None:
+                            if on_timing is not None:
+                                on_timing(url, elapsed)
+                            stats.scraped += 1
+                            if stats.first_record is None:
+                                stats.first_record = time.monotonic()
+                            on_record(listing)
+                            log(f"[{idx}{of_total}] scraped: {url}")
+                    except Exception as e:
+                        if generation != supervisor.generation or supervisor.crashed(e):
+                            # Lost with the browser, not the URL's fault: relaunch and re-dispatch
+                            await supervisor.restart(generation)
+                            done = False
+                            schedule(requeue(item, 0))
+                            continue
+                        kind = classify(e)
+                        if t0 is not None:
+                            controller.record(
+                                time.monotonic() - t0, _CONTROLLER_OUTCOME.get(kind, "error")
+                            )
+                        attempt_no = attempts.get(url, 0) + 1
+                        delay = (
+                            retry_delay(kind, attempt_no) if attempt_no <= opts.retries else None
+                        )
+                        stats.failures.record(kind, retried=delay is not None)
+                        if delay is not None:
+                            attempts[url] = attempt_no
+                            done = False
+                            log(
+                                f"Retrying {url} in {delay:.0f}s after {kind} error "
+                                f"({attempt_no}/{opts.retries}): {e}"
+                            )
+                            schedule(requeue(item, delay))
+                        else:
+                            stats.failed += 1
+                            if kind in RETRY_BACKOFF_SEC:
+                                stats.failures.gave_up += 1
+                            log(f"Error scraping {url} ({kind}): {e}")
+                            if on_failure is not None:
+                                on_failure(url, f"{kind}: {e}")
+                if done:
+                    outstanding -= 1
+                    await close_if_drained()
+
+        exporter = None
+        if opts.metrics_file:
+            exporter = asyncio.create_task(export_metrics(opts.metrics_file))
+        try:
+            async with asyncio.TaskGroup() as tasks:
+                tasks.create_task(feed())
+                for _ in range(n_workers):
+                    tasks.create_task(worker())
+        except* BrowserRestartLimitError as eg:
+            stats.notes.append(f"Run stopped early: {eg.exceptions[0]}")
+        finally:
+            if exporter is not None:
+                exporter.cancel()
+            if opts.metrics_file:
+                stats.stages.write_textfile(opts.metrics_file)
+        stats.restarts = supervisor.restarts
+        if stats.first_record is not None:
+            stats.notes.append(f"First record after {stats.first_record - stats.started:.1f}s")
+        context = supervisor.context
+        if opts.engine == "http":
+            stats.notes.append(fetcher.stats.summary())
+        if timing.pages:
+            stats.notes.append(timing.summary())
+        if opts.adaptive:
+            stats.notes.append(controller.summary())
+        if stats.failures.errors:
+            stats.notes.append(stats.failures.summary())
+        if readiness.variants or readiness.timeouts:
+            stats.notes.append(readiness.summary())
+        if stats.stages.urls:
+            stats.notes.append(stats.stages.summary())
+        net = policy_engine(context) if context is not None else None
+        if net is not None:
+            stats.notes.append(net.summary())
+    if archive is not None:
+        stats.notes.append(
+            f"Archive: {archive.stored} pages stored, {archive.deduped} deduplicated"
+        )
+        archive.close()
+    stats.notes.append(
+        f"Rate limiter: {limiter.requests} requests, {limiter.waited_sec:.1f}s total wait"
+    )
+    stats.finished = time.monotonic()
+    return stats
@@ -3,154 +3,264 @@ from __future__ import annotations
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
-from lxml import html
-from tenacity import retry, stop_after_attempt, wait_exponential_jitter
-
-from .browser import maybe_click, open_page, wait_for_any_text
-from .extractors import (
-    derive_from_key_features,
-    find_label_value_fuzzy,
-    get_agent,
-    get_agent_address,
-    get_agent_phone,
-    get_description,
-    get_fact_after_description,
-    get_fact_grid_value,
-    get_fact_value,
-    get_floorplan_url,
-    get_key_features,
-    get_lat_lng,
-    get_listing_history,
-    get_photo_urls,
-    get_price_text,
-    get_summary_panel_value,
-    get_title,
-)
+import httpx
+from lxml import etree, html
+from playwright.async_api import Page
+
+from .archive import HtmlArchive
+from .browser import ReadinessStats, maybe_click, open_page, wait_for_any_text
+from .docindex import LazyDoc
+from .errors import BlockedError, ExtractionError, check_status, looks_blocked
+from .extractors import extract_page_model, page_model_fields
+from .extractspec import LISTING_PROGRAM, run_program
+from .fieldprofile import FieldProfiler
+from .htmlslice import LISTING_REGIONS, slice_html
+from .httpfetch import HttpFetcher
+from .inpage import EvalTiming, evaluate_listing, listing_from_snapshot
+from .metrics import StageTrace
 from .models import Listing
-from .normalize import coerce_int, normalize_council_tax, normalize_tenure, parse_price
+from .normalize import parse_price
+from .pagepool import PagePool
+from .ratelimit import RateLimiter
 from .utils import extract_rightmove_id
 
+# Text markers that show a listing page has rendered, across page variants
+READY_MARKERS = [
+    "Key features",
+    "Description",
+    "PROPERTY TYPE",
+    "TENURE",
+    "Guide Price",
+    "Price",
+]
+
+# How long a browser page may take to show any readiness marker
+READY_TIMEOUT_MS = 15000
+
+
+_READY_LOWER = tuple(m.lower() for m in READY_MARKERS)
+# Visible body text nodes; testing the markers in XPath (translate/contains per
+# node) is several times slower in libxml2 than checking each node here
+_VISIBLE_TEXT_XP = etree.XPath(
+    "//body//text()[not(ancestor::script or ancestor::style)]", smart_strings=False
+)
 
-@retry(wait=wait_exponential_jitter(initial=1, max=5), stop=stop_after_attempt(3))
-async def scrape(page, url: str) -> Listing | None:
-    await open_page(page, url)
-    # Wait for any reliable marker to reduce timeouts across page variants
-    await wait_for_any_text(page, [
-        "Key features",
-        "Description",
-        "PROPERTY TYPE",
-        "TENURE",
-        "Guide Price",
-        "Price",
-    ], timeout_ms=15000)
+
+def has_ready_marker(doc: html.HtmlElement) -> bool:
+    """Return True when any readiness marker appears in the visible (non-script) text."""
+    return any(m in text.lower() for text in _VISIBLE_TEXT_XP(doc) for m in _READY_LOWER)
+
+
+async def scrape(
+    page: Page,
+    url: str,
+    *,
+    extract: str = "dom",
+    timing: EvalTiming | None = None,
+    archive: HtmlArchive | None = None,
+    readiness: ReadinessStats | None = None,
+    ready_timeout_ms: int = READY_TIMEOUT_MS,
+    trace: StageTrace | None = None,
+    profile: FieldProfiler | None = None,
+) -> Listing | None:
+    """Scrape one listing in `page`; failures raise errors that `errors.classify` understands."""
+    trace = trace or StageTrace()
+    response = await open_page(page, url, trace)
+    check_status(response.status if response is not None else None, url)
+    # Race all reliable markers to reduce timeouts across page variants
+    try:
+        with trace("wait"):
+            await wait_for_any_text(
+                page, READY_MARKERS, timeout_ms=ready_timeout_ms, stats=readiness
+            )
+    except Exception:
+        # A challenge page never shows the markers; report it as blocked, not slow
+        try:
+            title = await page.title()
+        except Exception:
+            title = ""
+        if looks_blocked(title):
+            raise BlockedError(f"Challenge page served for {url}") from None
+        raise
+
+    if extract == "eval":
+        # One injected script expands sections and returns the raw fields as JSON
+        with trace("eval"):
+            snap = await evaluate_listing(page, timing)
+        if snap.get("propertyData") or snap.get("pairs") or snap.get("sections"):
+            if archive is not None:
+                with trace("archive"):
+                    await archive.aput(url, await page.content())
+            with trace("validate"):
+                return listing_from_snapshot(snap, url, extract_rightmove_id(url))
 
     # Expand collapsible description and feature area to reveal the 'Show less' anchored facts
-    await maybe_click(page, "Read full description")
-    await maybe_click(page, "Show more")
-
-    content = await page.content()
-    doc = html.fromstring(content)
-
-    price_text = get_price_text(doc)
-    price_value, price_currency = parse_price(price_text)
-    listing_history = get_listing_history(doc)
-
-    property_type = get_summary_panel_value(doc, "PROPERTY TYPE")
-    property_title = get_title(doc)
-    bedrooms = coerce_int(get_summary_panel_value(doc, "BEDROOMS"))
-    bathrooms = coerce_int(get_summary_panel_value(doc, "BATHROOMS"))
-    sizes = get_summary_panel_value(doc, "SIZE")
-    tenure = normalize_tenure(
-        get_summary_panel_value(doc, "TENURE") or find_label_value_fuzzy(doc, ["Tenure"])
-    )
-
-    key_features = get_key_features(doc)
-    description = get_description(doc)
-
-    # Strictly prefer values located under the Description section (after Show less)
-    council_tax = normalize_council_tax(
-        get_fact_grid_value(doc, "COUNCIL TAX")
-        or get_fact_after_description(doc, "COUNCIL TAX")
-        or get_fact_value(doc, "COUNCIL TAX")
-        or find_label_value_fuzzy(doc, ["Council tax", "Council Tax Band", "Council tax band"])
-    )
-    parking = (
-        get_fact_grid_value(doc, "PARKING")
-        or get_fact_after_description(doc, "PARKING")
-        or get_fact_value(doc, "PARKING")
-        or find_label_value_fuzzy(doc, ["Parking", "Parking type", "Off street parking"]) 
-        or derive_from_key_features(key_features, ["parking", "driveway", "garage"]) 
-    )
-    garden = (
-        get_fact_grid_value(doc, "GARDEN")
-        or get_fact_after_description(doc, "GARDEN")
-        or get_fact_value(doc, "GARDEN")
-        or find_label_value_fuzzy(doc, ["Garden", "Gardens", "Private garden"]) 
-        or derive_from_key_features(key_features, ["garden", "rear garden", "front garden"]) 
-    )
-    accessibility = (
-        get_fact_grid_value(doc, "ACCESSIBILITY")
-        or get_fact_after_description(doc, "ACCESSIBILITY")
-        or get_fact_value(doc, "ACCESSIBILITY")
-        or find_label_value_fuzzy(doc, ["Accessibility", "Lift", "Step free"]) 
-    )
-    estate_agent = get_agent(doc)
-    agent_address = get_agent_address(doc)
-    localnumber = get_agent_phone(doc)
+    with trace("click"):
+        await maybe_click(page, "Read full description")
+        await maybe_click(page, "Show more")
+
+    with trace("content"):
+        content = await page.content()
+    if archive is not None:
+        with trace("archive"):
+            await archive.aput(url, content)
+    return _checked(parse_listing(content, url, trace=trace, profile=profile))
 
+
+async def scrape_http(
+    fetcher: HttpFetcher,
+    pool: PagePool,
+    url: str,
+    limiter: RateLimiter | None = None,
+    *,
+    extract: str = "dom",
+    timing: EvalTiming | None = None,
+    archive: HtmlArchive | None = None,
+    readiness: ReadinessStats | None = None,
+    timeout: float | None = None,
+    ready_timeout_ms: int = READY_TIMEOUT_MS,
+    trace: StageTrace | None = None,
+    profile: FieldProfiler | None = None,
+) -> Listing | None:
+    """Scrape a listing from its server-rendered HTML, falling back to the browser.
+
+    The browser path is used when the HTTP request fails or none of the
+    readiness markers are present in the returned document. A blocking or
+    gone status raises the same errors as the browser path.
+    """
+    trace = trace or StageTrace()
+    try:
+        with trace("fetch"):
+            content = await fetcher.get(url, timeout=timeout)
+        with trace("parse_html"):
+            sliced = slice_html(content, LISTING_REGIONS)
+            doc = html.fromstring(sliced if sliced is not None else content)
+            if sliced is not None and not has_ready_marker(doc):
+                # The markers may sit outside the sliced regions
+                sliced = None
+                doc = html.fromstring(content)
+            ready = has_ready_marker(doc)
+        if ready:
+            fetcher.stats.direct += 1
+            if archive is not None:
+                with trace("archive"):
+                    await archive.aput(url, content)
+            listing = parse_listing(
+                content, url, doc, partial=sliced is not None, trace=trace, profile=profile
+            )
+            return _checked(listing)
+        fetcher.stats.no_markers += 1
+    except httpx.HTTPStatusError as e:
+        fetcher.stats.http_errors += 1
+        check_status(e.response.status_code, url)
+    except httpx.HTTPError:
+        fetcher.stats.http_errors += 1
+    fetcher.stats.fallback += 1
+    if limiter is not None:
+        await limiter.acquire(url)
+    async with pool.page() as page:
+        return await scrape(
+            page,
+            url,
+            extract=extract,
+            timing=timing,
+            archive=archive,
+            readiness=readiness,
+            ready_timeout_ms=ready_timeout_ms,
+            trace=trace,
+            profile=profile,
+        )
+
+
+def _checked(listing: Listing) -> Listing:
+    if not (listing.price_text or listing.property_title or listing.description):
+        raise ExtractionError(f"No listing fields found for {listing.url}")
+    return listing
+
+
+def parse_listing(
+    content: str,
+    url: str,
+    doc: html.HtmlElement | None = None,
+    *,
+    partial: bool = False,
+    trace: StageTrace | None = None,
+    profile: FieldProfiler | None = None,
+) -> Listing:
+    """Build a Listing from listing HTML.
+
+    Fields come from the embedded PAGE_MODEL JSON when present; each missing
+    field falls back to the XPath extractors on the lazily parsed page regions,
+    and on the whole page when a field that can sit outside them is missing. Pass
+    `partial=True` when `doc` was parsed from `htmlslice.LISTING_REGIONS`.
+    `trace` splits the time into page_model, parse_html, extractors and validate.
+    With `profile`, every strategy tried for every field is timed and counted.
+    """
+    trace = trace or StageTrace()
+    d = LazyDoc(content, doc, trace, partial=partial)
+    with trace("extractors"):
+        listing = _parse_listing(content, url, d, trace, profile)
+    if profile is not None:
+        profile.listings += 1
+        profile.parse_sec += d.parse_sec
+    return listing
+
+
+def _parse_listing(
+    content: str, url: str, d: LazyDoc, trace: StageTrace, profile: FieldProfiler | None
+) -> Listing:
+    with trace("page_model"):
+        pm = page_model_fields(extract_page_model(content))
+    v = run_program(LISTING_PROGRAM, pm, d, profile)
+    price_value, price_currency = parse_price(v["price_text"])
+    description = v["description"]
     rightmove_id = extract_rightmove_id(url)
 
-    # Removed by agent handling
-    removed_banner = doc.xpath('//*[contains(., "removed by the agent")]')
-    if removed_banner:
+    # Removed by agent handling; a raw substring check matches the old
+    # //*[contains(., ...)] scan without walking the tree
+    if "removed by the agent" in content:
         if not description:
             description = "Removed by agent"
 
-    # Photos up to 10
-    photos = get_photo_urls(doc, limit=10)
     # Normalize to exactly 10 entries by padding with None
-    photos = (photos + [None] * 10)[:10]
-
-    # Floorplan and coordinates
-    floorplan_url = get_floorplan_url(doc)
-    lat, lng = get_lat_lng(doc)
-
-    return Listing(
-        url=url,
-        rightmove_id=rightmove_id,
-        price_text=price_text,
-        price_value=price_value,
-        price_currency=price_currency,
-        listing_history=listing_history,
-        property_type=property_type,
-        property_title=property_title,
-        bedrooms=bedrooms,
-        bathrooms=bathrooms,
-        sizes=sizes,
-        tenure=tenure,
-        estate_agent=estate_agent,
-        agent_address=agent_address,
-        localnumber=localnumber,
-        key_features=key_features,
-        description=description,
-        council_tax=council_tax,
-        parking=parking,
-        garden=garden,
-        accessibility=accessibility,
-        photo_1=photos[0],
-        photo_2=photos[1],
-        photo_3=photos[2],
-        photo_4=photos[3],
-        photo_5=photos[4],
-        photo_6=photos[5],
-        photo_7=photos[6],
-        photo_8=photos[7],
-        photo_9=photos[8],
-        photo_10=photos[9],
-        floorplan=floorplan_url,
-        latitude=lat,
-        longitude=lng,
-        timestamp=datetime.now(ZoneInfo("Europe/London")).isoformat(),
-    )
-
+    photos = (v["photos"] + [None] * 10)[:10]
+    lat, lng = v["coordinates"]
 
+    with trace("validate"):
+        return Listing(
+            url=url,
+            rightmove_id=rightmove_id,
+            price_text=v["price_text"],
+            price_value=price_value,
+            price_currency=price_currency,
+            listing_history=v["listing_history"],
+            property_type=v["property_type"],
+            property_title=v["property_title"],
+            bedrooms=v["bedrooms"],
+            bathrooms=v["bathrooms"],
+            sizes=v["sizes"],
+            tenure=v["tenure"],
+            estate_agent=v["estate_agent"],
+            agent_address=v["agent_address"],
+            localnumber=v["localnumber"],
+            key_features=v["key_features"],
+            description=description,
+            council_tax=v["council_tax"],
+            parking=v["parking"],
+            garden=v["garden"],
+            accessibility=v["accessibility"],
+            photo_1=photos[0],
+            photo_2=photos[1],
+            photo_3=photos[2],
+            photo_4=photos[3],
+            photo_5=photos[4],
+            photo_6=photos[5],
+            photo_7=photos[6],
+            photo_8=photos[7],
+            photo_9=photos[8],
+            photo_10=photos[9],
+            floorplan=v["floorplan"],
+            latitude=lat,
+            longitude=lng,
+            timestamp=datetime.now(ZoneInfo("Europe/London")).isoformat(),
+        )
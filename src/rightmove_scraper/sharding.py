@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import bisect
+import hashlib
+import statistics
+from collections.abc import Iterator, Mapping, Sequence
+
+
+def stable_hash(key: str) -> int:
+    # Python's hash() is salted per process; shards must agree across runs
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Consistent-hash ring over shard indices with `vnodes` points per shard.
+
+    Changing the shard count only moves the keys whose nearest point changed,
+    so most rightmove_ids keep their shard between runs.
+    """
+
+    def __init__(self, shards: int, vnodes: int = 64) -> None:
+        self.shards = shards
+        points = sorted(
+            (stable_hash(f"shard-{s}#{v}"), s) for s in range(shards) for v in range(vnodes)
+        )
+        self._keys = [h for h, _ in points]
+        self._owners = [s for _, s in points]
+
+    def preference(self, key: str) -> Iterator[int]:
+        """Shards in ring order starting at `key`'s position, each yielded once."""
+        start = bisect.bisect(self._keys, stable_hash(key))
+        seen: set[int] = set()
+        for i in range(len(self._keys)):
+            owner = self._owners[(start + i) % len(self._keys)]
+            if owner not in seen:
+                seen.add(owner)
+                yield owner
+                if len(seen) == self.shards:
+                    return
+
+
+def predict_costs(
+    ids: Sequence[str],
+    history: Mapping[str, float],
+    groups: Mapping[str, str] | None = None,
+) -> dict[str, float]:
+    """Expected scrape cost per id: its own past latency when known.
+
+    Ids without history get their group's median, else the overall median.
+    """
+    known = [history[i] for i in ids if i in history]
+    default = statistics.median(known) if known else 1.0
+    by_group: dict[str, list[float]] = {}
+    if groups:
+        for rid, ms in history.items():
+            g = groups.get(rid)
+            if g is not None:
+                by_group.setdefault(g, []).append(ms)
+    group_median = {g: statistics.median(v) for g, v in by_group.items()}
+    costs: dict[str, float] = {}
+    for rid in ids:
+        if rid in history:
+            costs[rid] = history[rid]
+        elif groups and groups.get(rid) in group_median:
+            costs[rid] = group_median[groups[rid]]
+        else:
+            costs[rid] = default
+    return costs
+
+
+def assign_shards(
+    ids: Sequence[str],
+    shards: int,
+    *,
+    costs: Mapping[str, float] | None = None,
+    load_factor: float = 1.05,
+) -> dict[str, int]:
+    """Map ids to shards by consistent hashing with bounded load.
+
+    Each shard takes at most `load_factor` times the mean total cost (URL count
+    when `costs` is None). A key whose ring owner is full moves to the next shard
+    along the ring, so balance costs only a small, stable amount of affinity.
+    """
+    ring = HashRing(shards)
+    cost = {rid: (costs[rid] if costs else 1.0) for rid in ids}
+    total = sum(cost.values())
+    biggest = max(cost.values(), default=0.0)
+    capacity = max(load_factor * total / shards, biggest)
+    load = [0.0] * shards
+    out: dict[str, int] = {}
+    # Place in hash order, not input order, so the result ignores how seeds were listed
+    for rid in sorted(ids, key=stable_hash):
+        shard = next((s for s in ring.preference(rid) if load[s] + cost[rid] <= capacity), None)
+        if shard is None:
+            shard = min(range(shards), key=lambda s: load[s])
+        load[shard] += cost[rid]
+        out[rid] = shard
+    return out
+
+
+def shard_loads(
+    assignment: Mapping[str, int], shards: int, costs: Mapping[str, float] | None = None
+) -> list[float]:
+    load = [0.0] * shards
+    for rid, s in assignment.items():
+        load[s] += costs[rid] if costs else 1.0
+    return load
+
+
+def imbalance(loads: Sequence[float]) -> float:
+    """Largest shard load over the mean; 1.0 is perfectly even."""
+    mean = sum(loads) / len(loads) if loads else 0.0
+    return max(loads) / mean if mean else 1.0
@@ -0,0 +1,330 @@
+from __future__ import annotations
+
+import json
+import math
+import multiprocessing as mp
+import multiprocessing.synchronize
+import random
+import threading
+import time
+import urllib.parse
+from dataclasses import asdict, dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from .sharding import stable_hash
+from .slicer import DEFAULT_MAX_PRICE, DEFAULT_MIN_PRICE
+
+_STREETS = [
+    "Foo Street",
+    "Camden Road",
+    "Holloway Road",
+    "Kings Avenue",
+    "Mile End Road",
+    "Acre Lane",
+]
+_TYPES = ["Flat", "Terraced", "Semi-Detached", "Maisonette", "Detached", "Apartment"]
+_TENURES = ["Leasehold", "Freehold", "Share of Freehold"]
+_OUTCODES = ["NW1", "N7", "E1", "SW2", "SE15", "W12", "E17", "N1"]
+
+RESULTS_PER_PAGE = 24
+
+_LISTING_GLOB = "sample_listing_*.html"
+_SEARCH_GLOB = "sample_search_*.html"
+_BLOCKED_PAGE = "<html><head><title>Access denied</title></head><body>Unusual traffic</body></html>"
+
+
+def _noise(rng: random.Random, n: int) -> str:
+    # Menus, footers and tracking scripts that surround the listing content
+    links = "".join(
+        f'<li><a href="/nav/{rng.randrange(10**6)}">Menu item {i}</a></li>' for i in range(n)
+    )
+    blob = json.dumps({"tracking": [rng.random() for _ in range(n)]})
+    return f"<nav><ul>{links}</ul></nav><script>window.analytics = {blob};</script>"
+
+
+def listing_page(rid: int, *, page_model: bool = False, noise: int = 400) -> str:
+    """A deterministic synthetic listing page carrying the markup the extractors target.
+
+    With `page_model` it also embeds the PAGE_MODEL JSON the fast path reads.
+    """
+    rng = random.Random(rid)
+    beds = rng.randint(0, 5)
+    price = rng.randrange(200_000, 2_000_000, 5_000)
+    street = rng.choice(_STREETS)
+    ptype = rng.choice(_TYPES)
+    tenure = rng.choice(_TENURES)
+    band = rng.choice("ABCDEFGH")
+    photos = [
+        f"https://media.rightmove.co.uk/{rid}/IMG_{i:02d}.jpg" for i in range(rng.randint(4, 25))
+    ]
+    words = ["bright", "spacious", "period", "modern", "quiet", "garden"]
+    paragraphs = [" ".join(rng.choice(words) for _ in range(40)) for _ in range(rng.randint(3, 8))]
+    features = [
+        f"Feature {i} {rng.choice(['parking', 'garden', 'balcony', 'lift'])}"
+        for i in range(rng.randint(3, 10))
+    ]
+    title = f"{beds} bedroom {ptype.lower()} for sale, {street}, London"
+    model = ""
+    if page_model:
+        data = {
+            "propertyData": {
+                "id": str(rid),
+                "prices": {"primaryPrice": f"£{price:,}"},
+                "bedrooms": beds,
+                "bathrooms": max(1, beds - 1),
+                "propertySubType": ptype,
+                "address": {"displayAddress": f"{street}, London"},
+                "tenure": {"tenureType": tenure.upper()},
+                "keyFeatures": features,
+                "text": {"description": "<br/>".join(paragraphs)},
+                "livingCosts": {"councilTaxBand": band},
+                "images": [{"url": u} for u in photos],
+                "location": {
+                    "latitude": 51.45 + rng.random() / 10,
+                    "longitude": -0.2 + rng.random() / 5,
+                },
+                "customer": {
+                    "branchDisplayName": "Foo Estates, Camden",
+                    "displayAddress": "1 High St, London NW1",
+                },
+            }
+        }
+        model = f"<script>window.PAGE_MODEL = {json.dumps(data)}</script>"
+    collage = "".join(f'<meta itemprop="contentUrl" content="{u}">' for u in photos)
+    # Backslash-newlines keep long template lines out of the generated HTML
+    return f"""<html><head><title>{title}</title></head><body>
+{_noise(rng, noise)}
+<main>
+<h1 class="_2uQQ3SV0eMHL1P6t5ZDo2q">{title}</h1>
+<div data-testid="price"><span>£{price:,}</span> Guide Price</div>
+<div class="_1q3dx8PQU8WWiT7uw7J9Ck">\
+<div class="_2nk2x6QhNB1UrxdI5KpvaF">Reduced on 10/06/2025</div></div>
+<dl><dt>PROPERTY TYPE</dt><dd>{ptype}</dd><dt>BEDROOMS</dt><dd>{beds}</dd>\
+<dt>BATHROOMS</dt><dd>{max(1, beds - 1)}</dd>
+<dt>SIZE</dt><dd>{rng.randint(300, 3000)} sq ft</dd><dt>TENURE</dt><dd>{tenure}</dd></dl>
+<h2>Key features</h2><ul>{"".join(f"<li>{f}</li>" for f in features)}</ul>
+<h2>Description</h2>{"".join(f"<div>{p}</div>" for p in paragraphs)}<a>Show less</a>
+<dl><dt>COUNCIL TAX<span>A payment made to the local authority</span></dt><dd>Band: {band}</dd>
+<dt>PARKING</dt><dd>Allocated</dd><dt>GARDEN</dt><dd>Yes</dd>\
+<dt>ACCESSIBILITY</dt><dd>Ask agent</dd></dl>
+<h3>MARKETED BY</h3><div>Foo Estates, Camden</div>
+<div class="OojFk4MTxFDKIfqreGNt0" title="1 High St
+London {rng.choice(_OUTCODES)}"></div>
+<a href="tel:020 3910 6089">Call</a>
+<div data-testid="photo-collage">{collage}</div>
+<img src="https://media.rightmove.co.uk/dir/{rid}/_FLP_00_max_296x197.png">
+</main>
+{_noise(rng, noise // 4)}
+{model}
+</body></html>"""
+
+
+def search_page(ids: list[int], total: int, *, seed: int = 0) -> str:
+    """A search results page with one property card per id and the total result count."""
+    rng = random.Random(seed)
+    body = []
+    for rid in ids:
+        body.append(
+            f'<div class="propertyCard" data-testid="propertyCard-{rid}">'
+            f'<a data-testid="propertyCard-link" href="/properties/{rid}#/?channel=RES_BUY">'
+            f"<h2>{rng.randint(1, 5)} bedroom flat for sale</h2></a>"
+            f"<div>£{rng.randrange(200_000, 2_000_000, 5_000):,}</div>"
+            f"<div>{rng.randint(1, 5)} bedrooms</div>"
+            f"<div>Added on 0{rng.randint(1, 9)}/06/2025</div></div>"
+        )
+    return (
+        f"<html><body>{_noise(rng, 300)}<div>{total:,} results</div>"
+        f"<main>{''.join(body)}</main>{_noise(rng, 100)}</body></html>"
+    )
+
+
+def _read_all(root: Path, pattern: str) -> list[str]:
+    return [p.read_text(encoding="utf-8") for p in sorted(root.glob(pattern))]
+
+
+@dataclass(slots=True)
+class StandInSettings:
+    latency_ms: float = 150.0  # median response delay
+    latency_sigma: float = 0.5  # log-normal spread of the delay; 0 makes it fixed
+    error_rate: float = 0.0  # share of requests answered 503
+    blocked_rate: float = 0.0  # share answered 429, as when rate limited
+    removed_rate: float = 0.0  # share of listings answered 410
+    page_model_rate: float = 0.5  # share of listings embedding PAGE_MODEL JSON
+    results: int = 1200  # results a whole-region search reports
+    fixtures_dir: str | None = None  # serve sample_listing_*/sample_search_*.html from here
+    seed: int = 0
+
+
+@dataclass(slots=True)
+class StandInStats:
+    requests: int = 0
+    statuses: dict[int, int] = field(default_factory=dict)
+
+    def summary(self) -> str:
+        codes = ", ".join(f"{code}: {n}" for code, n in sorted(self.statuses.items()))
+        return f"Stand-in server: {self.requests} requests ({codes})"
+
+
+class StandIn:
+    """Serves Rightmove-shaped listing and search pages from memory, with latency and errors.
+
+    Listings live at /properties/<id>; searches at /property-for-sale/find.html
+    and /property-for-sale/<outcode>.html, paged by `index` in steps of 24, with
+    result counts that shrink with the outcode and price window so the slicer
+    has something to partition.
+    """
+
+    def __init__(self, settings: StandInSettings) -> None:
+        self.settings = settings
+        self.stats = StandInStats()
+        self._rng = random.Random(settings.seed)
+        self._lock = threading.Lock()
+        self._listings: list[str] = []
+        self._searches: list[str] = []
+        if settings.fixtures_dir:
+            root = Path(settings.fixtures_dir)
+            self._listings = _read_all(root, _LISTING_GLOB)
+            self._searches = _read_all(root, _SEARCH_GLOB)
+
+    def _draw(self) -> tuple[float, float]:
+        with self._lock:
+            return self._rng.random(), self._rng.gauss(0.0, 1.0)
+
+    def delay_sec(self, z: float) -> float:
+        s = self.settings
+        return s.latency_ms / 1000 * math.exp(s.latency_sigma * z)
+
+    def respond(self, path: str, query: dict[str, str]) -> tuple[int, str]:
+        s = self.settings
+        roll, z = self._draw()
+        time.sleep(self.delay_sec(z))
+        if roll < s.error_rate:
+            return 503, "<html><body>Service unavailable</body></html>"
+        roll -= s.error_rate
+        if roll < s.blocked_rate:
+            return 429, _BLOCKED_PAGE
+        roll -= s.blocked_rate
+        if path.startswith("/properties/"):
+            rid = path.rsplit("/", 1)[-1]
+            if not rid.isdigit():
+                return 404, "<html><body>Not found</body></html>"
+            if roll < s.removed_rate:
+                return 410, "<html><body>This property has been removed by the agent.</body></html>"
+            if self._listings:
+                return 200, self._listings[int(rid) % len(self._listings)]
+            with_model = stable_hash(f"pm-{rid}") % 10_000 < s.page_model_rate * 10_000
+            return 200, listing_page(int(rid), page_model=with_model)
+        if path.startswith("/property-for-sale/"):
+            if self._searches:
+                page = int(query.get("index") or 0) // RESULTS_PER_PAGE
+                return 200, self._searches[page % len(self._searches)]
+            return 200, self.search(path, query)
+        return 404, "<html><body>Not found</body></html>"
+
+    def search(self, path: str, query: dict[str, str]) -> str:
+        s = self.settings
+        location = query.get("locationIdentifier") or path.rsplit("/", 1)[-1].removesuffix(".html")
+        lo = int(query.get("minPrice") or DEFAULT_MIN_PRICE)
+        hi = int(query.get("maxPrice") or DEFAULT_MAX_PRICE)
+        total = s.results
+        if not location.startswith("REGION^"):
+            # Each outcode holds 1-10% of the region, spread evenly over price
+            total = s.results * (1 + stable_hash(location) % 10) // 100
+        total = int(total * max(0, hi - lo) / (DEFAULT_MAX_PRICE - DEFAULT_MIN_PRICE))
+        start = int(query.get("index") or 0)
+        ids = [
+            100_000_000 + stable_hash(f"{location}|{lo}|{hi}|{i}") % 900_000_000
+            for i in range(start, min(start + RESULTS_PER_PAGE, total))
+        ]
+        return search_page(ids, total, seed=start)
+
+    def record(self, status: int) -> None:
+        with self._lock:
+            self.stats.requests += 1
+            self.stats.statuses[status] = self.stats.statuses.get(status, 0) + 1
+
+
+def _handler(standin: StandIn) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, as the real site serves
+        # Headers and body go out in separate writes; without this Nagle plus
+        # delayed ACKs add ~40 ms to every keep-alive response
+        disable_nagle_algorithm = True
+
+        def do_GET(self) -> None:
+            parts = urllib.parse.urlsplit(self.path)
+            query = dict(urllib.parse.parse_qsl(parts.query))
+            status, body = standin.respond(parts.path, query)
+            data = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            standin.record(status)
+
+        def log_message(self, format: str, *args: object) -> None:
+            pass
+
+    return Handler
+
+
+def make_server(
+    settings: StandInSettings, host: str = "127.0.0.1", port: int = 0
+) -> tuple[ThreadingHTTPServer, StandIn]:
+    standin = StandIn(settings)
+    server = ThreadingHTTPServer((host, port), _handler(standin))
+    server.daemon_threads = True
+    return server, standin
+
+
+def _serve(
+    settings: dict, host: str, port: int, ready: mp.Queue, stop: multiprocessing.synchronize.Event
+) -> None:
+    server, standin = make_server(StandInSettings(**settings), host, port)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    ready.put(server.server_address[1])
+    stop.wait()
+    server.shutdown()
+    ready.put(asdict(standin.stats))
+
+
+class StandInProcess:
+    """Run the stand-in in its own process so its CPU time is not billed to the scraper.
+
+    Use as a context manager; `base_url` is set once the server is listening.
+    """
+
+    def __init__(self, settings: StandInSettings, host: str = "127.0.0.1", port: int = 0) -> None:
+        ctx = mp.get_context("spawn")
+        self._ready: mp.Queue = ctx.Queue()
+        self._stop = ctx.Event()
+        self._proc = ctx.Process(
+            target=_serve, args=(asdict(settings), host, port, self._ready, self._stop), daemon=True
+        )
+        self.host = host
+        self.base_url = ""
+        self.stats = StandInStats()
+
+    @property
+    def pid(self) -> int | None:
+        return self._proc.pid
+
+    def __enter__(self) -> StandInProcess:
+        self._proc.start()
+        self.base_url = f"http://{self.host}:{self._ready.get(timeout=30)}"
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self._stop.set()
+        try:
+            stats = self._ready.get(timeout=10)
+            statuses = {int(k): v for k, v in stats["statuses"].items()}
+            self.stats = StandInStats(stats["requests"], statuses)
+        except Exception:
+            pass
+        self._proc.join(timeout=10)
+        if self._proc.is_alive():
+            self._proc.terminate()
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from collections.abc import Callable
+from contextlib import AsyncExitStack
+
+from playwright.async_api import Browser, BrowserContext
+
+from .browser import browser_context
+from .config import AppConfig
+from .pagepool import PagePool
+
+logger = logging.getLogger(__name__)
+
+# Error text Playwright raises once the browser, context or page target is gone
+_DEAD_TARGET_MARKERS = (
+    "Target page, context or browser has been closed",
+    "Browser has been closed",
+    "Target closed",
+    "Browser closed",
+    "Connection closed",
+)
+
+
+class BrowserRestartLimitError(RuntimeError):
+    pass
+
+
+class BrowserSupervisor:
+    """Own the run's browser and page pool, relaunching both after a crash.
+
+    Workers note `generation` before using the pool. When an attempt fails and
+    `crashed()` says the browser is gone, they call `restart(generation)`;
+    concurrent callers for the same generation share a single relaunch.
+    More than `max_restarts_per_hour` relaunches raises BrowserRestartLimitError.
+    """
+
+    def __init__(
+        self,
+        cfg: AppConfig,
+        *,
+        pool_size: int,
+        page_recycle: int = 50,
+        max_restarts_per_hour: int = 5,
+        log: Callable[[str], None] = logger.info,
+    ) -> None:
+        self.cfg = cfg
+        self.pool_size = pool_size
+        self.page_recycle = page_recycle
+        self.max_restarts_per_hour = max_restarts_per_hour
+        self.log = log
+        self.generation = 0
+        self.restarts = 0
+        self.browser: Browser | None = None
+        self.context: BrowserContext | None = None
+        self.pool: PagePool | None = None
+        self._stack: AsyncExitStack | None = None
+        self._recent: deque[float] = deque()
+        self._disconnected = False
+        self._lock = asyncio.Lock()
+        self._on_restart: list[Callable[[BrowserContext], None]] = []
+
+    def on_restart(self, fn: Callable[[BrowserContext], None]) -> None:
+        self._on_restart.append(fn)
+
+    async def _launch(self) -> None:
+        stack = AsyncExitStack()
+        browser, context, _ = await stack.enter_async_context(browser_context(self.cfg))
+        self._stack = stack
+        self.browser, self.context = browser, context
+        self._disconnected = False
+        browser.on("disconnected", lambda _: self._mark_dead())
+        context.on("close", lambda _: self._mark_dead())
+        self.pool = PagePool(context, size=self.pool_size, max_uses=self.page_recycle)
+
+    def _mark_dead(self) -> None:
+        self._disconnected = True
+
+    async def _shutdown(self) -> None:
+        if self.pool is not None:
+            await self.pool.close()
+        if self._stack is not None:
+            try:
+                await self._stack.aclose()
+            except Exception as e:
+                logger.debug("Ignoring error while closing dead browser: %s", e)
+        self._stack = None
+
+    async def __aenter__(self) -> BrowserSupervisor:
+        await self._launch()
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        # Mark as dead first so context.on("close") during shutdown is not misread
+        self._disconnected = True
+        await self._shutdown()
+
+    def crashed(self, exc: BaseException | None = None) -> bool:
+        if self._disconnected or (self.browser is not None and not self.browser.is_connected()):
+            return True
+        return exc is not None and any(m in str(exc) for m in _DEAD_TARGET_MARKERS)
+
+    async def restart(self, generation: int) -> None:
+        """Relaunch the browser unless someone already did since `generation`."""
+        async with self._lock:
+            if generation != self.generation:
+                return
+            now = time.monotonic()
+            while self._recent and now - self._recent[0] > 3600:
+                self._recent.popleft()
+            if len(self._recent) >= self.max_restarts_per_hour:
+                raise BrowserRestartLimitError(
+                    f"Browser crashed {len(self._recent) + 1} times within an hour "
+                    f"(limit {self.max_restarts_per_hour})"
+                )
+            self.log(f"Browser disconnected; relaunching (restart {self.restarts + 1})")
+            self._disconnected = True
+            await self._shutdown()
+            await self._launch()
+            self._recent.append(now)
+            self.restarts += 1
+            self.generation += 1
+            assert self.context is not None, "set by _launch"
+            for fn in self._on_restart:
+                fn(self.context)
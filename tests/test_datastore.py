@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from rightmove_scraper.datastore import STREAM_FORMATS, RecordSink, load_records
+from rightmove_scraper.models import Listing
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+# Writes 20 rows, waits until all are reported flushed, then holds the sink
+# open with one more row pending until the parent kills it
+_KILLED_WRITER = """
+import sys, time
+from rightmove_scraper.datastore import RecordSink
+from rightmove_scraper.models import Listing
+
+sink = RecordSink(sys.argv[1], sys.argv[2], flush_every=5, flush_sec=60)
+for i in range(21):
+    url = f"https://www.rightmove.co.uk/properties/{i}"
+    sink.put(Listing(url=url, rightmove_id=str(i), price_text="£1"))
+flushed = []
+while len(flushed) < 20:
+    flushed += sink.take_flushed()
+    time.sleep(0.01)
+print(len(flushed), flush=True)
+time.sleep(60)
+"""
+
+
+def _listing(rid: str, price: str) -> Listing:
+    url = f"https://www.rightmove.co.uk/properties/{rid}"
+    return Listing(url=url, rightmove_id=rid, price_text=price)
+
+
+def _run(out: str, fmt: str, listings: list[Listing]) -> RecordSink:
+    sink = RecordSink(out, fmt, flush_every=1)
+    for listing in listings:
+        sink.put(listing)
+    sink.close()
+    return sink
+
+
+@pytest.mark.parametrize("fmt", STREAM_FORMATS)
+def test_rescraped_listing_replaces_earlier_run(tmp_path, fmt):
+    out = str(tmp_path)
+    _run(out, fmt, [_listing("1", "£100,000"), _listing("2", "£200,000")])
+    second = _run(out, fmt, [_listing("2", "£250,000")])
+
+    assert second.written == 1
+    df = load_records(out, fmt)
+    assert sorted(df["rightmove_id"]) == ["1", "2"]
+    assert df.set_index("rightmove_id").loc["2", "price_text"] == "£250,000"
+
+
+@pytest.mark.parametrize("fmt", STREAM_FORMATS)
+def test_latest_copy_wins_within_a_run(tmp_path, fmt):
+    sink = _run(str(tmp_path), fmt, [_listing("1", "£1"), _listing("1", "£2")])
+
+    assert sink.replaced == 1
+    df = load_records(str(tmp_path), fmt)
+    assert df["price_text"].tolist() == ["£2"]
+
+
+def test_empty_parquet_run_leaves_no_part(tmp_path):
+    _run(str(tmp_path), "parquet", [_listing("1", "£1")])
+    _run(str(tmp_path), "parquet", [])
+
+    assert sorted(os.listdir(tmp_path)) == ["listings.parquet"]
+
+
+@pytest.mark.parametrize("fmt", STREAM_FORMATS)
+def test_flushed_rows_survive_a_kill(tmp_path, fmt):
+    env = {**os.environ, "PYTHONPATH": str(SRC)}
+    proc = subprocess.Popen(
+        [sys.executable, "-c", _KILLED_WRITER, str(tmp_path), fmt],
+        stdout=subprocess.PIPE,
+        text=True,
+        env=env,
+    )
+    try:
+        assert proc.stdout.readline().strip() == "20"
+    finally:
+        proc.kill()
+        proc.wait()
+
+    df = load_records(str(tmp_path), fmt)
+    assert sorted(df["rightmove_id"], key=int) == [str(i) for i in range(20)]
+
+
+@pytest.mark.parametrize("fmt", ["ndjson", "ndjson.gz", "ndjson.zst"])
+def test_truncated_tail_is_ignored(tmp_path, fmt):
+    _run(str(tmp_path), fmt, [_listing("1", "£1"), _listing("2", "£2")])
+    path = tmp_path / f"listings.{fmt}"
+    whole = path.read_bytes()
+    _run(str(tmp_path), fmt, [_listing("3", "£3")])
+    # Cut the last run's member, frame or line short, as a kill mid-write would
+    data = path.read_bytes()
+    path.write_bytes(data[: (len(whole) + len(data)) // 2])
+
+    assert sorted(load_records(str(tmp_path), fmt)["rightmove_id"]) == ["1", "2"]
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from lxml import html
+
+from rightmove_scraper import extractors as ex
+from rightmove_scraper import standin
+from rightmove_scraper.docindex import DocIndex
+
+FIXTURES = Path(__file__).parent / "fixtures" / "html"
+
+# Small pages for the branches the synthetic listings never reach: labels split
+# across elements, repeated headings, dt/dd outside a <dl>, empty tel: links.
+EDGE_PAGES = [
+    "<html><body><h2>Description</h2><p>Nice flat</p><button><span>Show less</span></button>"
+    "<div><span>COUNCIL TAX</span><svg></svg></div><div>Band: C</div><div><div>PARKING</div>"
+    "</div><p>Yes</p></body></html>",
+    "<div><dl><dt>TENURE</dt><!-- c --><dd>Freehold</dd><dt>SIZE</dt></dl><dl>"
+    "<dt>COUNCIL&nbsp;TAX</dt><dd>Band B</dd><dt>PARKING <b>?</b></dt><dd>Garage</dd></dl>"
+    "</div>",
+    "<html><body><h3>MARKETED BY</h3><h3>MARKETED BY again</h3><div>Agent Ltd</div>"
+    '<span>Tenure</span><span>Leasehold</span><div data-testid="photo-collage">'
+    '<img src="/a/IMG_1.jpg"><img src="/a/IMG_2.jpg"></div><div data-testid="photo-collage">'
+    '<meta itemprop="contentUrl" content="/b/IMG_3.jpg"></div><img src="x_FLP_00.png"></body>'
+    "</html>",
+    "<html><body><div><span>GAR<b>DEN</b></span><span>Private</span></div><p>Council tax</p>"
+    "<div>  Band\n D </div><h2>Key features</h2><p>not a list</p><ul><li>a</li></ul>"
+    '<div class="_1q3dx8PQU8WWiT7uw7J9Ck x">'
+    '<div class="y _2nk2x6QhNB1UrxdI5KpvaF">Added on 01/02/2024</div></div></body></html>',
+    "<html><body><h2>DESCRIPTION</h2><div>Text here</div><h2>Other</h2><a>Show less</a><dl>"
+    "<dt>ACCESSIBILITY<span>help text payment</span></dt><dd>Lift access</dd></dl><div>"
+    '<dt>Parking</dt><dd>Street</dd></div><a href="tel:">x</a><a href="tel:020 1234 5678">y'
+    '</a><script>var propertyData = {"latitude": 51.5, "longitude": -0.1}</script></body>'
+    "</html>",
+    "<html><body><div>Tenure: <span>Share of freehold</span></div><p>Lift</p><p>"
+    '<span>Step free</span></p><div class="OojFk4MTxFDKIfqreGNt0" title="1 Road\nTown"></div>'
+    '<meta itemprop="image" content="y_FLP_1.gif"></body></html>',
+    "<html><body></body></html>",
+]
+
+LABELS = [
+    "COUNCIL TAX",
+    "PARKING",
+    "TENURE",
+    "GARDEN",
+    "ACCESSIBILITY",
+    "Show less",
+    "Tenure",
+    "Council tax",
+    "Parking",
+    "Lift",
+    "SIZE",
+    "BEDROOMS",
+    "Garden",
+]
+
+GETTERS = [
+    ex.get_title,
+    ex.get_price_text,
+    ex.get_key_features,
+    ex.get_description,
+    ex.get_agent,
+    ex.get_photo_urls,
+    ex.get_floorplan_url,
+    ex.get_agent_address,
+    ex.get_agent_phone,
+    ex.get_lat_lng,
+    ex.get_listing_history,
+]
+
+LABEL_GETTERS = [
+    ex.get_summary_panel_value,
+    ex.get_fact_grid_value,
+    ex.get_fact_after_description,
+    ex.get_fact_value,
+]
+
+
+def _pages() -> dict[str, str]:
+    pages = {}
+    for i in range(8):
+        pages[f"synthetic-{i}"] = standin.listing_page(i, page_model=i % 2 == 1, noise=20)
+    pages.update({f"edge-{i}": page for i, page in enumerate(EDGE_PAGES)})
+    for path in sorted(FIXTURES.glob("sample_listing_*.html")):
+        pages[path.name] = path.read_text(encoding="utf-8")
+    return pages
+
+
+@pytest.mark.parametrize("name,page", list(_pages().items()))
+def test_index_and_xpath_getters_agree(name, page):
+    doc = html.fromstring(page)
+    index = DocIndex(doc)
+
+    for getter in GETTERS:
+        assert getter(doc, index=index) == getter(doc), getter.__name__
+    for label in LABELS:
+        for getter in LABEL_GETTERS:
+            assert getter(doc, label, index=index) == getter(doc, label), (getter.__name__, label)
+        fuzzy = ex.find_label_value_fuzzy
+        assert fuzzy(doc, [label], index=index) == fuzzy(doc, [label]), label
+
+
+def test_synthetic_listing_fields_are_found():
+    doc = html.fromstring(standin.listing_page(3, noise=20))
+    index = DocIndex(doc)
+
+    assert ex.get_title(doc, index=index)
+    assert ex.get_price_text(doc, index=index)
+    assert ex.get_key_features(doc, index=index)
+    assert ex.get_agent(doc, index=index)
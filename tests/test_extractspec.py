@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from rightmove_scraper import standin
+from rightmove_scraper.extractors import get_title
+from rightmove_scraper.extractspec import LISTING_SPEC, Rule, compile_spec, derived, dom
+from rightmove_scraper.scrape_listing import parse_listing
+
+# parse_listing output for standin.listing_page(5, noise=20), matching the
+# extraction code from before the declarative spec
+GOLDEN = Path(__file__).parent / "fixtures" / "parse_listing_golden.json"
+URL = "https://www.rightmove.co.uk/properties/5"
+
+
+def test_compiles_fields_in_spec_order():
+    program = compile_spec(LISTING_SPEC)
+
+    assert [rule.field for rule in program] == [rule.field for rule in LISTING_SPEC]
+    assert all(rule.strategies[0][0] == "page_model" for rule in program)
+
+
+def test_duplicate_field_is_rejected():
+    rule = Rule("property_title", (dom("title", get_title),))
+
+    with pytest.raises(ValueError, match="Duplicate rule for field 'property_title'"):
+        compile_spec((rule, rule))
+
+
+def test_field_read_before_extraction_is_rejected():
+    spec = (
+        Rule("derived", (derived("from_title", str.upper, "property_title"),)),
+        Rule("property_title", (dom("title", get_title),)),
+    )
+
+    with pytest.raises(ValueError, match="reads 'property_title' before it is extracted"):
+        compile_spec(spec)
+    compile_spec(spec[::-1])
+
+
+@pytest.mark.parametrize("variant", ["dom", "page_model"])
+def test_parse_listing_matches_golden_output(variant):
+    page = standin.listing_page(5, page_model=variant == "page_model", noise=20)
+    listing = parse_listing(page, URL)
+
+    expected = json.loads(GOLDEN.read_text(encoding="utf-8"))[variant]
+    assert listing.model_dump(mode="json", exclude={"timestamp"}) == expected
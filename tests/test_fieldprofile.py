@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+
+from rightmove_scraper.fieldprofile import FieldProfiler, report_rows
+
+
+def _profile(title: str | None) -> FieldProfiler:
+    prof = FieldProfiler(listings=1)
+    strategies = [("page_model", lambda: None), ("h1", lambda: title)]
+    prof.run("property_title", strategies, bool, lambda: 0.0)
+    return prof
+
+
+def test_run_records_each_attempt():
+    prof = _profile("Flat")
+
+    stats = prof.fields["property_title"]
+    assert (stats["page_model"].runs, stats["page_model"].hits) == (1, 0)
+    assert (stats["h1"].runs, stats["h1"].hits) == (1, 1)
+    assert not prof.empty
+
+
+def test_merge_adds_counts_and_empties():
+    total = _profile("Flat")
+    total.merge(_profile(None))
+
+    stats = total.fields["property_title"]
+    assert total.listings == 2
+    assert (stats["h1"].runs, stats["h1"].hits, stats["h1"].misses) == (2, 1, 1)
+    assert total.empty == {"property_title": 1}
+
+
+def test_dict_round_trip():
+    prof = _profile(None)
+    prof.merge(_profile("Flat"))
+
+    again = FieldProfiler.from_dict(prof.to_dict())
+
+    assert again.to_dict() == prof.to_dict()
+    assert [r["hit_rate"] for r in report_rows(again)] == [0.0, 0.5]
+
+
+def test_save_accumulates_across_runs(tmp_path):
+    path = str(tmp_path / "profile.json")
+    _profile("Flat").save(path)
+    _profile(None).save(path)
+
+    saved = FieldProfiler.load(path)
+    assert saved.listings == 2
+    assert saved.fields["property_title"]["h1"].runs == 2
+
+
+def test_concurrent_saves_keep_every_count(tmp_path):
+    path = str(tmp_path / "profile.json")
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda _: _profile("Flat").save(path), range(40)))
+
+    assert FieldProfiler.load(path).listings == 40
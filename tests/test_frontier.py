@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import asyncio
+
+from rightmove_scraper.frontier import Frontier
+
+URLS = [f"https://www.rightmove.co.uk/properties/{100000 + i}" for i in range(200)]
+
+
+def test_leases_from_worker_threads_hand_out_each_url_once(tmp_path):
+    store = Frontier(str(tmp_path / "frontier.db"))
+    store.enqueue(URLS)
+
+    async def run() -> list[str]:
+        got: list[str] = []
+
+        async def beat() -> None:
+            for _ in range(30):
+                await asyncio.to_thread(store.heartbeat, "w1", 60)
+
+        async def take(owner: str) -> None:
+            while batch := await asyncio.to_thread(store.lease, owner, 7, 60):
+                got.extend(batch)
+                store.mark_done(url.rsplit("/", 1)[1] for url in batch)
+
+        await asyncio.gather(beat(), take("w1"), take("w2"))
+        return got
+
+    got = asyncio.run(run())
+
+    assert sorted(got) == sorted(URLS)
+    assert store.counts()["done"] == len(URLS)
+    store.close()
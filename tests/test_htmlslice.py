@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import re
+from pathlib import Path
+
+import pytest
+from lxml import html
+
+from rightmove_scraper import discovery, docindex, standin
+from rightmove_scraper.htmlslice import LISTING_REGIONS, SEARCH_REGIONS, slice_html
+from rightmove_scraper.scrape_listing import parse_listing
+
+FIXTURES = Path(__file__).parent / "fixtures" / "html"
+URL = "https://www.rightmove.co.uk/properties/123456"
+
+
+def _moved_out_of_main(page: str) -> str:
+    # Agent panel in an <aside> and the photo collage after </main>
+    agent = re.search(r'<h3>MARKETED BY</h3>.*?<a href="tel:[^"]*">Call</a>', page, re.S).group(0)
+    photos = re.search(r'<div data-testid="photo-collage">.*?</div>', page, re.S).group(0)
+    page = page.replace(agent, "").replace(photos, "")
+    return page.replace("</main>", f"</main><aside>{agent}</aside>{photos}")
+
+
+def _listing_pages() -> dict[str, str]:
+    base = standin.listing_page(7, noise=40)
+    pages = {
+        f"synthetic-{i}": standin.listing_page(i, page_model=bool(i % 2), noise=40)
+        for i in range(6)
+    }
+    pages.update(
+        {
+            "outside-main": _moved_out_of_main(base),
+            "outside-main-page-model": _moved_out_of_main(
+                standin.listing_page(8, page_model=True, noise=40)
+            ),
+            "no-main": base.replace("<main>", "<div>").replace("</main>", "</div>"),
+            "main-in-script": base.replace(
+                "<body>", '<body><script>var t = "<main>x</main>";</script>'
+            ),
+            "unclosed-main": base.replace("</main>", ""),
+            "nested-main": base.replace("<main>", "<main><main>a</main>"),
+        }
+    )
+    for path in sorted(FIXTURES.glob("sample_listing_*.html")):
+        pages[path.name] = path.read_text(encoding="utf-8")
+    return pages
+
+
+def _fields(listing) -> dict:
+    return listing.model_dump(mode="json", exclude={"timestamp"})
+
+
+@pytest.mark.parametrize("name,page", list(_listing_pages().items()))
+def test_partial_parse_matches_full_parse(name, page):
+    full = parse_listing(page, URL, html.fromstring(page))
+
+    assert _fields(parse_listing(page, URL)) == _fields(full)
+
+
+def test_fields_outside_main_are_still_found():
+    listing = parse_listing(_moved_out_of_main(standin.listing_page(7, noise=40)), URL)
+
+    assert listing.estate_agent == "Foo Estates, Camden"
+    assert listing.localnumber
+    assert listing.photo_1
+
+
+def test_missing_field_does_not_reparse_the_whole_page(monkeypatch):
+    page = standin.listing_page(7, noise=40)
+    page = re.sub(r'<img src="[^"]*_FLP_[^"]*">', "", page)
+    page = page.replace("<dt>ACCESSIBILITY</dt><dd>Ask agent</dd>", "")
+    parsed: list[int] = []
+    fromstring = html.fromstring
+    monkeypatch.setattr(
+        docindex.html, "fromstring", lambda text: parsed.append(len(text)) or fromstring(text)
+    )
+
+    listing = parse_listing(page, URL)
+
+    assert listing.floorplan is None and listing.accessibility is None
+    assert len(parsed) == 1 and parsed[0] < len(page)
+
+
+def test_slice_keeps_only_listing_regions():
+    page = standin.listing_page(3, page_model=True)
+    sliced = slice_html(page, LISTING_REGIONS)
+
+    assert sliced is not None and len(sliced) < len(page) / 2
+    assert "<nav>" not in sliced and "window.PAGE_MODEL" in sliced
+
+
+def test_missing_main_is_not_sliced():
+    assert slice_html("<html><body><div>1 results</div></body></html>", SEARCH_REGIONS) is None
+
+
+def _search_pages() -> dict[str, str]:
+    base = standin.search_page([101, 102, 103], 1234, seed=1)
+    pages = {
+        "synthetic": base,
+        "no-main": base.replace("<main>", "<section>").replace("</main>", "</section>"),
+        "split-count": base.replace(" results</div>", "</div><span> results</span>"),
+        "properties-count": base.replace(" results</div>", " properties</div>"),
+        "script-count": base.replace(
+            " results</div>", '</div><script>x = {"resultCount": "77"}</script>'
+        ),
+        "no-count": base.replace(" results</div>", "</div>"),
+        "cards-outside-main": base.replace("<main>", "<main></main><div>"),
+    }
+    for path in sorted(FIXTURES.glob("sample_search_*.html")):
+        pages[path.name] = path.read_text(encoding="utf-8")
+    return pages
+
+
+@pytest.mark.parametrize("name,page", list(_search_pages().items()))
+def test_search_extractors_match_full_parse(name, page):
+    doc = html.fromstring(page)
+
+    assert discovery.extract_listing_urls_from_search(page) == discovery._listing_urls(doc)
+    assert discovery.extract_total_results_from_search(page) == discovery._total_results(doc)
+    assert discovery.extract_search_cards(page) == discovery._rendered_cards(doc)
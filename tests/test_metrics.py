@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import pickle
+
+import pytest
+
+from rightmove_scraper.metrics import BUCKETS, Histogram, StageMetrics
+
+
+def _hist(values: list[float]) -> Histogram:
+    h = Histogram()
+    for v in values:
+        h.observe(v)
+    return h
+
+
+def test_empty_histogram_quantile_is_zero():
+    assert Histogram().quantile(0.5) == 0.0
+
+
+def test_quantiles_stay_within_the_observed_bucket():
+    h = _hist([0.1] * 100)
+    i = BUCKETS.index(next(b for b in BUCKETS if b >= 0.1))
+
+    for q in (0.01, 0.5, 0.99):
+        assert BUCKETS[i - 1] <= h.quantile(q) <= BUCKETS[i]
+
+
+def test_quantiles_are_monotonic_and_track_the_data():
+    values = [0.001 * i for i in range(1, 1001)]
+    h = _hist(values)
+
+    p50, p95, p99 = h.quantile(0.5), h.quantile(0.95), h.quantile(0.99)
+    assert p50 <= p95 <= p99
+    # Bucket bounds grow by 1.5x, so an estimate is within that of the true value
+    assert p50 == pytest.approx(0.5, rel=0.5)
+    assert p99 == pytest.approx(0.99, rel=0.5)
+
+
+def test_overflow_bucket_has_a_finite_bound():
+    h = _hist([BUCKETS[-1] * 10])
+
+    assert BUCKETS[-1] <= h.quantile(0.5) <= BUCKETS[-1] * 1.5
+
+
+def test_merge_adds_counts():
+    a, b = _hist([0.01, 0.02]), _hist([0.5])
+    a.merge(b)
+
+    assert a.n == 3
+    assert a.total == pytest.approx(0.53)
+    assert sum(a.counts) == 3
+
+
+def test_stage_metrics_pickle_and_merge():
+    m = StageMetrics()
+    m.observe("write", 0.01)
+    m.urls = 2
+
+    copy = pickle.loads(pickle.dumps(m))
+    copy.merge(m)
+
+    assert copy.urls == 4
+    assert copy.stages["write"].n == 2
+    assert 'rightmove_scrape_stage_seconds_count{stage="write"} 2' in copy.prometheus()
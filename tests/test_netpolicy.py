@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import re
+
+import pytest
+
+from rightmove_scraper.netpolicy import get_policy
+
+
+def _blocked(patterns: list[str], url: str) -> bool:
+    # Network.setBlockedURLs: '*' matches any run of characters over the whole URL
+    return any(re.fullmatch(".*".join(map(re.escape, p.split("*"))), url) for p in patterns)
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "https://media.rightmove.co.uk/photo.jpg",
+        "https://media.rightmove.co.uk/photo.jpeg?w=800",
+        "https://www.rightmove.co.uk/static/main.css",
+        "https://www.rightmove.co.uk/static/main.css?v=3",
+        "https://www.rightmove.co.uk/favicon.ico",
+        "https://www.rightmove.co.uk/fonts/a.woff2",
+    ],
+)
+def test_lean_blocks_static_assets(url):
+    assert _blocked(get_policy("lean").url_patterns(), url)
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "https://www.rightmove.co.uk/properties/123456",
+        "https://www.rightmove.co.uk/static/icons.js",
+        "https://www.rightmove.co.uk/static/theme.css.js",
+        "https://www.rightmove.co.uk/api/svg-map/123?format=json",
+    ],
+)
+def test_lean_keeps_documents_and_scripts(url):
+    assert not _blocked(get_policy("lean").url_patterns(), url)
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing as mp
+import time
+
+from rightmove_scraper.procpool import _drain, _QueueSource
+
+
+def _queue(*items: str | None) -> mp.Queue:
+    q: mp.Queue = mp.get_context("spawn").Queue()
+    for item in items:
+        q.put(item)
+    time.sleep(0.05)  # let the feeder thread flush
+    return q
+
+
+def test_queue_source_ends_at_sentinel():
+    q = _queue("a", "b", None, "c")
+    source = _QueueSource(q)
+
+    async def collect() -> list[str]:
+        return [url async for url in source.urls()]
+
+    assert asyncio.run(collect()) == ["a", "b"]
+    source.stop()
+    assert _drain(q) == ["c"]
+
+
+def test_aborted_run_hands_back_url_and_does_not_hang():
+    q = _queue()
+    source = _QueueSource(q)
+
+    async def abort_while_waiting() -> None:
+        urls = source.urls()
+        waiting = asyncio.ensure_future(urls.__anext__())
+        await asyncio.sleep(0.1)
+        waiting.cancel()
+        q.put("late")
+        await asyncio.sleep(0.2)  # the executor thread takes it after the cancel
+        source.stop()
+
+    t0 = time.monotonic()
+    asyncio.run(abort_while_waiting())
+
+    assert time.monotonic() - t0 < 5
+    time.sleep(0.05)
+    assert _drain(q) == ["late"]
+
+
+def test_queue_source_reports_taken_and_released_urls():
+    q = _queue("a", "b")
+    taken: list[str] = []
+    released: list[str] = []
+    source = _QueueSource(q, on_take=taken.append, on_release=released.append)
+
+    async def first() -> str:
+        return await source.urls().__anext__()
+
+    assert asyncio.run(first()) == "a"
+    source._take()  # "b" is held but never reaches the scraper
+    source.stop()
+
+    assert taken == ["a", "b"]
+    assert released == ["b"]
+    time.sleep(0.05)
+    assert _drain(q) == ["b"]
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+from lxml import html
+
+from rightmove_scraper import standin
+from rightmove_scraper.errors import BlockedError, ListingRemovedError
+from rightmove_scraper.httpfetch import FetchStats
+from rightmove_scraper.scrape_listing import has_ready_marker, scrape_http
+
+URL = "https://www.rightmove.co.uk/properties/123456"
+
+
+def test_ready_marker_is_found_in_visible_text_in_any_case():
+    assert has_ready_marker(html.fromstring(standin.listing_page(2, noise=5)))
+    assert has_ready_marker(html.fromstring("<html><body><h2>KEY FEATURES</h2></body></html>"))
+
+
+def test_ready_marker_ignores_scripts_and_styles():
+    page = (
+        "<html><head><title>Price</title></head><body>"
+        "<script>var t = 'Key features';</script><style>.price {}</style><p>Loading</p>"
+        "</body></html>"
+    )
+
+    assert not has_ready_marker(html.fromstring(page))
+
+
+class _StatusFetcher:
+    def __init__(self, status: int) -> None:
+        self.status = status
+        self.stats = FetchStats()
+
+    async def get(self, url: str, timeout: float | None = None) -> str:
+        request = httpx.Request("GET", url)
+        response = httpx.Response(self.status, request=request)
+        raise httpx.HTTPStatusError(f"HTTP {self.status}", request=request, response=response)
+
+
+class _NoBrowser:
+    def page(self) -> None:
+        raise AssertionError("fell back to the browser")
+
+
+@pytest.mark.parametrize(
+    "status,error", [(403, BlockedError), (429, BlockedError), (404, ListingRemovedError)]
+)
+def test_http_status_is_classified_without_browser_fallback(status, error):
+    fetcher = _StatusFetcher(status)
+
+    with pytest.raises(error, match=f"HTTP {status}"):
+        asyncio.run(scrape_http(fetcher, _NoBrowser(), URL))
+
+    assert fetcher.stats.http_errors == 1 and fetcher.stats.fallback == 0
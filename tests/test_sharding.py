@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from rightmove_scraper.sharding import assign_shards, imbalance, predict_costs, shard_loads
+
+IDS = [str(100000 + i * 37) for i in range(2000)]
+
+
+def test_assignment_ignores_input_order():
+    assert assign_shards(IDS, 8) == assign_shards(IDS[::-1], 8)
+
+
+def test_load_stays_within_factor():
+    loads = shard_loads(assign_shards(IDS, 8, load_factor=1.05), 8)
+
+    assert sum(loads) == len(IDS)
+    assert imbalance(loads) <= 1.05
+
+
+def test_adding_a_shard_moves_few_ids():
+    before = assign_shards(IDS, 8)
+    after = assign_shards(IDS, 9)
+
+    moved = sum(before[rid] != after[rid] for rid in IDS)
+    # An ideal ring moves 1/9 of the keys; bounded load adds a little churn
+    assert moved < len(IDS) * 0.25
+
+
+def test_cost_balanced_assignment():
+    costs = {rid: 10.0 if i % 10 == 0 else 1.0 for i, rid in enumerate(IDS)}
+    assignment = assign_shards(IDS, 4, costs=costs, load_factor=1.1)
+
+    assert imbalance(shard_loads(assignment, 4, costs)) <= 1.1
+
+
+def test_predict_costs_falls_back_to_group_then_overall_median():
+    history = {"a": 100.0, "b": 300.0, "c": 50.0}
+    groups = {"a": "NW1", "b": "NW1", "c": "E1", "d": "NW1", "e": "SE1"}
+
+    costs = predict_costs(["a", "c", "d", "e"], history, groups)
+
+    assert costs["a"] == 100.0
+    assert costs["d"] == 200.0
+    assert costs["e"] == 75.0